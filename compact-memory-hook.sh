@@ -38,7 +38,7 @@ if [ "$TOOL_NAME" = "Compact" ]; then
         "$GRAPHITI_HOOK" add "$memory"
         
         # Also flush any pending batches
-        $(which uv) run python $HOME/.claude/graphiti-batcher.py flush >/dev/null 2>&1
+        "$HOME/.claude/warm-python.sh" "$HOME/.claude/graphiti-batcher.py" flush >/dev/null 2>&1
         
         echo "📝 Compacted conversation summary saved to memory"
     else
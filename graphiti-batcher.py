@@ -7,20 +7,161 @@ and create more meaningful memories.
 
 import json
 import time
-import asyncio
+import fcntl
 from datetime import datetime
 from pathlib import Path
 from collections import defaultdict
 from typing import Dict, List, Tuple, Optional
 import os
-import subprocess
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from memory_store import Shard
+
+BATCH_STORE = "graphiti-batch"
+
+# Version 1 stored dicts of events with ISO timestamps; version 2 stores compact event lists
+BATCH_SCHEMA_VERSION = 2
+
+
+class BatchEvent:
+    """Base batch event; serialized compactly as [kind, timestamp, *fields]"""
+    __slots__ = ('timestamp',)
+    kind = ''
+    fields = ()
+    
+    def to_compact(self) -> list:
+        return [self.kind, round(self.timestamp, 3)] + [getattr(self, name) for name in self.fields]
+    
+    @staticmethod
+    def from_compact(data: list) -> 'BatchEvent':
+        cls = EVENT_TYPES[data[0]]
+        event = cls(*data[2:])
+        event.timestamp = data[1]
+        return event
+
+
+class FileEdit(BatchEvent):
+    __slots__ = ('path', 'action', 'module')
+    kind = 'f'
+    fields = __slots__
+    
+    def __init__(self, path: str, action: str, module: str):
+        self.timestamp = time.time()
+        self.path = path
+        self.action = action
+        self.module = module
+
+
+class CommandRun(BatchEvent):
+    __slots__ = ('command', 'exit_code', 'importance')
+    kind = 'c'
+    fields = __slots__
+    
+    def __init__(self, command: str, exit_code: int, importance: str):
+        self.timestamp = time.time()
+        self.command = command
+        self.exit_code = exit_code
+        self.importance = importance
+
+
+class Discovery(BatchEvent):
+    __slots__ = ('discovery', 'context')
+    kind = 'd'
+    fields = __slots__
+    
+    def __init__(self, discovery: str, context: str):
+        self.timestamp = time.time()
+        self.discovery = discovery
+        self.context = context
+
+
+class ErrorEvent(BatchEvent):
+    __slots__ = ('error', 'context')
+    kind = 'e'
+    fields = __slots__
+    
+    def __init__(self, error: str, context: str):
+        self.timestamp = time.time()
+        self.error = error
+        self.context = context
+
+
+EVENT_TYPES = {cls.kind: cls for cls in (FileEdit, CommandRun, Discovery, ErrorEvent)}
+
+
+class BatchStats:
+    """Running aggregates so summaries and flush checks never rescan the batch"""
+    __slots__ = ('events', 'file_count', 'modules', 'test_files', 'config_changed', 'important_commands',
+                 'high_commands', 'failed_commands', 'discoveries', 'errors', 'first_discovery', 'first_error')
+    
+    def __init__(self):
+        self.events = 0
+        self.file_count = 0
+        self.modules = {}  # module -> edit count, insertion ordered
+        self.test_files = 0
+        self.config_changed = False
+        self.important_commands = 0
+        self.high_commands = []  # first word of the first few high-importance commands
+        self.failed_commands = 0
+        self.discoveries = 0
+        self.errors = 0
+        self.first_discovery = None
+        self.first_error = None
+    
+    def add(self, event: BatchEvent, context_rules: dict):
+        self.events += 1
+        if isinstance(event, FileEdit):
+            self.file_count += 1
+            self.modules[event.module] = self.modules.get(event.module, 0) + 1
+            if any(pattern in event.path for pattern in context_rules['test_patterns']):
+                self.test_files += 1
+            if not self.config_changed and any(config in event.path for config in context_rules['config_files']):
+                self.config_changed = True
+        elif isinstance(event, CommandRun):
+            if event.importance in ('high', 'medium'):
+                self.important_commands += 1
+            if event.importance == 'high' and len(self.high_commands) < 3:
+                self.high_commands.append(event.command.split()[0] if event.command.split() else event.command)
+            if event.exit_code != 0:
+                self.failed_commands += 1
+        elif isinstance(event, Discovery):
+            self.discoveries += 1
+            if self.first_discovery is None:
+                self.first_discovery = event.discovery
+        elif isinstance(event, ErrorEvent):
+            self.errors += 1
+            if self.first_error is None:
+                self.first_error = event.error
+    
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+    
+    @classmethod
+    def from_dict(cls, data: Optional[dict]) -> 'BatchStats':
+        stats = cls()
+        for name, value in (data or {}).items():
+            if name in cls.__slots__:
+                setattr(stats, name, value)
+        return stats
+    
+    @property
+    def significant(self) -> int:
+        return self.file_count + self.important_commands + self.discoveries + self.errors
+
 
 class SmartMemoryBatcher:
+    # Summary produced by an automatic flush, handed out by the next explicit flush
+    pending_summary = None
+    
     def __init__(self, flush_interval: int = 30):
         self.flush_interval = flush_interval  # seconds
+        # Pre-sharding batch file, imported into the current project's shard once
         self.batch_file = Path.home() / ".claude" / "graphiti-batch.json"
+        self.history_file = Path.home() / ".claude" / "graphiti-batch-history.jsonl"
         self.config_file = Path.home() / ".claude" / "memory-config.json"
         self.project_context = self.get_project_context()
+        self.shard = Shard(BATCH_STORE, self.project_context)
         self.load_config()
         self.load_batch()
         
@@ -66,6 +207,7 @@ class SmartMemoryBatcher:
     
     def get_project_context(self) -> str:
         """Get current project context from git or directory"""
+        import subprocess
         try:
             # Check if we're in a git repository
             result = subprocess.run(
@@ -88,82 +230,123 @@ class SmartMemoryBatcher:
         return dir_name
     
     def load_batch(self):
-        """Load existing batch from file"""
+        """Load the project's batch counters from its shard's manifest; events are only read to flush"""
         if self.batch_file.exists():
-            with open(self.batch_file, 'r') as f:
-                data = json.load(f)
-                self.batch = data.get('batch', {
-                    'file_edits': defaultdict(list),
-                    'commands': [],
-                    'discoveries': [],
-                    'errors': []
-                })
-                self.last_flush = data.get('last_flush', time.time())
+            self.shard.adopt(self.batch_file, self.convert_legacy_batch)
+            self.recount()
+            return
+        manifest = self.shard.read_manifest()
+        if 'stats' in manifest['state'] or not (manifest['segments'] or manifest.get('inline')):
+            self.restore(manifest['state'])
         else:
-            self.reset_batch()
+            self.recount()
+    
+    def restore(self, state: Dict):
+        """Take the aggregates stored next to the events"""
+        self.reset_batch()
+        self.stats = BatchStats.from_dict(state.get('stats'))
+        self.last_flush = state.get('last_flush', self.last_flush)
+        self.pending_summary = state.get('pending_summary')
+    
+    def recount(self):
+        """Rebuild the stored aggregates from the events (adopted legacy batches, shards without them)"""
+        with self.shard.transaction() as txn:
+            self.apply(txn.records, txn.state)
+            txn.state['stats'] = self.stats.to_dict()
+            if self.events:
+                txn.state.setdefault('last_flush', self.last_flush)
+    
+    def apply(self, records: List[list], state: Dict):
+        """Rebuild events and aggregates from stored records"""
+        self.reset_batch()
+        for item in records:
+            self.record(BatchEvent.from_compact(item))
+        # Until the first flush the window starts with the first event
+        self.last_flush = state.get('last_flush', self.events[0].timestamp if self.events else self.last_flush)
+        self.pending_summary = state.get('pending_summary')
+    
+    def convert_legacy_batch(self, data: dict) -> dict:
+        """graphiti-batch.json (either schema version) as shard records and state"""
+        if data.get('version') == BATCH_SCHEMA_VERSION:
+            events = [BatchEvent.from_compact(item) for item in data.get('events', [])]
+        else:
+            events = self.migrate_legacy_batch(data.get('batch', {}))
+        state = {key: data[key] for key in ('last_flush', 'pending_summary') if data.get(key)}
+        return {'records': [event.to_compact() for event in events], 'state': state}
+    
+    def migrate_legacy_batch(self, batch: dict) -> List[BatchEvent]:
+        """Convert a version 1 batch (dicts with ISO timestamps) into events"""
+        events = []
+        for module, edits in batch.get('file_edits', {}).items():
+            events.extend(self._legacy(FileEdit(e['path'], e['action'], module), e) for e in edits)
+        events.extend(self._legacy(CommandRun(c['command'], c['exit_code'], c['importance']), c)
+                      for c in batch.get('commands', []))
+        events.extend(self._legacy(Discovery(d['discovery'], d.get('context', '')), d)
+                      for d in batch.get('discoveries', []))
+        events.extend(self._legacy(ErrorEvent(e['error'], e.get('context', '')), e)
+                      for e in batch.get('errors', []))
+        return sorted(events, key=lambda event: event.timestamp)
+    
+    @staticmethod
+    def _legacy(event: BatchEvent, data: dict) -> BatchEvent:
+        try:
+            event.timestamp = datetime.fromisoformat(data['timestamp']).timestamp()
+        except (KeyError, ValueError):
+            pass
+        return event
     
     def reset_batch(self):
         """Reset batch to empty state"""
-        self.batch = {
-            'file_edits': defaultdict(list),
-            'commands': [],
-            'discoveries': [],
-            'errors': []
-        }
+        self.events = []
+        self.stats = BatchStats()
         self.last_flush = time.time()
     
-    def save_batch(self):
-        """Save current batch to file"""
-        data = {
-            'batch': dict(self.batch),
-            'last_flush': self.last_flush
-        }
-        with open(self.batch_file, 'w') as f:
-            json.dump(data, f)
+    def record(self, event: BatchEvent):
+        """Append an event and update the running aggregates"""
+        self.events.append(event)
+        self.stats.add(event, self.config['context_detection'])
+    
+    def add_event(self, event: BatchEvent):
+        """Append an event to the shard and fold it into the stored aggregates.
+        
+        Both happen under the shard's writer lock, so concurrent hooks never
+        overwrite each other's events or counts.
+        """
+        self.events.append(event)
+        
+        def count(txn):
+            if 'stats' in txn.state:
+                self.stats = BatchStats.from_dict(txn.state['stats'])
+            else:
+                self.apply(txn.records, txn.state)
+                self.events.append(event)
+            self.stats.add(event, self.config['context_detection'])
+            txn.state['stats'] = self.stats.to_dict()
+            # Until the first flush the window starts with the first event
+            self.last_flush = txn.state.setdefault('last_flush', event.timestamp)
+        
+        self.shard.append([event.to_compact()], count)
     
     def add_file_edit(self, file_path: str, action: str):
         """Add a file edit to the batch"""
-        module = self.get_module_from_path(file_path)
-        self.batch['file_edits'][module].append({
-            'path': file_path,
-            'action': action,
-            'timestamp': datetime.now().isoformat()
-        })
-        self.save_batch()
+        self.add_event(FileEdit(file_path, action, self.get_module_from_path(file_path)))
         self.maybe_flush()
     
     def add_command(self, command: str, exit_code: int):
         """Add a command to the batch"""
-        importance = self.get_command_importance(command)
-        self.batch['commands'].append({
-            'command': command,
-            'exit_code': exit_code,
-            'importance': importance,
-            'timestamp': datetime.now().isoformat()
-        })
-        self.save_batch()
+        self.add_event(CommandRun(command, exit_code, self.get_command_importance(command)))
         self.maybe_flush()
     
     def add_discovery(self, discovery: str, context: str):
         """Add a discovery to the batch"""
-        self.batch['discoveries'].append({
-            'discovery': discovery,
-            'context': context,
-            'timestamp': datetime.now().isoformat()
-        })
-        self.save_batch()
+        self.add_event(Discovery(discovery, context))
         self.maybe_flush()
     
     def add_error(self, error: str, context: str):
         """Add an error to the batch"""
-        self.batch['errors'].append({
-            'error': error,
-            'context': context,
-            'timestamp': datetime.now().isoformat()
-        })
-        self.save_batch()
+        self.add_event(ErrorEvent(error, context))
         # Errors should flush immediately
-        self.flush()
+        self.hold_summary(self.flush())
     
     def get_module_from_path(self, file_path: str) -> str:
         """Extract module/feature name from file path"""
@@ -190,35 +373,23 @@ class SmartMemoryBatcher:
         
         return 'low'
     
-    def detect_work_context(self, file_edits: Dict[str, List]) -> str:
+    def detect_work_context(self, stats: BatchStats) -> str:
         """Detect what kind of work is being done"""
-        all_files = []
-        for edits in file_edits.values():
-            all_files.extend([e['path'] for e in edits])
-        
         # Check for test development
-        test_count = sum(1 for f in all_files if any(
-            pattern in f for pattern in self.config['context_detection']['test_patterns']
-        ))
-        if test_count > len(all_files) / 2:
+        if stats.test_files > stats.file_count / 2:
             return "test_development"
         
         # Check for config changes
-        config_changed = any(
-            any(config in f for config in self.config['context_detection']['config_files'])
-            for f in all_files
-        )
-        if config_changed:
+        if stats.config_changed:
             return "configuration_update"
         
         # Check for major refactoring
-        if len(all_files) > 10:
+        if stats.file_count > 10:
             return "major_refactoring"
         
         # Check if mostly in one module
-        modules = list(file_edits.keys())
-        if len(modules) == 1:
-            return f"feature_development_in_{modules[0]}"
+        if len(stats.modules) == 1:
+            return f"feature_development_in_{next(iter(stats.modules))}"
         
         return "general_development"
     
@@ -231,12 +402,13 @@ class SmartMemoryBatcher:
         self.project_context = self.get_project_context()
         
         parts = []
+        stats = self.stats
         
         # Summarize file edits
-        if self.batch['file_edits']:
-            context = self.detect_work_context(self.batch['file_edits'])
-            file_count = sum(len(edits) for edits in self.batch['file_edits'].values())
-            modules = list(self.batch['file_edits'].keys())
+        if stats.file_count:
+            context = self.detect_work_context(stats)
+            file_count = stats.file_count
+            modules = list(stats.modules)
             
             if context == "test_development":
                 parts.append(f"Test development: Modified {file_count} test files")
@@ -251,22 +423,18 @@ class SmartMemoryBatcher:
                 parts.append(f"Code changes: {file_count} files in {', '.join(modules[:3])}")
         
         # Summarize important commands
-        if self.batch['commands']:
-            high_importance = [c for c in self.batch['commands'] if c['importance'] == 'high']
-            failed = [c for c in self.batch['commands'] if c['exit_code'] != 0]
-            
-            if high_importance:
-                parts.append(f"Executed: {', '.join(c['command'].split()[0] for c in high_importance[:3])}")
-            if failed:
-                parts.append(f"Failed commands: {len(failed)}")
+        if stats.high_commands:
+            parts.append(f"Executed: {', '.join(stats.high_commands)}")
+        if stats.failed_commands:
+            parts.append(f"Failed commands: {stats.failed_commands}")
         
         # Include discoveries
-        if self.batch['discoveries']:
-            parts.append(f"Discoveries: {self.batch['discoveries'][0]['discovery']}")
+        if stats.first_discovery is not None:
+            parts.append(f"Discoveries: {stats.first_discovery}")
         
         # Include errors
-        if self.batch['errors']:
-            parts.append(f"Errors encountered: {self.batch['errors'][0]['error']}")
+        if stats.first_error is not None:
+            parts.append(f"Errors encountered: {stats.first_error}")
         
         # Prepend project context to summary
         summary = " | ".join(parts) if parts else None
@@ -277,44 +445,87 @@ class SmartMemoryBatcher:
     
     def has_significant_changes(self) -> bool:
         """Check if batch has enough significant changes to flush"""
-        min_size = self.config['batching']['min_batch_size']
-        
-        # Count significant items
-        file_count = sum(len(edits) for edits in self.batch['file_edits'].values())
-        important_commands = sum(1 for c in self.batch['commands'] if c['importance'] in ['high', 'medium'])
-        
-        total_significant = file_count + important_commands + len(self.batch['discoveries']) + len(self.batch['errors'])
-        
-        return total_significant >= min_size
+        return self.stats.significant >= self.config['batching']['min_batch_size']
     
     def maybe_flush(self):
         """Check if it's time to flush the batch"""
         time_elapsed = time.time() - self.last_flush
         
-        # Flush if time window exceeded
-        if time_elapsed > self.config['batching']['window_seconds']:
-            self.flush()
-        # Or if batch is getting too large
-        elif sum(len(v) if isinstance(v, list) else len(list(v.values())) 
-                for v in self.batch.values()) > self.config['batching']['max_batch_size']:
-            self.flush()
-    
-    def flush(self) -> Optional[str]:
-        """Flush the current batch and return summary"""
-        summary = self.create_summary()
-        
+        # Flush if time window exceeded and there is something worth summarizing
+        if time_elapsed > self.config['batching']['window_seconds'] and self.has_significant_changes():
+            self.hold_summary(self.flush())
+        # Or if batch is getting too large (counted in events, not modules)
+        elif self.stats.events > self.config['batching']['max_batch_size']:
+            # Only insignificant events so far: drop them to keep the batch bounded
+            self.hold_summary(self.flush(drop_insignificant=True))
+    
+    def hold_summary(self, summary: Optional[str]):
+        """Keep an automatic flush's summary until the next explicit flush reports it"""
         if summary:
-            # Reset batch
-            self.reset_batch()
-            self.save_batch()
-            return summary
+            with self.shard.transaction() as txn:
+                pending = txn.state.get('pending_summary')
+                txn.state['pending_summary'] = f"{pending}\n{summary}" if pending else summary
+                self.pending_summary = txn.state['pending_summary']
+    
+    def take_pending_summary(self) -> Optional[str]:
+        """Hand out summaries held from automatic flushes, exactly once"""
+        with self.shard.transaction() as txn:
+            self.pending_summary = None
+            return txn.state.pop('pending_summary', None)
+    
+    def append_history(self, summary: str):
+        """Keep the raw batch behind each summary for periodic rollups"""
+        file_edits = defaultdict(list)
+        for event in self.events:
+            if isinstance(event, FileEdit):
+                file_edits[event.module].append(event.path)
+        record = {
+            'flushed': time.time(),
+            'project': self.project_context,
+            'summary': summary,
+            'file_edits': dict(file_edits),
+            'commands': [{'command': e.command, 'exit_code': e.exit_code, 'importance': e.importance}
+                         for e in self.events if isinstance(e, CommandRun)],
+            'discoveries': [e.discovery for e in self.events if isinstance(e, Discovery)],
+            'errors': [e.error for e in self.events if isinstance(e, ErrorEvent)]
+        }
+        line = json.dumps(record) + '\n'
+        while True:
+            with open(self.history_file, 'a') as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                # The rollup prunes this file by swapping in a rewritten copy; follow it if that happened
+                try:
+                    current = os.fstat(f.fileno()).st_ino == os.stat(self.history_file).st_ino
+                except FileNotFoundError:
+                    current = False
+                if current:
+                    f.write(line)
+                    return
+    
+    def flush(self, drop_insignificant: bool = False) -> Optional[str]:
+        """Flush the current batch and return summary.
         
-        return None
+        Runs under the shard's writer lock against its latest contents, so events
+        other hooks appended since this process loaded are included, and two
+        concurrent flushes cannot summarize the same events twice.
+        """
+        with self.shard.transaction() as txn:
+            self.apply(txn.records, txn.state)
+            summary = self.create_summary()
+            
+            if summary:
+                self.append_history(summary)
+            if summary or drop_insignificant:
+                # Reset batch
+                self.reset_batch()
+                txn.replace([])
+                txn.state['last_flush'] = self.last_flush
+                txn.state['stats'] = self.stats.to_dict()
+        
+        return summary
 
 # CLI interface
 if __name__ == "__main__":
-    import sys
-    
     batcher = SmartMemoryBatcher()
     
     if len(sys.argv) < 2:
@@ -341,13 +552,17 @@ if __name__ == "__main__":
     
     elif action == "flush":
         summary = batcher.flush()
+        pending = batcher.take_pending_summary()
+        if pending:
+            summary = f"{pending}\n{summary}" if summary else pending
         if summary:
             print(f"Flushed: {summary}")
         else:
             print("Nothing significant to flush")
     
     elif action == "status":
-        print(f"Batch size: {sum(len(v) if isinstance(v, list) else sum(len(vv) for vv in v.values()) for v in batcher.batch.values())} items")
+        print(f"Project: {batcher.project_context}")
+        print(f"Batch size: {batcher.stats.events} items")
         print(f"Time since last flush: {int(time.time() - batcher.last_flush)} seconds")
         print(f"Has significant changes: {batcher.has_significant_changes()}")
     
@@ -3,7 +3,8 @@
 # Run this periodically to ensure batches are flushed
 
 GRAPHITI_HOOK="$HOME/.claude/graphiti-hook.sh"
-UV_PYTHON="$(which uv) run python"
+PYTHON="$HOME/.claude/warm-python.sh"
+[ -x "$PYTHON" ] || PYTHON="python3"
 BATCHER="$HOME/.claude/graphiti-batcher.py"
 DEBUG_LOG="$HOME/.claude/graphiti-debug.log"
 
@@ -11,11 +12,11 @@ DEBUG_LOG="$HOME/.claude/graphiti-debug.log"
 echo "[$(date '+%Y-%m-%d %H:%M:%S')] [FLUSH] Running periodic flush" >> "$DEBUG_LOG"
 
 # Check batcher status
-status=$($UV_PYTHON "$BATCHER" status 2>&1)
+status=$($PYTHON "$BATCHER" status 2>&1)
 echo "[$(date '+%Y-%m-%d %H:%M:%S')] [FLUSH] Batcher status: $status" >> "$DEBUG_LOG"
 
 # Attempt to flush
-flush_result=$($UV_PYTHON "$BATCHER" flush 2>&1)
+flush_result=$($PYTHON "$BATCHER" flush 2>&1)
 
 if [[ "$flush_result" == "Flushed:"* ]]; then
     summary="${flush_result#Flushed: }"
@@ -25,4 +26,7 @@ if [[ "$flush_result" == "Flushed:"* ]]; then
     "$GRAPHITI_HOOK" add "$summary"
 else
     echo "[$(date '+%Y-%m-%d %H:%M:%S')] [FLUSH] Nothing to flush" >> "$DEBUG_LOG"
-fi
\ No newline at end of file
+fi
+
+# Roll yesterday's fragments up into per-project digests (no-op once done)
+$PYTHON "$HOME/.claude/memory_rollup.py" run --quiet >> "$DEBUG_LOG" 2>&1
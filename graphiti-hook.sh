@@ -7,7 +7,15 @@
 GRAPHITI_HOOK="$HOME/.claude/graphiti-direct-hook.py"
 HOOK_LOG="$HOME/.claude/graphiti-hook.log"
 DEBUG_LOG="$HOME/.claude/graphiti-debug.log"
-UV_PYTHON="$(which uv) run --with graphiti-core python"
+# The warm launcher caches uv's environment resolution and execs the interpreter directly
+WARM_PYTHON="$HOME/.claude/warm-python.sh"
+if [ -x "$WARM_PYTHON" ]; then
+    PYTHON="$WARM_PYTHON"
+    GRAPHITI_PYTHON="$WARM_PYTHON --with graphiti-core"
+else
+    PYTHON="python3"
+    GRAPHITI_PYTHON="$(which uv) run --with graphiti-core python"
+fi
 
 # Trivial commands to ignore
 TRIVIAL_COMMANDS=("ls" "cd" "pwd" "echo" "cat" "which" "clear" "head" "tail")
@@ -82,6 +90,9 @@ add_to_graphiti_async() {
     local project_context=""
     if [ "$include_project" = "true" ]; then
         project_context="$(get_project_context)"
+        if [[ ! "$content" =~ ^\[.*\] ]]; then
+            content="[$project_context] $content"
+        fi
     fi
     
     # Create context JSON if additional context provided
@@ -92,8 +103,12 @@ add_to_graphiti_async() {
         export MEMORY_CONTEXT="{\"project\": \"$project_context\", \"session_id\": \"$(date +%Y%m%d-%H%M%S)\"}"
     fi
     
-    # Queue for background processing (non-blocking)
-    $HOME/.claude/memory-queue-manager.sh queue "$content" "$priority" "$project_context"
+    # Durable priority queue drained by the ingest daemon (non-blocking)
+    if ! printf '%s' "$content" | $PYTHON "$HOME/.claude/graphiti_ingest.py" submit - hook "$priority" > /dev/null; then
+        log_message "Queueing failed, saving directly"
+        add_to_graphiti "$content" "false"
+        return $?
+    fi
     
     log_message "✅ Queued for async processing with metadata: $(echo "$content" | head -c 50)..."
     return 0  # Always return success immediately
@@ -133,7 +148,7 @@ add_to_graphiti() {
     local timeout_seconds=300  # Reduced from 600 (5 minutes)
     
     while [ $retry_count -lt $max_retries ]; do
-        result=$(timeout $timeout_seconds $UV_PYTHON "$GRAPHITI_HOOK" add "$content" 2>&1)
+        result=$(timeout $timeout_seconds $GRAPHITI_PYTHON "$GRAPHITI_HOOK" add "$content" 2>&1)
         
         local exit_code=$?
         
@@ -168,7 +183,7 @@ search_graphiti() {
     local query="$1"
     log_message "Searching Graphiti: $query"
     
-    result=$($UV_PYTHON "$GRAPHITI_HOOK" search "$query" 2>&1)
+    result=$($GRAPHITI_PYTHON "$GRAPHITI_HOOK" search "$query" 2>&1)
     
     if [ $? -eq 0 ]; then
         log_message "Search completed"
@@ -187,7 +202,7 @@ search_graphiti_filtered() {
     
     log_message "Searching Graphiti with filters: type=$type, priority=$priority"
     
-    result=$($UV_PYTHON "$GRAPHITI_HOOK" search-filtered "$type" "$priority" "$query" 2>&1)
+    result=$($GRAPHITI_PYTHON "$GRAPHITI_HOOK" search-filtered "$type" "$priority" "$query" 2>&1)
     
     if [ $? -eq 0 ]; then
         log_message "Filtered search completed"
@@ -205,7 +220,7 @@ get_recent_filtered() {
     
     log_message "Getting recent $memory_type memories (limit: $limit)"
     
-    result=$($UV_PYTHON "$GRAPHITI_HOOK" recent-filtered "$memory_type" "$limit" 2>&1)
+    result=$($GRAPHITI_PYTHON "$GRAPHITI_HOOK" recent-filtered "$memory_type" "$limit" 2>&1)
     
     if [ $? -eq 0 ]; then
         log_message "Retrieved filtered recent memories"
@@ -234,23 +249,28 @@ assess_and_queue_memory() {
         return 0
     fi
     
-    # Use smart assessor to evaluate the content
+    # Rule-based pre-filter decides clear SAVE/SKIP cases; only ambiguous
+    # content reaches the smart assessor. Content is passed over stdin and
+    # never interpolated into Python source.
     local assessment_result
-    assessment_result=$($UV_PYTHON -c "
+    assessment_result=$(printf '%s' "$content" | $PYTHON "$HOME/.claude/memory_prefilter.py" assess 2>&1)
+
+    if [ "$assessment_result" = "ESCALATE" ]; then
+        # Assessor dependencies are not importable from plain python, use the graphiti environment
+        assessment_result=$(printf '%s' "$content" | $GRAPHITI_PYTHON -c "
 import sys
-sys.path.append('$HOME/.claude')
+sys.path.append(sys.argv[1])
 try:
     from smart_memory_assessor import MemoryAssessor
-    assessor = MemoryAssessor()
-    content = '''$content'''
-    should_save, priority, reason = assessor.assess_importance(content)
+    should_save, priority, reason = MemoryAssessor().assess_importance(sys.stdin.read())
     if should_save:
         print(f'SAVE:{priority}:{reason}')
     else:
         print(f'SKIP:{reason}')
 except Exception as e:
     print(f'ERROR:{e}')
-" 2>&1)
+" "$HOME/.claude" 2>&1)
+    fi
 
     if echo "$assessment_result" | grep -q "^SAVE:"; then
         local assessed_priority=$(echo "$assessment_result" | cut -d: -f2)
@@ -287,78 +307,15 @@ chunk_and_save_memory() {
     
     log_debug "Chunking large memory content into smaller pieces"
     
-    # Use Python to intelligently chunk the content
-    local chunk_result
-    chunk_result=$($UV_PYTHON -c "
-import sys
-import re
-
-content = '''$content'''
-
-# Extract key information for chunking
-def extract_key_parts(text):
-    chunks = []
-    
-    # Split by sentences first
-    sentences = re.split(r'[.!?]+', text)
-    
-    current_chunk = ''
-    max_chunk_size = 800  # Target ~800 chars per chunk (200-400 tokens)
-    
-    for sentence in sentences:
-        sentence = sentence.strip()
-        if not sentence:
-            continue
-            
-        # If adding this sentence would exceed limit, save current chunk
-        if len(current_chunk) + len(sentence) > max_chunk_size and current_chunk:
-            chunks.append(current_chunk.strip())
-            current_chunk = sentence
-        else:
-            if current_chunk:
-                current_chunk += '. ' + sentence
-            else:
-                current_chunk = sentence
-    
-    # Don't forget the last chunk
-    if current_chunk.strip():
-        chunks.append(current_chunk.strip())
-    
-    return chunks
-
-chunks = extract_key_parts(content)
-
-# Print each chunk on a separate line with a delimiter
-for i, chunk in enumerate(chunks):
-    print(f'CHUNK_{i}:{chunk}')
-" 2>&1)
-
-    if [ $? -ne 0 ]; then
-        echo "⚠️ Chunking failed, saving as single memory"
-        add_to_graphiti "$content"
-        return $?
+    # Token-aware chunking, ingested by the ingest daemon in the given lane; content
+    # goes over stdin so quotes and backslashes are never interpreted as source code
+    if ! printf '%s' "$content" | $PYTHON "$HOME/.claude/memory_chunker.py" ingest \
+            --project "$(get_project_context)" --priority "$priority"; then
+        log_message "Chunked ingestion incomplete, see graphiti-ingest.log for spooled chunks"
+        return 1
     fi
     
-    # Save each chunk as a separate memory
-    local chunk_count=0
-    local total_chunks=$(echo "$chunk_result" | grep "^CHUNK_" | wc -l)
-    
-    echo "💾 Saving $total_chunks smaller memories..."
-    
-    while IFS= read -r line; do
-        if [[ "$line" =~ ^CHUNK_[0-9]+: ]]; then
-            chunk_count=$((chunk_count + 1))
-            local chunk_content=$(echo "$line" | sed 's/^CHUNK_[0-9]*://')
-            
-            if [ -n "$chunk_content" ]; then
-                echo "  📌 Memory $chunk_count/$total_chunks: ${chunk_content:0:60}..."
-                add_to_graphiti "$chunk_content"
-            fi
-        fi
-    done <<< "$chunk_result"
-    
-    log_message "Successfully chunked and saved $chunk_count memories"
-    echo "✅ Completed: Saved $chunk_count focused memories"
+    log_message "Successfully chunked and saved memory (${#content} chars)"
     return 0
 }
 
@@ -378,13 +335,13 @@ on_file_edit() {
     fi
     
     # Add to batcher instead of direct memory
-    $UV_PYTHON "$HOME/.claude/graphiti-batcher.py" add_file "$file_path" "$action"
+    $PYTHON "$HOME/.claude/graphiti-batcher.py" add_file "$file_path" "$action"
     
     # Check if we should flush
-    flush_result=$($UV_PYTHON "$HOME/.claude/graphiti-batcher.py" flush 2>&1)
+    flush_result=$($PYTHON "$HOME/.claude/graphiti-batcher.py" flush 2>&1)
     if [[ "$flush_result" == "Flushed:"* ]]; then
         summary="${flush_result#Flushed: }"
-        add_to_graphiti "$summary"
+        add_to_graphiti_async "$summary" "true" "low"
     fi
 }
 
@@ -415,13 +372,13 @@ on_command_run() {
     fi
     
     # Add to batcher
-    $UV_PYTHON "$HOME/.claude/graphiti-batcher.py" add_command "$command" "$exit_code"
+    $PYTHON "$HOME/.claude/graphiti-batcher.py" add_command "$command" "$exit_code"
     
     # Check if we should flush
-    flush_result=$($UV_PYTHON "$HOME/.claude/graphiti-batcher.py" flush 2>&1)
+    flush_result=$($PYTHON "$HOME/.claude/graphiti-batcher.py" flush 2>&1)
     if [[ "$flush_result" == "Flushed:"* ]]; then
         summary="${flush_result#Flushed: }"
-        add_to_graphiti "$summary"
+        add_to_graphiti_async "$summary" "true" "low"
     fi
 }
 
@@ -431,7 +388,7 @@ on_discovery() {
     local context="$2"
     
     memory="[Discovery] ${discovery} | Context: ${context}"
-    add_to_graphiti "$memory"
+    add_to_graphiti_async "$memory" "true" "normal"
 }
 
 # Called for errors
@@ -440,7 +397,7 @@ on_error() {
     local context="$2"
     
     memory="[Error] ${error} | Context: ${context}"
-    add_to_graphiti "$memory"
+    add_to_graphiti_async "$memory" "true" "high"
 }
 
 # Called for Git commits
@@ -449,9 +406,18 @@ on_git_commit() {
     local files="$2"
     
     memory="[Git Commit] ${message} | Files: ${files}"
-    add_to_graphiti "$memory"
+    add_to_graphiti_async "$memory" "true" "high"
 }
 
+# Optional event trace for offline replay with hook_loadtest.py
+if [ -n "$GRAPHITI_TRACE_FILE" ]; then
+    trace_line="${EPOCHREALTIME:-$(date +%s)}"
+    for arg in "$@"; do
+        trace_line+=$'\t'"${arg//[$'\t\n']/ }"
+    done
+    printf '%s\n' "$trace_line" >> "$GRAPHITI_TRACE_FILE"
+fi
+
 # Main entry point
 case "$1" in
     add)
@@ -501,19 +467,25 @@ case "$1" in
         on_git_commit "$@"
         ;;
     recent)
-        $UV_PYTHON "$GRAPHITI_HOOK" recent "${2:-10}"
+        $GRAPHITI_PYTHON "$GRAPHITI_HOOK" recent "${2:-10}"
         ;;
     add_async|async)
         add_to_graphiti_async "$2" "true" "${3:-normal}"
         ;;
+    prefilter_stats)
+        $PYTHON "$HOME/.claude/memory_prefilter.py" stats
+        ;;
     queue_status|status)
-        $HOME/.claude/memory-queue-manager.sh status
+        $PYTHON "$HOME/.claude/graphiti_ingest.py" status
+        ;;
+    drain)
+        $PYTHON "$HOME/.claude/graphiti_ingest.py" drain ${2:+"$2"}
         ;;
     start_worker)
-        $HOME/.claude/memory-queue-manager.sh start
+        $PYTHON -c "import sys; sys.path.insert(0, sys.argv[1]); import graphiti_ingest; graphiti_ingest.wake_daemon() or graphiti_ingest.start_daemon()" "$HOME/.claude"
         ;;
     *)
-        echo "Usage: $0 {add|search|search-type|search-filtered|recent|recent-type|file_edit|command_run|discovery|error|git_commit|add_async|status|start_worker} [args...]"
+        echo "Usage: $0 {add|search|search-type|search-filtered|recent|recent-type|file_edit|command_run|discovery|error|git_commit|add_async|status|drain|prefilter_stats|start_worker} [args...]"
         echo ""
         echo "Examples:"
         echo "  Basic operations:"
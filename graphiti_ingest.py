@@ -0,0 +1,580 @@
+#!/usr/bin/env python3
+"""
+Graphiti Ingestion Client
+Hooks hand memories to a local spool and return immediately; a long-lived
+daemon keeps a warm Graphiti client (and its Neo4j connection pool) and
+drains the spool in the background.
+
+The spool is a durable priority queue: items are files named
+<lane>-<time_ns>-<pid>.json so a directory listing yields high before
+normal before low, FIFO within a lane. A token bucket paces calls into
+Graphiti (and the LLM extraction behind it); items that keep failing are
+moved to the dead-letter directory.
+"""
+
+import os
+import sys
+import json
+import time
+import fcntl
+import re
+import socket
+import shutil
+import signal
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+CLAUDE_DIR = Path.home() / ".claude"
+SPOOL_DIR = CLAUDE_DIR / "ingest-spool"
+# Dead-letter store for items that exhausted their retries
+FAILED_DIR = SPOOL_DIR / "failed"
+SOCKET_PATH = CLAUDE_DIR / "graphiti-ingest.sock"
+LOCK_FILE = CLAUDE_DIR / "graphiti-ingest.lock"
+LOG_FILE = CLAUDE_DIR / "graphiti-ingest.log"
+DIRECT_HOOK = CLAUDE_DIR / "graphiti-direct-hook.py"
+WARM_PYTHON = CLAUDE_DIR / "warm-python.sh"
+# One JSONL file per day of successfully ingested memories (read by memory_rollup.py)
+HISTORY_DIR = CLAUDE_DIR / "ingest-history"
+PROJECT_TAG_RE = re.compile(r'^\[([^\]\n]{1,80})\]')
+
+# "graphiti" or "direct" forces a backend; by default the in-process client is used when importable
+BACKEND = os.environ.get('GRAPHITI_INGEST_BACKEND', 'auto')
+CONCURRENCY = int(os.environ.get('GRAPHITI_INGEST_CONCURRENCY', '4'))
+ITEM_TIMEOUT = float(os.environ.get('GRAPHITI_INGEST_TIMEOUT', '300'))
+MAX_ATTEMPTS = 5
+POLL_SECONDS = 2.0
+# The daemon exits after this long without work; the next submit restarts it
+IDLE_EXIT_SECONDS = float(os.environ.get('GRAPHITI_INGEST_IDLE_EXIT', '1800'))
+MAX_BACKOFF_SECONDS = 300
+
+# Token bucket toward Graphiti: sustained episodes per minute and burst size
+RATE_PER_MINUTE = float(os.environ.get('GRAPHITI_INGEST_RATE', '30'))
+RATE_BURST = float(os.environ.get('GRAPHITI_INGEST_BURST', '5'))
+
+PRIORITY_LANES = {'high': 0, 'normal': 1, 'medium': 1, 'low': 2}
+LANE_NAMES = ('high', 'normal', 'low')
+
+
+def log(message: str):
+    """Append a message to the ingestion log"""
+    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    with open(LOG_FILE, 'a') as f:
+        f.write(f"[{timestamp}] [INGEST] {message}\n")
+
+
+# Client side: must stay cheap, it runs inside hooks
+
+def submit(content: str, source: str = "hook", metadata: Optional[Dict] = None,
+           priority: str = "normal") -> Path:
+    """Spool a memory for ingestion and wake the daemon. Never blocks on Graphiti."""
+    SPOOL_DIR.mkdir(parents=True, exist_ok=True)
+    lane = PRIORITY_LANES.get(priority, PRIORITY_LANES['normal'])
+    item = {
+        'content': content,
+        'source': source,
+        'metadata': metadata or {},
+        'priority': LANE_NAMES[lane],
+        'created': time.time(),
+        'attempts': 0
+    }
+
+    # Lane prefix orders the spool; unique suffix so concurrent hooks never clobber each other
+    name = f"{lane}-{time.time_ns()}-{os.getpid()}.json"
+    tmp_path = SPOOL_DIR / f".{name}.tmp"
+    tmp_path.write_text(json.dumps(item))
+    path = SPOOL_DIR / name
+    os.replace(tmp_path, path)
+
+    if not wake_daemon():
+        start_daemon()
+    return path
+
+
+def memory_id(content: str) -> str:
+    """Stable short id used by digests to point back at original memories"""
+    import hashlib
+    return hashlib.sha256(content.encode()).hexdigest()[:16]
+
+
+def append_history(item: Dict, episode: Optional[str] = None):
+    """Record an ingested memory (and its graph episode, when known) in the local history ledger"""
+    metadata = item.get('metadata', {})
+    tag = PROJECT_TAG_RE.match(item['content'])
+    entry = {
+        'id': memory_id(item['content']),
+        'created': item['created'],
+        'ingested': time.time(),
+        'source': item['source'],
+        'priority': item.get('priority', 'normal'),
+        'project': metadata.get('project') or (tag.group(1) if tag else 'general'),
+        'content': item['content']
+    }
+    if episode:
+        entry['episode'] = episode
+    HISTORY_DIR.mkdir(parents=True, exist_ok=True)
+    day = datetime.fromtimestamp(item['created']).strftime('%Y-%m-%d')
+    # Single O_APPEND write so concurrent ingestions never interleave
+    fd = os.open(HISTORY_DIR / f"{day}.jsonl", os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, (json.dumps(entry) + '\n').encode())
+    finally:
+        os.close(fd)
+
+
+def history_episodes(ids) -> Dict[str, str]:
+    """Graph episode uuids of history entries with the given memory ids"""
+    ids = set(ids)
+    episodes = {}
+    for path in sorted(HISTORY_DIR.glob('*.jsonl')) if HISTORY_DIR.exists() else []:
+        with open(path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if entry.get('id') in ids and entry.get('episode'):
+                    episodes[entry['id']] = entry['episode']
+    return episodes
+
+
+def episode_description(item: Dict) -> str:
+    """Episode source description; digests also name the memories they roll up"""
+    rollup_of = item.get('metadata', {}).get('rollup_of')
+    if rollup_of:
+        return f"{item['source']} rollup_of:{','.join(rollup_of)}"
+    return item['source']
+
+
+def lane_of(path: Path) -> int:
+    """Priority lane encoded in a spool file name (pre-lane items count as normal)"""
+    name = path.name
+    return int(name[0]) if name[1:2] == '-' and name[0].isdigit() else PRIORITY_LANES['normal']
+
+
+def wake_daemon() -> bool:
+    """Nudge a running daemon; returns False if none is listening"""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(0.2)
+            sock.connect(str(SOCKET_PATH))
+            sock.sendall(b"wake\n")
+        return True
+    except OSError:
+        return False
+
+
+def graphiti_python() -> List[str]:
+    """Interpreter command with graphiti-core available: warm launcher, then uv, then ourselves"""
+    if os.access(WARM_PYTHON, os.X_OK):
+        return [str(WARM_PYTHON), '--with', 'graphiti-core']
+    uv_path = shutil.which('uv')
+    if uv_path:
+        return [uv_path, 'run', '--with', 'graphiti-core', 'python']
+    return [sys.executable]
+
+
+def daemon_command() -> list:
+    """Command used to launch the daemon with graphiti-core available"""
+    override = os.environ.get('GRAPHITI_INGEST_PYTHON')
+    python = override.split() if override else graphiti_python()
+    return python + [str(Path(__file__).resolve()), 'serve']
+
+
+def start_daemon():
+    """Launch the daemon detached from the calling hook"""
+    import subprocess
+    with open(os.devnull, 'wb') as devnull:
+        subprocess.Popen(daemon_command(), stdin=devnull, stdout=devnull, stderr=devnull,
+                         start_new_session=True, close_fds=True)
+
+
+# Daemon side
+
+class GraphitiBackend:
+    """Warm in-process Graphiti client; the Neo4j driver pools connections"""
+
+    def __init__(self):
+        from graphiti_core import Graphiti
+        from graphiti_core.nodes import EpisodeType
+
+        self.episode_type = EpisodeType.text
+        self.client = Graphiti(
+            os.environ.get('NEO4J_URI', 'bolt://localhost:7687'),
+            os.environ.get('NEO4J_USER', 'neo4j'),
+            os.environ.get('NEO4J_PASSWORD', 'demodemo')
+        )
+
+    async def add(self, item: Dict) -> Optional[str]:
+        """Add one episode; returns its uuid"""
+        metadata = item.get('metadata', {})
+        result = await self.client.add_episode(
+            name=metadata.get('name') or f"{item['source']} {datetime.fromtimestamp(item['created']):%Y-%m-%d %H:%M:%S}",
+            episode_body=item['content'],
+            source=self.episode_type,
+            source_description=episode_description(item),
+            reference_time=datetime.fromtimestamp(item['created'], tz=timezone.utc),
+            group_id=metadata.get('group_id')
+        )
+        episode = getattr(result, 'episode', None)
+        return getattr(episode, 'uuid', None)
+
+    async def remove(self, episode: str):
+        await self.client.remove_episode(episode)
+
+    async def close(self):
+        await self.client.close()
+
+
+class DirectHookBackend:
+    """Fallback when graphiti-core cannot be imported: one direct-hook call per item.
+
+    Episode uuids are not reported back, so digests cannot replace originals through it.
+    """
+
+    async def add(self, item: Dict):
+        import asyncio
+        env = dict(os.environ, MEMORY_CONTEXT=json.dumps(item.get('metadata', {})))
+        # Own process group, so a timed-out call takes the hook's children with it
+        process = await asyncio.create_subprocess_exec(
+            *graphiti_python(), str(DIRECT_HOOK), 'add', item['content'],
+            stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE, env=env,
+            start_new_session=True)
+        try:
+            _, stderr = await process.communicate()
+        finally:
+            # Cancelled by the daemon's wait_for timeout (or shutdown)
+            if process.returncode is None:
+                try:
+                    os.killpg(process.pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+                await process.wait()
+        if process.returncode != 0:
+            raise RuntimeError(stderr.decode(errors='replace')[-300:])
+
+    async def close(self):
+        pass
+
+
+def create_backend():
+    """Prefer the in-process client, fall back to the direct hook script"""
+    if BACKEND == 'direct':
+        return DirectHookBackend()
+    if BACKEND == 'graphiti':
+        return GraphitiBackend()
+    try:
+        return GraphitiBackend()
+    except ImportError:
+        log("graphiti-core not importable, using graphiti-direct-hook.py per item")
+        return DirectHookBackend()
+
+
+class TokenBucket:
+    """Rate limiter: `rate` tokens per second up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, cost: float = 1.0) -> bool:
+        if self.rate <= 0:
+            return True
+        self.refill()
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return True
+        return False
+
+    def wait_time(self, cost: float = 1.0) -> float:
+        """Seconds until `cost` tokens are available"""
+        self.refill()
+        return max(cost - self.tokens, 0) / self.rate if self.rate > 0 else 0.0
+
+
+class IngestDaemon:
+    """Drains the spool in priority order with bounded concurrency over a shared backend"""
+
+    def __init__(self, backend, exit_when_empty: bool = False):
+        import asyncio
+        self.backend = backend
+        self.exit_when_empty = exit_when_empty
+        self.in_flight = set()
+        self.wake = asyncio.Event()
+        self.last_activity = time.monotonic()
+        self.bucket = TokenBucket(RATE_PER_MINUTE / 60.0, RATE_BURST)
+        self.processed = {'ingested': 0, 'retried': 0, 'dead_lettered': 0}
+        # Backed-off items and when they become eligible again (wall clock, survives restarts)
+        self.deferred = {}
+        for path in SPOOL_DIR.glob('*.json'):
+            try:
+                not_before = json.loads(path.read_text()).get('not_before', 0)
+            except (OSError, ValueError):
+                continue
+            if not_before > time.time():
+                self.deferred[path.name] = not_before
+
+    async def handle_wake(self, reader, writer):
+        await reader.readline()
+        writer.close()
+        self.wake.set()
+
+    async def process(self, path: Path):
+        import asyncio
+        try:
+            item = json.loads(path.read_text())
+        except (OSError, ValueError):
+            self.in_flight.discard(path.name)
+            return
+
+        try:
+            episode = await asyncio.wait_for(self.backend.add(item), timeout=ITEM_TIMEOUT)
+            path.unlink(missing_ok=True)
+            self.processed['ingested'] += 1
+            try:
+                append_history(item, episode)
+            except OSError as e:
+                log(f"Could not record {path.name} in ingest history: {e}")
+            log(f"Ingested {path.name} ({len(item['content'])} chars from {item['source']})")
+            if item.get('metadata', {}).get('replaces'):
+                await self.replace_originals(item)
+        except Exception as e:
+            item['attempts'] += 1
+            item['last_error'] = str(e)[:300] or type(e).__name__
+            if item['attempts'] >= MAX_ATTEMPTS:
+                FAILED_DIR.mkdir(parents=True, exist_ok=True)
+                write_atomic(FAILED_DIR / path.name, item)
+                path.unlink(missing_ok=True)
+                self.processed['dead_lettered'] += 1
+                log(f"Dead-lettered {path.name} after {item['attempts']} attempts: {item['last_error']}")
+            else:
+                # Exponential backoff without holding a concurrency slot
+                item['not_before'] = time.time() + min(2 ** item['attempts'], MAX_BACKOFF_SECONDS)
+                write_atomic(path, item)
+                self.deferred[path.name] = item['not_before']
+                self.processed['retried'] += 1
+                log(f"Ingest failed for {path.name} (attempt {item['attempts']}): {item['last_error']}")
+        finally:
+            self.in_flight.discard(path.name)
+            self.last_activity = time.monotonic()
+            self.wake.set()
+
+    async def replace_originals(self, item: Dict):
+        """Remove the episodes an ingested digest replaces; the digest itself is never retried for this"""
+        import asyncio
+        remove = getattr(self.backend, 'remove', None)
+        replaces = item['metadata']['replaces']
+        if remove is None:
+            log(f"Backend cannot remove episodes; keeping {len(replaces)} originals of {item['metadata'].get('name')}")
+            return
+        try:
+            episodes = history_episodes(replaces)
+        except OSError as e:
+            log(f"Could not read ingest history to replace originals: {e}")
+            return
+        removed = 0
+        for memory, episode in episodes.items():
+            try:
+                await asyncio.wait_for(remove(episode), timeout=ITEM_TIMEOUT)
+                removed += 1
+            except Exception as e:
+                log(f"Could not remove episode {episode} ({memory}): {str(e)[:200] or type(e).__name__}")
+        log(f"{item['metadata'].get('name')}: replaced {removed} of {len(replaces)} original episodes")
+
+    def pending(self) -> Tuple[list, Optional[float]]:
+        """Eligible items in priority order, and seconds until the next deferred item is due"""
+        now = time.time()
+        eligible, next_due = [], None
+        for path in sorted(SPOOL_DIR.glob('*.json')):
+            if path.name in self.in_flight:
+                continue
+            not_before = self.deferred.get(path.name)
+            if not_before is not None:
+                if not_before > now:
+                    due = not_before - now
+                    next_due = due if next_due is None else min(next_due, due)
+                    continue
+                del self.deferred[path.name]
+            eligible.append(path)
+        return eligible, next_due
+
+    async def run(self):
+        import asyncio
+        server = await asyncio.start_unix_server(self.handle_wake, path=str(SOCKET_PATH))
+        tasks = set()
+        try:
+            while True:
+                # Items are only taken when a slot and a rate token are both free, so a
+                # high-priority arrival is never queued behind already-dequeued low items
+                eligible, next_due = self.pending()
+                timeout = POLL_SECONDS
+                for path in eligible:
+                    if len(self.in_flight) >= CONCURRENCY:
+                        break
+                    if not self.bucket.try_acquire():
+                        timeout = min(timeout, max(self.bucket.wait_time(), 0.05))
+                        break
+                    self.in_flight.add(path.name)
+                    task = asyncio.create_task(self.process(path))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+
+                if not self.in_flight:
+                    if self.exit_when_empty and not eligible and next_due is None:
+                        break
+                    if time.monotonic() - self.last_activity > IDLE_EXIT_SECONDS:
+                        break
+
+                if next_due is not None:
+                    timeout = min(timeout, next_due)
+                self.wake.clear()
+                try:
+                    await asyncio.wait_for(self.wake.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            server.close()
+            SOCKET_PATH.unlink(missing_ok=True)
+            await self.backend.close()
+
+
+def write_atomic(path: Path, item: Dict):
+    """Replace a spool file without ever exposing a partial write"""
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.write_text(json.dumps(item))
+    os.replace(tmp_path, path)
+
+
+def acquire_daemon_lock():
+    """Single-instance lock; returns the open lock file or None if another daemon holds it"""
+    CLAUDE_DIR.mkdir(exist_ok=True)
+    SPOOL_DIR.mkdir(parents=True, exist_ok=True)
+    lock = open(LOCK_FILE, 'w')
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock.close()
+        return None
+    return lock
+
+
+def run_daemon(exit_when_empty: bool = False) -> Dict:
+    """Run the daemon loop in this process; caller must hold the daemon lock"""
+    # asyncio is only needed on the daemon side; submitting hooks skip its import cost
+    import asyncio
+    # A stale socket from a crashed daemon would make bind() fail
+    SOCKET_PATH.unlink(missing_ok=True)
+    log(f"Daemon started (pid {os.getpid()}{', draining' if exit_when_empty else ''})")
+
+    async def main():
+        daemon = IngestDaemon(create_backend(), exit_when_empty=exit_when_empty)
+        await daemon.run()
+        return daemon.processed
+
+    processed = asyncio.run(main())
+    log(f"Daemon exiting: {processed}")
+    return processed
+
+
+def serve():
+    """Run the ingestion daemon; exits quietly if another instance holds the lock"""
+    lock = acquire_daemon_lock()
+    if lock is None:
+        return
+    with lock:
+        run_daemon()
+
+
+def spool_counts() -> Dict[str, int]:
+    """Pending items per lane"""
+    counts = {name: 0 for name in LANE_NAMES}
+    if SPOOL_DIR.exists():
+        for path in SPOOL_DIR.glob('*.json'):
+            counts[LANE_NAMES[lane_of(path)]] += 1
+    return counts
+
+
+def drain(timeout: Optional[float] = None) -> bool:
+    """Ingest everything in the spool now; returns True once it is empty"""
+    lock = acquire_daemon_lock()
+    if lock is not None:
+        with lock:
+            processed = run_daemon(exit_when_empty=True)
+        print(f"Drained: {processed['ingested']} ingested, {processed['dead_lettered']} dead-lettered")
+        return not any(spool_counts().values())
+
+    # A daemon is already running: keep it awake and wait for the spool to empty
+    deadline = time.monotonic() + timeout if timeout else None
+    while any(spool_counts().values()):
+        if deadline and time.monotonic() > deadline:
+            print(f"Timed out with items pending: {spool_counts()}")
+            return False
+        wake_daemon()
+        time.sleep(POLL_SECONDS)
+    print("Drained by running daemon")
+    return True
+
+
+def requeue_failed() -> int:
+    """Move dead-lettered items back into their lane with a fresh retry budget"""
+    count = 0
+    for path in sorted(FAILED_DIR.glob('*.json')) if FAILED_DIR.exists() else []:
+        item = json.loads(path.read_text())
+        item['attempts'] = 0
+        item.pop('not_before', None)
+        write_atomic(SPOOL_DIR / path.name, item)
+        path.unlink()
+        count += 1
+    if count and not wake_daemon():
+        start_daemon()
+    return count
+
+
+def status():
+    """Print spool and daemon status"""
+    counts = spool_counts()
+    failed = list(FAILED_DIR.glob('*.json')) if FAILED_DIR.exists() else []
+    print(f"Daemon running: {wake_daemon()}")
+    print(f"Pending items: {sum(counts.values())} "
+          f"(high {counts['high']}, normal {counts['normal']}, low {counts['low']})")
+    print(f"Dead-lettered items: {len(failed)}")
+    print(f"Rate limit: {RATE_PER_MINUTE:g}/min, burst {RATE_BURST:g}, concurrency {CONCURRENCY}")
+
+
+# CLI interface
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: graphiti_ingest.py {submit <content|-> [source] [priority]|serve|status|drain [timeout]|requeue}")
+        sys.exit(1)
+
+    action = sys.argv[1]
+
+    if action == "submit" and len(sys.argv) >= 3:
+        # "-" reads the memory from stdin; MEMORY_CONTEXT carries hook metadata
+        content = sys.stdin.read() if sys.argv[2] == "-" else sys.argv[2]
+        try:
+            metadata = json.loads(os.environ.get('MEMORY_CONTEXT') or '{}')
+        except ValueError:
+            metadata = {}
+        submit(content, sys.argv[3] if len(sys.argv) > 3 else "cli",
+               metadata if isinstance(metadata, dict) else {},
+               sys.argv[4] if len(sys.argv) > 4 else "normal")
+        print("Memory queued for ingestion")
+    elif action == "serve":
+        serve()
+    elif action == "status":
+        status()
+    elif action == "drain":
+        sys.exit(0 if drain(float(sys.argv[2]) if len(sys.argv) > 2 else None) else 1)
+    elif action == "requeue":
+        print(f"Requeued {requeue_failed()} dead-lettered items")
+    else:
+        print(f"Unknown action: {action}")
+        sys.exit(1)
@@ -7,13 +7,21 @@ Tracks file modifications and maintains a lightweight change log
 import json
 import sys
 import os
-import hashlib
 import re
 from datetime import datetime
 from pathlib import Path
-import subprocess
 from collections import defaultdict
 
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from file_metadata_cache import FileMetadataCache
+from tech_detectors import manifest_technologies
+from memory_store import Shard
+
+CHANGES_STORE = "code-changes"
+RECENT_CHANGES = 100
+HOT_FILES = 20
+
 class CodeChangeTracker:
     """Tracks code changes across BoardLens projects"""
     
@@ -52,33 +60,52 @@ class CodeChangeTracker:
                 
         return False
     
-    def get_file_hash(self, file_path):
-        """Get hash of file contents"""
-        try:
-            content = file_path.read_bytes()
-            return hashlib.md5(content).hexdigest()
-        except:
-            return None
+    def shard(self, project):
+        """The project's change log: one record per change, folded into a single log record on compaction"""
+        shard = Shard(CHANGES_STORE, project, compact=lambda records: [{'log': fold_change_log(records)}])
+        legacy_file = self.changes_base / f"{project}_changes.json"
+        if legacy_file.exists():
+            shard.adopt(legacy_file, lambda data: {'records': [{'log': data}] if data else []})
+        return shard
     
     def load_change_log(self, project):
-        """Load existing change log for project"""
-        log_file = self.changes_base / f"{project}_changes.json"
-        
-        if log_file.exists():
-            try:
-                return json.loads(log_file.read_text())
-            except:
-                return self._create_empty_log()
-        return self._create_empty_log()
-    
-    def _create_empty_log(self):
-        """Create empty change log structure"""
-        return {
-            'files': {},  # file_path -> {last_hash, last_modified, change_count}
-            'recent_changes': [],  # List of recent changes
-            'change_summary': defaultdict(int),  # Summary by change type
-            'hot_files': defaultdict(int)  # Files with most changes
+        """Load existing change log for project from a lock-free snapshot"""
+        return fold_change_log(self.shard(project).snapshot().records)
+
+def create_empty_log():
+    """Create empty change log structure"""
+    return {
+        'files': {},  # file_path -> {last_hash, last_modified, change_count}
+        'recent_changes': [],  # List of recent changes
+        'change_summary': defaultdict(int),  # Summary by change type
+        'hot_files': defaultdict(int)  # Files with most changes
+    }
+
+def fold_change_log(records):
+    """Replay change records over the last folded log"""
+    log = create_empty_log()
+    for record in records:
+        if 'log' in record:
+            base = record['log']
+            log['files'] = dict(base.get('files', {}))
+            log['recent_changes'] = list(base.get('recent_changes', []))
+            log['change_summary'] = defaultdict(int, base.get('change_summary', {}))
+            log['hot_files'] = defaultdict(int, base.get('hot_files', {}))
+            continue
+        change = record['change']
+        log['files'][change['file']] = {
+            'last_hash': record['file_hash'],
+            'last_modified': change['timestamp'],
+            'change_count': log['files'].get(change['file'], {}).get('change_count', 0) + 1
         }
+        log['recent_changes'].insert(0, change)
+        del log['recent_changes'][RECENT_CHANGES:]
+        log['change_summary'][change['type']] += 1
+        log['hot_files'][change['file']] += 1
+    
+    # Keep only the hottest files
+    log['hot_files'] = defaultdict(int, sorted(log['hot_files'].items(), key=lambda x: x[1], reverse=True)[:HOT_FILES])
+    return log
 
 def track_file_changes(file_path, project_name, change_type='modified'):
     """Track changes to a specific file"""
@@ -88,50 +115,47 @@ def track_file_changes(file_path, project_name, change_type='modified'):
         return
     
     # Load existing log
-    log = tracker.load_change_log(project_name)
+    shard = tracker.shard(project_name)
+    log = fold_change_log(shard.snapshot().records)
     
-    # Get file info
+    # Get file info; the shared cache only rereads the file if its size or mtime moved
     rel_path = str(file_path.relative_to(file_path.parent.parent.parent))
-    file_hash = tracker.get_file_hash(file_path)
-    
-    # Check if file has actually changed
-    if rel_path in log['files']:
-        if log['files'][rel_path]['last_hash'] == file_hash:
-            return  # No actual change
+    cache = FileMetadataCache()
+    try:
+        meta = cache.describe(file_path)
+        file_hash = meta.sha256 if meta else None
+        
+        # Check if file has actually changed
+        if rel_path in log['files']:
+            if log['files'][rel_path]['last_hash'] == file_hash:
+                return  # No actual change
+        
+        summary = analyze_change_content(file_path, change_type, cache, meta)
+        
+        # Keep technology detection warm for the next architecture snapshot
+        try:
+            manifest_technologies(cache, file_path)
+        except Exception:
+            pass
+    finally:
+        cache.close()
     
     # Record the change
-    timestamp = datetime.now().isoformat()
-    
-    # Update file info
-    log['files'][rel_path] = {
-        'last_hash': file_hash,
-        'last_modified': timestamp,
-        'change_count': log['files'].get(rel_path, {}).get('change_count', 0) + 1
-    }
-    
-    # Add to recent changes
     change_entry = {
-        'timestamp': timestamp,
+        'timestamp': datetime.now().isoformat(),
         'file': rel_path,
         'type': change_type,
         'hash': file_hash[:8],  # Short hash
-        'summary': analyze_change_content(file_path, change_type)
+        'summary': summary
     }
     
-    log['recent_changes'].insert(0, change_entry)
-    log['recent_changes'] = log['recent_changes'][:100]  # Keep last 100
-    
-    # Update summaries
-    log['change_summary'][change_type] += 1
-    log['hot_files'][rel_path] += 1
-    
-    # Save updated log
-    save_change_log(project_name, log)
+    # Buffered in the shard's manifest and written out with other changes; readers never see a half-written log
+    shard.append([{'change': change_entry, 'file_hash': file_hash}])
     
     return change_entry
 
-def analyze_change_content(file_path, change_type):
-    """Analyze what kind of change was made"""
+def analyze_change_content(file_path, change_type, cache=None, meta=None):
+    """Analyze what kind of change was made; cached per content hash when a cache is given"""
     try:
         if change_type == 'deleted':
             return "File deleted"
@@ -139,20 +163,15 @@ def analyze_change_content(file_path, change_type):
         if not file_path.exists():
             return "File not found"
             
-        content = file_path.read_text()
         ext = file_path.suffix
         
         # Language-specific analysis
-        if ext in ['.py']:
-            return analyze_python_change(content)
-        elif ext in ['.js', '.jsx', '.ts', '.tsx']:
-            return analyze_javascript_change(content)
-        elif ext in ['.json']:
-            return analyze_json_change(content)
-        elif ext in ['.md']:
-            return analyze_markdown_change(content)
-        else:
+        analyzer = CONTENT_ANALYZERS.get(ext)
+        if analyzer is None:
             return f"{change_type.capitalize()} {ext} file"
+        if cache is not None and meta is not None:
+            return cache.feature(meta, f"change:{analyzer.__name__}", lambda content: analyzer(content.decode()))
+        return analyzer(file_path.read_text())
             
     except:
         return f"{change_type.capitalize()} file"
@@ -235,21 +254,15 @@ def analyze_markdown_change(content):
     
     return ', '.join(summary) if summary else "Documentation update"
 
-def save_change_log(project_name, log):
-    """Save the change log"""
-    tracker = CodeChangeTracker()
-    log_file = tracker.changes_base / f"{project_name}_changes.json"
-    
-    # Clean up old entries
-    if len(log['recent_changes']) > 100:
-        log['recent_changes'] = log['recent_changes'][:100]
-    
-    # Keep only top 20 hot files
-    hot_files = sorted(log['hot_files'].items(), key=lambda x: x[1], reverse=True)[:20]
-    log['hot_files'] = dict(hot_files)
-    
-    # Save
-    log_file.write_text(json.dumps(log, indent=2))
+CONTENT_ANALYZERS = {
+    '.py': analyze_python_change,
+    '.js': analyze_javascript_change,
+    '.jsx': analyze_javascript_change,
+    '.ts': analyze_javascript_change,
+    '.tsx': analyze_javascript_change,
+    '.json': analyze_json_change,
+    '.md': analyze_markdown_change,
+}
 
 def generate_change_report(project_name):
     """Generate a human-readable change report"""
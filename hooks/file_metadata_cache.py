@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+File Metadata Cache
+Shared SQLite cache mapping (path, size, mtime_ns) to content hash and
+language, with analysis features stored per content hash so any path with
+the same bytes reuses them. Entries are evicted least recently used first
+once the cache passes its size cap.
+"""
+
+import os
+import sys
+import json
+import sqlite3
+import hashlib
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+CACHE_DB = Path.home() / ".claude" / "file-metadata-cache.db"
+
+MAX_ENTRIES = int(os.environ.get('FILE_METADATA_CACHE_MAX_ENTRIES', '50000'))
+# Eviction trims to this fraction of the cap so it does not run on every insert
+EVICT_TO = 0.9
+# Recency is only rewritten when older than this, keeping lookups read-only most of the time
+TOUCH_INTERVAL = 3600
+# Long scans commit in batches so hooks running alongside are not locked out
+COMMIT_EVERY = 200
+
+LANGUAGES = {
+    '.py': 'python', '.pyi': 'python',
+    '.js': 'javascript', '.jsx': 'javascript', '.mjs': 'javascript', '.cjs': 'javascript',
+    '.ts': 'typescript', '.tsx': 'typescript',
+    '.json': 'json', '.yaml': 'yaml', '.yml': 'yaml', '.toml': 'toml',
+    '.md': 'markdown', '.txt': 'text', '.sh': 'shell', '.go': 'go', '.rs': 'rust',
+    '.java': 'java', '.kt': 'kotlin', '.gradle': 'gradle', '.rb': 'ruby', '.php': 'php',
+    '.css': 'css', '.scss': 'css', '.html': 'html', '.sql': 'sql',
+}
+FILENAME_LANGUAGES = {
+    'Dockerfile': 'docker', 'Makefile': 'make', 'Gemfile': 'ruby', 'go.mod': 'go-module',
+}
+SHEBANG_LANGUAGES = {'python': 'python', 'node': 'javascript', 'bash': 'shell', 'sh': 'shell', 'zsh': 'shell'}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    language TEXT,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_last_used ON files (last_used);
+CREATE INDEX IF NOT EXISTS files_sha256 ON files (sha256);
+CREATE TABLE IF NOT EXISTS features (
+    sha256 TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (sha256, name)
+);
+"""
+
+
+def detect_language(path: Path, head: bytes = b'') -> Optional[str]:
+    """Language from the file name, falling back to a shebang line"""
+    language = FILENAME_LANGUAGES.get(path.name) or LANGUAGES.get(path.suffix.lower())
+    if language or path.name.startswith('.env'):
+        return language or 'dotenv'
+    if head.startswith(b'#!'):
+        words = head[2:].split(b'\n', 1)[0].decode(errors='replace').split()
+        if words and os.path.basename(words[0]) == 'env':
+            words = words[1:]
+        if words:
+            return SHEBANG_LANGUAGES.get(os.path.basename(words[0]).rstrip('0123456789.'))
+    return None
+
+
+class FileMetadata:
+    """Cached facts about one file; `content` is only set when this call had to read it"""
+
+    __slots__ = ('path', 'size', 'mtime_ns', 'sha256', 'language', 'content', 'cached')
+
+    def __init__(self, path: Path, size: int, mtime_ns: int, sha256: str, language: Optional[str],
+                 content: Optional[bytes] = None, cached: bool = False):
+        self.path = path
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.sha256 = sha256
+        self.language = language
+        self.content = content
+        self.cached = cached
+
+
+class FileMetadataCache:
+    """Content hashes and analysis features shared by the code-change and snapshot hooks"""
+
+    def __init__(self, db_path: Path = CACHE_DB, max_entries: int = MAX_ENTRIES):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.feature_hits = 0
+        self.feature_misses = 0
+        self.pending_writes = 0
+        self.inserted = 0
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(db_path, timeout=10)
+        # WAL keeps readers unblocked while another hook writes
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        try:
+            if self.inserted:
+                self.evict()
+            self.db.commit()
+        except sqlite3.Error:
+            pass
+        self.db.close()
+
+    def _wrote(self):
+        self.pending_writes += 1
+        if self.pending_writes >= COMMIT_EVERY:
+            self.db.commit()
+            self.pending_writes = 0
+
+    def describe(self, path: Path) -> Optional[FileMetadata]:
+        """Hash and language of a file, reading it only if size or mtime changed since last seen"""
+        key = str(Path(path).resolve())
+        try:
+            stat = os.stat(key)
+        except OSError:
+            return None
+
+        now = time.time()
+        row = self.db.execute("SELECT size, mtime_ns, sha256, language, last_used FROM files WHERE path = ?",
+                              (key,)).fetchone()
+        if row and row[0] == stat.st_size and row[1] == stat.st_mtime_ns:
+            self.hits += 1
+            if now - row[4] > TOUCH_INTERVAL:
+                self.db.execute("UPDATE files SET last_used = ? WHERE path = ?", (now, key))
+                self._wrote()
+            return FileMetadata(Path(key), row[0], row[1], row[2], row[3], cached=True)
+
+        self.misses += 1
+        try:
+            content = Path(key).read_bytes()
+        except OSError:
+            return None
+        digest = hashlib.sha256(content).hexdigest()
+        language = detect_language(Path(key), content[:80])
+        self.db.execute("""
+            INSERT INTO files (path, size, mtime_ns, sha256, language, last_used) VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (path) DO UPDATE SET size = excluded.size, mtime_ns = excluded.mtime_ns,
+                sha256 = excluded.sha256, language = excluded.language, last_used = excluded.last_used
+        """, (key, stat.st_size, stat.st_mtime_ns, digest, language, now))
+        self.inserted += row is None
+        self._wrote()
+        return FileMetadata(Path(key), stat.st_size, stat.st_mtime_ns, digest, language, content)
+
+    def feature(self, meta: FileMetadata, name: str, compute: Callable[[bytes], Any]) -> Any:
+        """A named analysis of the file's content, computed once per content hash.
+
+        `compute` receives the raw bytes and must return something JSON-serializable.
+        """
+        row = self.db.execute("SELECT value FROM features WHERE sha256 = ? AND name = ?",
+                              (meta.sha256, name)).fetchone()
+        if row is not None:
+            self.feature_hits += 1
+            return json.loads(row[0])
+
+        self.feature_misses += 1
+        content = meta.content
+        if content is None:
+            content = meta.path.read_bytes()
+            # The file changed after describe(); analyze it but do not file the result under the old hash
+            if hashlib.sha256(content).hexdigest() != meta.sha256:
+                return compute(content)
+            meta.content = content
+        value = compute(content)
+        self.db.execute("INSERT OR REPLACE INTO features (sha256, name, value) VALUES (?, ?, ?)",
+                        (meta.sha256, name, json.dumps(value)))
+        self._wrote()
+        return value
+
+    def evict(self) -> int:
+        """Drop least recently used files beyond the cap, then features no cached file refers to"""
+        count = self.db.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+        if count <= self.max_entries:
+            return 0
+        excess = count - int(self.max_entries * EVICT_TO)
+        with self.db:
+            self.db.execute("""
+                DELETE FROM files WHERE path IN (SELECT path FROM files ORDER BY last_used LIMIT ?)
+            """, (excess,))
+            self.db.execute("DELETE FROM features WHERE sha256 NOT IN (SELECT sha256 FROM files)")
+        return excess
+
+    def stats(self) -> Dict:
+        files = self.db.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+        features = self.db.execute("SELECT COUNT(*) FROM features").fetchone()[0]
+        return {'files': files, 'features': features, 'max_entries': self.max_entries,
+                'bytes': self.db_path.stat().st_size if self.db_path.exists() else 0}
+
+    def clear(self):
+        with self.db:
+            self.db.execute("DELETE FROM files")
+            self.db.execute("DELETE FROM features")
+        self.db.execute("VACUUM")
+
+
+# CLI interface
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: file_metadata_cache.py {stats|describe <path>|evict|clear}")
+        sys.exit(1)
+
+    cache = FileMetadataCache()
+    try:
+        action = sys.argv[1]
+        if action == "stats":
+            stats = cache.stats()
+            print(f"Files: {stats['files']}/{stats['max_entries']}  Features: {stats['features']}  "
+                  f"Size: {stats['bytes'] / 1024:.0f} KB")
+        elif action == "describe" and len(sys.argv) > 2:
+            meta = cache.describe(Path(sys.argv[2]))
+            if meta is None:
+                print(f"Cannot read {sys.argv[2]}")
+                sys.exit(1)
+            print(f"{meta.path}  {meta.size} bytes  {meta.language or 'unknown'}  {meta.sha256[:16]}"
+                  f"  ({'cached' if meta.cached else 'read'})")
+        elif action == "evict":
+            print(f"Evicted {cache.evict()} entries")
+        elif action == "clear":
+            cache.clear()
+            print("File metadata cache cleared")
+        else:
+            print(f"Unknown action: {action}")
+            sys.exit(1)
+    finally:
+        cache.close()
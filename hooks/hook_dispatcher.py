@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Concurrent Hook Dispatcher
+Single entry point for tool hooks configured in hook-dispatch.json. The hook
+payload is parsed once and shared; independent blocking hooks run
+concurrently under per-hook timeouts and fire-and-forget hooks are
+detached, so a tool call waits for the slowest blocking hook rather than
+the sum of all of them.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import shlex
+import shutil
+import signal
+import tempfile
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from hook_profiler import record as record_profile
+
+PROFILER = Path(__file__).resolve().parent / "hook_profiler.py"
+CLAUDE_DIR = Path.home() / ".claude"
+CONFIG_FILE = CLAUDE_DIR / "hook-dispatch.json"
+LOG_FILE = CLAUDE_DIR / "hook-dispatcher.log"
+
+DEFAULT_TIMEOUT = 30.0
+PLACEHOLDER_RE = re.compile(r'\{(\w+)\}')
+EXIT_CODE_RE = re.compile(r'exit code: (\d+)')
+
+# Claude Code: exit code 2 blocks the tool call and feeds stderr back
+BLOCKING_EXIT_CODE = 2
+
+
+def log(message: str):
+    """Append a message to the dispatcher log"""
+    timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
+    try:
+        with open(LOG_FILE, 'a') as f:
+            f.write(f"[{timestamp}] [DISPATCH] {message}\n")
+    except OSError:
+        pass
+
+
+class HookPayload:
+    """Hook input parsed once, with the derived fields hooks used to re-parse with jq"""
+
+    def __init__(self, event: str, raw: bytes):
+        self.event = event
+        self.raw = raw
+        try:
+            data = json.loads(raw) if raw.strip() else {}
+        except ValueError:
+            data = {}
+        self.data = data if isinstance(data, dict) else {}
+
+        self.tool_name = self.data.get('tool_name') or os.environ.get('TOOL_NAME', '')
+        tool_input = self.data.get('tool_input')
+        if tool_input is None:
+            self.tool_input = os.environ.get('TOOL_INPUT', '')
+            try:
+                tool_input = json.loads(self.tool_input) if self.tool_input else {}
+            except ValueError:
+                tool_input = {}
+        else:
+            self.tool_input = json.dumps(tool_input)
+        tool_input = tool_input if isinstance(tool_input, dict) else {}
+
+        tool_response = self.data.get('tool_response')
+        if tool_response is None:
+            self.tool_output = os.environ.get('TOOL_OUTPUT', '')
+        else:
+            self.tool_output = tool_response if isinstance(tool_response, str) else json.dumps(tool_response)
+
+        exit_code = EXIT_CODE_RE.search(self.tool_output)
+        self.fields = {
+            'tool_name': self.tool_name,
+            'file_path': tool_input.get('file_path') or '',
+            'command': tool_input.get('command') or '',
+            'edit_action': 'created' if 'Write' in self.tool_name else 'edited',
+            'exit_code': exit_code.group(1) if exit_code else '0',
+            'prompt': self.data.get('prompt') or ''
+        }
+
+    def environment(self, extra: Optional[Dict] = None) -> Dict[str, str]:
+        """Environment for a hook: legacy TOOL_* variables plus the hook's own settings"""
+        env = dict(os.environ)
+        env.update({
+            'TOOL_NAME': self.tool_name,
+            'TOOL_INPUT': self.tool_input,
+            'TOOL_OUTPUT': self.tool_output,
+            'HOOK_EVENT': self.event
+        })
+        env.update({key: str(value) for key, value in (extra or {}).items()})
+        return env
+
+
+class HookSpec:
+    """One configured hook and the conditions under which it runs"""
+
+    def __init__(self, config: Dict, matcher: str, default_timeout: float):
+        self.name = config.get('name') or os.path.basename(config['command'])
+        self.matcher = matcher
+        self.command = config['command']
+        self.args = config.get('args', [])
+        self.env = config.get('env', {})
+        self.timeout = float(config.get('timeout', default_timeout))
+        self.background = bool(config.get('background', False))
+        self.if_output = config.get('if_output')
+        self.if_command = config.get('if_command')
+        self.unless_command = config.get('unless_command')
+
+    def argv(self, payload: HookPayload) -> Optional[List[str]]:
+        """Command line with placeholders filled in, or None if the hook should not run"""
+        if self.if_output and not re.search(self.if_output, payload.tool_output):
+            return None
+        command = payload.fields['command']
+        if self.if_command and not re.search(self.if_command, command):
+            return None
+        if self.unless_command and re.search(self.unless_command, command):
+            return None
+
+        argv = [os.path.expandvars(os.path.expanduser(self.command))]
+        for arg in self.args:
+            names = PLACEHOLDER_RE.findall(arg)
+            # A referenced field that is empty means there is nothing to report
+            if any(not payload.fields.get(name) for name in names):
+                return None
+            argv.append(PLACEHOLDER_RE.sub(lambda m: str(payload.fields.get(m.group(1), '')), arg))
+        return argv
+
+
+def load_config() -> Dict:
+    try:
+        return json.loads(CONFIG_FILE.read_text())
+    except (OSError, ValueError) as e:
+        log(f"Cannot load {CONFIG_FILE}: {e}")
+        return {}
+
+
+def matches(matcher: str, payload: HookPayload) -> bool:
+    """Claude Code matcher semantics: empty matches everything, otherwise a regex on the tool name"""
+    if not matcher or matcher == '*':
+        return True
+    subject = payload.tool_name or payload.fields['prompt']
+    if payload.tool_name:
+        return re.fullmatch(matcher, subject) is not None
+    return re.search(matcher, subject) is not None
+
+
+def select_hooks(config: Dict, payload: HookPayload) -> List[HookSpec]:
+    default_timeout = float(config.get('default_timeout', DEFAULT_TIMEOUT))
+    hooks = []
+    for group in config.get(payload.event, []):
+        matcher = group.get('matcher', '')
+        if matches(matcher, payload):
+            hooks.extend(HookSpec(hook, matcher, default_timeout) for hook in group.get('hooks', []))
+    return hooks
+
+
+def run_blocking(spec: HookSpec, argv: List[str], payload: HookPayload) -> Dict:
+    """Run one hook to completion or timeout; the whole process group is killed on timeout"""
+    started = time.perf_counter()
+    try:
+        process = subprocess.Popen(argv, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                   stderr=subprocess.PIPE, env=payload.environment(spec.env),
+                                   start_new_session=True)
+    except OSError as e:
+        return {'spec': spec, 'returncode': 1, 'stdout': b'', 'stderr': f"{spec.name}: {e}\n".encode(),
+                'wall_ms': 0.0}
+
+    try:
+        stdout, stderr = process.communicate(payload.raw, timeout=spec.timeout)
+        returncode = process.returncode
+    except subprocess.TimeoutExpired:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+        stdout, stderr = process.communicate()
+        returncode = 1
+        log(f"{spec.name} timed out after {spec.timeout:g}s")
+        stderr += f"{spec.name}: timed out after {spec.timeout:g}s\n".encode()
+
+    wall_ms = (time.perf_counter() - started) * 1000
+    return {'spec': spec, 'returncode': returncode, 'stdout': stdout, 'stderr': stderr, 'wall_ms': wall_ms}
+
+
+def start_background(spec: HookSpec, argv: List[str], payload: HookPayload):
+    """Detach a fire-and-forget hook; coreutils timeout enforces its limit after we exit.
+
+    The profiler's `run` wrapper times the detached hook and records it once it finishes.
+    """
+    timeout_path = shutil.which('timeout')
+    if timeout_path:
+        argv = [timeout_path, '-k', '5', f"{spec.timeout:g}"] + argv
+    argv = [sys.executable, str(PROFILER), 'run', '--event', payload.event, '--matcher', spec.matcher or '*',
+            '--name', spec.name, shlex.join(argv)]
+    try:
+        # Payload goes through an unlinked temp file so a large payload never blocks us on a pipe
+        with tempfile.TemporaryFile() as stdin, open(LOG_FILE, 'ab') as log_file:
+            stdin.write(payload.raw)
+            stdin.seek(0)
+            subprocess.Popen(argv, stdin=stdin, stdout=log_file, stderr=log_file,
+                             env=payload.environment(spec.env), start_new_session=True, close_fds=True)
+    except OSError as e:
+        log(f"Cannot start background hook {spec.name}: {e}")
+
+
+def dispatch(event: str, raw: bytes) -> int:
+    """Run every matching hook for the event; returns the combined exit code"""
+    payload = HookPayload(event, raw)
+    blocking = []
+    for spec in select_hooks(load_config(), payload):
+        argv = spec.argv(payload)
+        if argv is None:
+            continue
+        if spec.background:
+            start_background(spec, argv, payload)
+        else:
+            blocking.append((spec, argv))
+
+    if not blocking:
+        return 0
+
+    if len(blocking) == 1:
+        results = [run_blocking(blocking[0][0], blocking[0][1], payload)]
+    else:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=len(blocking)) as pool:
+            results = list(pool.map(lambda item: run_blocking(item[0], item[1], payload), blocking))
+
+    # Output in configuration order; a blocking (2) result wins over other failures
+    exit_code = 0
+    for result in results:
+        sys.stdout.buffer.write(result['stdout'])
+        sys.stderr.buffer.write(result['stderr'])
+        record_profile(event, result['spec'].matcher, result['spec'].name, result['wall_ms'],
+                       result['returncode'], len(result['stdout']), len(result['stderr']))
+        if result['returncode'] == BLOCKING_EXIT_CODE:
+            exit_code = BLOCKING_EXIT_CODE
+        elif result['returncode'] != 0 and exit_code == 0:
+            exit_code = result['returncode']
+    sys.stdout.flush()
+    sys.stderr.flush()
+    return exit_code
+
+
+def list_hooks():
+    """Print the configured hooks per event"""
+    config = load_config()
+    for event, groups in config.items():
+        if not isinstance(groups, list):
+            continue
+        for group in groups:
+            for hook in group.get('hooks', []):
+                mode = "background" if hook.get('background') else "blocking"
+                timeout = hook.get('timeout', config.get('default_timeout', DEFAULT_TIMEOUT))
+                print(f"{event:<17} {group.get('matcher', '*'):<24} {hook.get('name', hook['command']):<30} "
+                      f"{mode:<10} {timeout}s")
+
+
+# CLI interface
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: hook_dispatcher.py {<HookEvent>|list}  (hook payload on stdin)")
+        sys.exit(1)
+
+    if sys.argv[1] == "list":
+        list_hooks()
+    else:
+        raw = sys.stdin.buffer.read() if not sys.stdin.isatty() else b''
+        sys.exit(dispatch(sys.argv[1], raw))
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Hook Latency Profiler
+Wraps hook commands from settings.json, recording wall time, exit code and
+output size per invocation, and reports latency percentiles per hook and
+matcher.
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import shlex
+import shutil
+import subprocess
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+CLAUDE_DIR = Path.home() / ".claude"
+PROFILE_FILE = CLAUDE_DIR / "hook-profile.tsv"
+SETTINGS_FILE = CLAUDE_DIR / "settings.json"
+PROFILER_COMMAND = "$HOME/.claude/hooks/hook_profiler.py"
+WARM_PYTHON = CLAUDE_DIR / "warm-python.sh"
+
+# Rotate once the store passes this size; the report reads both generations
+MAX_PROFILE_BYTES = int(os.environ.get('HOOK_PROFILE_MAX_KB', '4096')) * 1024
+
+# Per-invocation budget for interpreter startup plus module imports
+STARTUP_BUDGET_MS = float(os.environ.get('HOOK_STARTUP_BUDGET_MS', '50'))
+# Python entry points run on every tool call, relative to the install root (~/.claude or the repo)
+STARTUP_ENTRY_POINTS = ('graphiti-batcher.py', 'graphiti_ingest.py', 'memory_prefilter.py', 'memory_chunker.py',
+                        'hooks/hook_dispatcher.py', 'hooks/code-change-memory-hook.py',
+                        'hooks/session-memory-hook.py')
+# Executes a module's top level (imports, constants) without running its main; like a hook run
+# by path, the script's own directory comes first on sys.path
+IMPORT_SNIPPET = ("import os, sys, importlib.util as u; sys.path.insert(0, os.path.dirname(os.path.abspath(sys.argv[1]))); "
+                  "s = u.spec_from_file_location('startup_probe', sys.argv[1]); "
+                  "s.loader.exec_module(u.module_from_spec(s))")
+
+# ts  event  matcher  hook  wall_ms  exit_code  stdout_bytes  stderr_bytes
+FIELDS = ('ts', 'event', 'matcher', 'hook', 'wall_ms', 'exit_code', 'stdout_bytes', 'stderr_bytes')
+
+
+def hook_name(command: str) -> str:
+    """Short stable name for a hook command, e.g. gemini-hooks.sh[pre-edit]"""
+    try:
+        tokens = shlex.split(command)
+    except ValueError:
+        tokens = command.split()
+    hook_type = None
+    script = None
+    for token in tokens:
+        if token.startswith('HOOK_TYPE='):
+            hook_type = token.split('=', 1)[1]
+        elif script is None and token.endswith(('.sh', '.py')) and os.path.basename(token) != WARM_PYTHON.name:
+            script = os.path.basename(token)
+    if script is None:
+        # Inline "sh -c '...'" hooks: look inside the script body
+        for token in tokens:
+            for word in token.split():
+                if word.startswith('HOOK_TYPE=') and hook_type is None:
+                    hook_type = word.split('=', 1)[1]
+                elif script is None and word.rstrip(';').endswith(('.sh', '.py')):
+                    script = os.path.basename(word.rstrip(';'))
+    commands = [token for token in tokens if '=' not in token.split(' ', 1)[0]]
+    name = script or (commands[0] if commands else 'unknown')
+    return f"{name}[{hook_type}]" if hook_type else name
+
+
+def record(event: str, matcher: str, hook: str, wall_ms: float, exit_code: int,
+           stdout_bytes: int, stderr_bytes: int):
+    """Append one invocation; a single O_APPEND write keeps concurrent hooks from interleaving"""
+    clean = lambda value: value.replace('\t', ' ').replace('\n', ' ')
+    line = '\t'.join((f"{time.time():.3f}", clean(event), clean(matcher or '*'), clean(hook),
+                      f"{wall_ms:.1f}", str(exit_code), str(stdout_bytes), str(stderr_bytes))) + '\n'
+    try:
+        if PROFILE_FILE.exists() and PROFILE_FILE.stat().st_size > MAX_PROFILE_BYTES:
+            os.replace(PROFILE_FILE, PROFILE_FILE.with_suffix('.tsv.1'))
+        fd = os.open(PROFILE_FILE, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line.encode())
+        finally:
+            os.close(fd)
+    except OSError:
+        pass
+
+
+def run_hook(event: str, matcher: str, command: str, name: Optional[str] = None) -> int:
+    """Run a hook command transparently (same stdin, output and exit code) and record its cost"""
+    payload = sys.stdin.buffer.read() if not sys.stdin.isatty() else b''
+    started = time.perf_counter()
+    result = subprocess.run(command, shell=True, input=payload, capture_output=True)
+    wall_ms = (time.perf_counter() - started) * 1000
+
+    sys.stdout.buffer.write(result.stdout)
+    sys.stdout.flush()
+    sys.stderr.buffer.write(result.stderr)
+    sys.stderr.flush()
+
+    record(event, matcher, name or hook_name(command), wall_ms, result.returncode,
+           len(result.stdout), len(result.stderr))
+    return result.returncode
+
+
+def load_records(since: Optional[float] = None) -> List[Dict]:
+    """Read both generations of the profile store"""
+    records = []
+    for path in (PROFILE_FILE.with_suffix('.tsv.1'), PROFILE_FILE):
+        if not path.exists():
+            continue
+        with open(path) as f:
+            for line in f:
+                parts = line.rstrip('\n').split('\t')
+                if len(parts) != len(FIELDS):
+                    continue
+                ts = float(parts[0])
+                if since is not None and ts < since:
+                    continue
+                records.append({
+                    'ts': ts, 'event': parts[1], 'matcher': parts[2], 'hook': parts[3],
+                    'wall_ms': float(parts[4]), 'exit_code': int(parts[5]),
+                    'stdout_bytes': int(parts[6]), 'stderr_bytes': int(parts[7])
+                })
+    return records
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def summarize(records: List[Dict]) -> List[Dict]:
+    """Latency percentiles per (event, matcher, hook), most total time first"""
+    groups = defaultdict(list)
+    for r in records:
+        groups[(r['event'], r['matcher'], r['hook'])].append(r)
+
+    rows = []
+    for (event, matcher, hook), items in groups.items():
+        times = sorted(r['wall_ms'] for r in items)
+        rows.append({
+            'event': event,
+            'matcher': matcher,
+            'hook': hook,
+            'calls': len(items),
+            'p50_ms': percentile(times, 50),
+            'p95_ms': percentile(times, 95),
+            'p99_ms': percentile(times, 99),
+            'max_ms': times[-1],
+            'total_ms': sum(times),
+            'errors': sum(1 for r in items if r['exit_code'] != 0),
+            'avg_output_bytes': sum(r['stdout_bytes'] + r['stderr_bytes'] for r in items) / len(items)
+        })
+    rows.sort(key=lambda row: row['total_ms'], reverse=True)
+    return rows
+
+
+def print_report(rows: List[Dict]):
+    if not rows:
+        print("No hook invocations recorded")
+        return
+    print(f"{'EVENT':<17} {'MATCHER':<22} {'HOOK':<32} {'CALLS':>6} {'P50':>8} {'P95':>8} "
+          f"{'P99':>8} {'TOTAL':>9} {'ERR':>4} {'OUT':>7}")
+    for row in rows:
+        print(f"{row['event'][:17]:<17} {row['matcher'][:22]:<22} {row['hook'][:32]:<32} {row['calls']:>6} "
+              f"{row['p50_ms']:>7.0f}ms {row['p95_ms']:>6.0f}ms {row['p99_ms']:>6.0f}ms "
+              f"{row['total_ms'] / 1000:>8.1f}s {row['errors']:>4} {row['avg_output_bytes']:>6.0f}B")
+
+
+def wrap_command(event: str, matcher: str, command: str) -> str:
+    return (f"{PROFILER_COMMAND} run --event {shlex.quote(event)} "
+            f"--matcher {shlex.quote(matcher or '*')} -- {shlex.quote(command)}")
+
+
+def unwrap_command(command: str) -> Optional[str]:
+    """Original command of a wrapped hook, or None if it is not wrapped"""
+    if not command.startswith(PROFILER_COMMAND + " run "):
+        return None
+    return shlex.split(command)[-1]
+
+
+def rewrite_settings(settings_file: Path, wrap: bool) -> int:
+    """Wrap (or unwrap) every hook command in a settings file; returns commands changed"""
+    settings = json.loads(settings_file.read_text())
+    changed = 0
+    for event, entries in settings.get('hooks', {}).items():
+        for entry in entries:
+            for hook in entry.get('hooks', []):
+                if hook.get('type') != 'command':
+                    continue
+                original = unwrap_command(hook['command'])
+                if wrap and original is None:
+                    hook['command'] = wrap_command(event, entry.get('matcher', ''), hook['command'])
+                    changed += 1
+                elif not wrap and original is not None:
+                    hook['command'] = original
+                    changed += 1
+
+    if changed:
+        tmp_path = settings_file.with_name(f".{settings_file.name}.tmp")
+        tmp_path.write_text(json.dumps(settings, indent=2, ensure_ascii=False) + '\n')
+        os.replace(tmp_path, settings_file)
+    return changed
+
+
+def measure_startup(python: List[str], script: Optional[Path], runs: int) -> List[float]:
+    """Sorted wall times (ms) of starting the interpreter and, if given, loading one entry point"""
+    argv = python + (['-c', IMPORT_SNIPPET, str(script)] if script else ['-c', 'pass'])
+    # One untimed run warms the OS page cache and the launcher's environment cache
+    subprocess.run(argv, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = subprocess.run(argv, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        times.append((time.perf_counter() - started) * 1000)
+        if result.returncode != 0:
+            raise RuntimeError(f"{script or 'interpreter'}: {result.stderr.decode(errors='replace').strip()[-300:]}")
+    return sorted(times)
+
+
+def check_startup(python: List[str], runs: int, budget_ms: float, baseline: bool = False) -> bool:
+    """Print per-entry-point startup times; returns False if any median is over budget"""
+    root = Path(__file__).resolve().parent.parent
+    targets = [('interpreter', None)]
+    targets += [(name, root / name) for name in STARTUP_ENTRY_POINTS if (root / name).exists()]
+    rows = []
+    uv_path = shutil.which('uv') if baseline else None
+    if uv_path:
+        rows.append(('uv run python (baseline)', measure_startup([uv_path, 'run', 'python'], None, runs), False))
+
+    within = True
+    for name, script in targets:
+        try:
+            times = measure_startup(python, script, runs)
+        except RuntimeError as e:
+            print(f"⚠️  {e}")
+            within = False
+            continue
+        over = percentile(times, 50) > budget_ms
+        within = within and not over
+        rows.append((name, times, over))
+
+    print(f"Interpreter: {' '.join(python)}  ({runs} runs, budget {budget_ms:g}ms)")
+    print(f"{'ENTRY POINT':<36} {'P50':>8} {'MAX':>8}")
+    for name, times, over in rows:
+        print(f"{name:<36} {percentile(times, 50):>6.1f}ms {times[-1]:>6.1f}ms{'  OVER BUDGET' if over else ''}")
+    return within
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Profile Claude Code hook latency")
+    subparsers = parser.add_subparsers(dest="action", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run and time one hook command")
+    run_parser.add_argument("--event", required=True)
+    run_parser.add_argument("--matcher", default="*")
+    run_parser.add_argument("--name", help="Hook name (derived from the command by default)")
+    run_parser.add_argument("command", help="Hook command, run through the shell")
+
+    report_parser = subparsers.add_parser("report", help="Latency percentiles per hook and matcher")
+    report_parser.add_argument("--hours", type=float, help="Only invocations from the last N hours")
+    report_parser.add_argument("--event", help="Only this hook event")
+    report_parser.add_argument("--json", action="store_true", help="Machine-readable output")
+
+    for name in ("install", "uninstall"):
+        sub = subparsers.add_parser(name, help=f"{'Wrap' if name == 'install' else 'Unwrap'} every hook in settings.json")
+        sub.add_argument("settings", nargs="?", default=str(SETTINGS_FILE))
+
+    subparsers.add_parser("reset", help="Discard recorded invocations")
+
+    startup_parser = subparsers.add_parser("startup", help="Check hook entry point startup time against a budget")
+    startup_parser.add_argument("--runs", type=int, default=10)
+    startup_parser.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS)
+    startup_parser.add_argument("--python", help="Interpreter command (default: warm launcher if installed)")
+    startup_parser.add_argument("--baseline", action="store_true", help="Also time plain `uv run python`")
+
+    args = parser.parse_args()
+
+    if args.action == "run":
+        sys.exit(run_hook(args.event, args.matcher, args.command, args.name))
+
+    elif args.action == "report":
+        since = time.time() - args.hours * 3600 if args.hours else None
+        records = load_records(since)
+        if args.event:
+            records = [r for r in records if r['event'] == args.event]
+        rows = summarize(records)
+        if args.json:
+            print(json.dumps(rows, indent=2))
+        else:
+            print_report(rows)
+
+    elif args.action in ("install", "uninstall"):
+        changed = rewrite_settings(Path(args.settings), wrap=args.action == "install")
+        print(f"{'Wrapped' if args.action == 'install' else 'Unwrapped'} {changed} hook commands in {args.settings}")
+
+    elif args.action == "reset":
+        for path in (PROFILE_FILE, PROFILE_FILE.with_suffix('.tsv.1')):
+            path.unlink(missing_ok=True)
+        print("Hook profile cleared")
+
+    elif args.action == "startup":
+        if args.python:
+            python = shlex.split(args.python)
+        elif os.access(WARM_PYTHON, os.X_OK):
+            python = [str(WARM_PYTHON)]
+        else:
+            python = [sys.executable]
+        sys.exit(0 if check_startup(python, args.runs, args.budget_ms, args.baseline) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,21 +5,304 @@ Automatically stores comprehensive session documentation to graphiti-memory
 """
 
 import json
+import re
+import hashlib
 import sys
 import subprocess
 import os
+from collections import Counter, OrderedDict, deque
 from datetime import datetime
 from pathlib import Path
 
+# Transcript window sizes; memory use is bounded by these regardless of session length
+HEAD_CHARS = 2000
+TAIL_CHARS = 4000
+MAX_SALIENT_ITEMS = 20
+MAX_FILES_TOUCHED = 50
+MAX_LINE_BYTES = 1 << 20
+
+# graphiti_ingest.py lives next to the hooks/ directory
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+SESSION_MEMORY_DIR = Path.home() / ".claude" / "session-memories"
+CHECKPOINT_DIR = SESSION_MEMORY_DIR / "checkpoints"
+CHECKPOINT_MAX_AGE_DAYS = 30
+
+ERROR_PATTERN = re.compile(r'Traceback|Exception|\bError\b|\bFAILED\b|exit code:? [1-9]', re.IGNORECASE)
+PATH_PATTERN = re.compile(r'(?:~|\.{0,2}/)?(?:[\w.-]+/)+[\w.-]+\.\w{1,6}\b')
+FILE_INPUT_KEYS = ('file_path', 'path', 'notebook_path')
+
+
+class TranscriptDigest:
+    """Incrementally digests a transcript, keeping only bounded windows and salient items"""
+    
+    def __init__(self):
+        self.head = []
+        self.head_chars = 0
+        self.tail = deque()
+        self.tail_chars = 0
+        self.errors = deque(maxlen=MAX_SALIENT_ITEMS)
+        self.tool_calls = deque(maxlen=MAX_SALIENT_ITEMS)
+        self.tool_counts = Counter()
+        self.files_touched = OrderedDict()
+        self.lines = 0
+        self.bytes = 0
+    
+    def feed_stream(self, stream, complete_lines_only: bool = False) -> int:
+        """Consume a binary stream line by line without holding it in memory.
+        
+        Returns the number of bytes consumed. With complete_lines_only, a trailing
+        line that is still being written (no newline yet) is left unconsumed.
+        """
+        consumed = 0
+        while True:
+            line = stream.readline(MAX_LINE_BYTES)
+            if not line:
+                break
+            line_bytes = len(line)
+            if not line.endswith(b'\n'):
+                # Oversized or unterminated line: keep the first chunk, discard the remainder
+                terminated = False
+                while True:
+                    rest = stream.readline(MAX_LINE_BYTES)
+                    line_bytes += len(rest)
+                    if not rest or rest.endswith(b'\n'):
+                        terminated = bool(rest)
+                        break
+                if complete_lines_only and not terminated:
+                    break
+            consumed += line_bytes
+            self.bytes += line_bytes
+            self.feed_line(line.decode('utf-8', errors='replace'))
+        return consumed
+    
+    def feed_line(self, line: str):
+        """Digest one transcript line (JSONL entry or plain text)"""
+        self.lines += 1
+        line = line.rstrip('\n')
+        if not line.strip():
+            return
+            
+        entry = None
+        if line.startswith('{'):
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                entry = None
+                
+        if isinstance(entry, dict):
+            self.feed_entry(entry)
+        else:
+            self.add_text(line)
+    
+    def feed_entry(self, entry: dict):
+        """Digest a structured transcript entry"""
+        message = entry.get('message', entry)
+        role = message.get('role') or entry.get('type', '')
+        content = message.get('content', '')
+        
+        if isinstance(content, str):
+            self.add_text(f"{role}: {content}" if role else content)
+            return
+        if not isinstance(content, list):
+            return
+            
+        for block in content:
+            if not isinstance(block, dict):
+                continue
+            block_type = block.get('type')
+            
+            if block_type == 'text':
+                self.add_text(f"{role}: {block.get('text', '')}" if role else block.get('text', ''))
+            elif block_type == 'tool_use':
+                self.add_tool_call(block.get('name', 'unknown'), block.get('input') or {})
+            elif block_type == 'tool_result' and block.get('is_error'):
+                result = block.get('content', '')
+                if isinstance(result, list):
+                    result = ' '.join(b.get('text', '') for b in result if isinstance(b, dict))
+                self.errors.append(str(result)[:300])
+    
+    def add_text(self, text: str):
+        """Add free text to the head/tail windows and scan it for salient items"""
+        if self.head_chars < HEAD_CHARS:
+            piece = text[:HEAD_CHARS - self.head_chars]
+            self.head.append(piece)
+            self.head_chars += len(piece)
+            
+        text = text[-TAIL_CHARS:]
+        self.tail.append(text)
+        self.tail_chars += len(text)
+        while self.tail_chars > TAIL_CHARS and len(self.tail) > 1:
+            self.tail_chars -= len(self.tail.popleft())
+            
+        for line in text.splitlines():
+            if ERROR_PATTERN.search(line):
+                self.errors.append(line.strip()[:300])
+        for path in PATH_PATTERN.findall(text):
+            self.touch_file(path)
+    
+    def add_tool_call(self, name: str, tool_input: dict):
+        """Record a tool invocation and any files it touched"""
+        self.tool_counts[name] += 1
+        target = next((tool_input[k] for k in FILE_INPUT_KEYS if isinstance(tool_input.get(k), str)), None)
+        if target:
+            self.touch_file(target)
+        detail = target or str(tool_input.get('command') or tool_input.get('pattern') or '')
+        self.tool_calls.append(f"{name}: {detail[:120]}" if detail else name)
+    
+    def touch_file(self, path: str):
+        """Track a file in a bounded most-recently-touched set"""
+        self.files_touched.pop(path, None)
+        self.files_touched[path] = True
+        if len(self.files_touched) > MAX_FILES_TOUCHED:
+            self.files_touched.popitem(last=False)
+    
+    def is_empty(self) -> bool:
+        return self.lines == 0
+    
+    def render(self, head_title: str = "Session Start") -> str:
+        """Render the digest as markdown for the session document"""
+        if self.is_empty():
+            return "No conversation content captured"
+            
+        sections = [f"*{self.lines} transcript lines, {self.bytes} bytes processed*", "",
+                    f"### {head_title}", '\n'.join(self.head).strip()]
+        
+        if self.tool_counts:
+            counts = ', '.join(f"{name} ({count})" for name, count in self.tool_counts.most_common())
+            sections += ["", "### Tool Calls", counts]
+            sections += [f"- {call}" for call in self.tool_calls]
+        if self.files_touched:
+            sections += ["", "### Files Touched"] + [f"- {path}" for path in self.files_touched]
+        if self.errors:
+            sections += ["", "### Errors"] + [f"- {error}" for error in self.errors]
+            
+        sections += ["", "### Most Recent Activity", '\n'.join(self.tail).strip()]
+        return '\n'.join(sections)
+
+
+class SessionCheckpoint:
+    """Per-session progress through a transcript file, so each trigger only digests new content"""
+    
+    def __init__(self, session_id: str, transcript_path: str):
+        safe_id = re.sub(r'[^\w.-]', '_', session_id)
+        self.path = CHECKPOINT_DIR / f"{safe_id}.json"
+        self.transcript_path = transcript_path
+        self.state = self.load()
+    
+    def load(self) -> dict:
+        """Load the checkpoint, or start a new one"""
+        try:
+            state = json.loads(self.path.read_text())
+            if state.get('transcript_path') == self.transcript_path:
+                return state
+        except (OSError, ValueError):
+            pass
+        return {
+            'transcript_path': self.transcript_path,
+            'inode': None,
+            'offset': 0,
+            'document': None,
+            'updates': 0,
+            'lines': 0,
+            'bytes': 0
+        }
+    
+    @property
+    def document(self):
+        return Path(self.state['document']) if self.state['document'] else None
+    
+    def read_new(self) -> TranscriptDigest:
+        """Digest transcript content appended since the last checkpoint"""
+        stat = os.stat(self.transcript_path)
+        # Start over if the transcript was replaced or truncated
+        if stat.st_ino != self.state['inode'] or stat.st_size < self.state['offset']:
+            self.state['inode'] = stat.st_ino
+            self.state['offset'] = 0
+            
+        digest = TranscriptDigest()
+        with open(self.transcript_path, 'rb') as transcript:
+            transcript.seek(self.state['offset'])
+            consumed = digest.feed_stream(transcript, complete_lines_only=True)
+            
+        self.state['offset'] += consumed
+        self.state['lines'] += digest.lines
+        self.state['bytes'] += digest.bytes
+        return digest
+    
+    def rewind(self):
+        """Forget progress so the next read digests the whole transcript again"""
+        self.state.update(offset=0, document=None, updates=0, lines=0, bytes=0)
+    
+    def save(self, document: Path):
+        """Record progress once the delta has been written"""
+        if self.state['document'] is None:
+            self.prune_stale()
+        self.state['document'] = str(document)
+        self.state['updates'] += 1
+        self.state['updated_at'] = datetime.now().isoformat()
+        
+        CHECKPOINT_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(self.state))
+        os.replace(tmp_path, self.path)
+    
+    @staticmethod
+    def prune_stale():
+        """Drop checkpoints for sessions that ended long ago"""
+        if not CHECKPOINT_DIR.exists():
+            return
+        cutoff = datetime.now().timestamp() - CHECKPOINT_MAX_AGE_DAYS * 86400
+        for path in CHECKPOINT_DIR.glob('*.json'):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                pass
+
+
+def read_transcript(stream):
+    """Digest the hook's stdin.
+    
+    Returns (digest, checkpoint). When stdin is a hook payload with a
+    transcript_path, only transcript content added since the session's last
+    checkpoint is digested and the checkpoint is returned for saving.
+    """
+    digest = TranscriptDigest()
+    first_line = stream.readline(MAX_LINE_BYTES)
+    if not first_line:
+        return digest, None
+        
+    try:
+        payload = json.loads(first_line)
+    except ValueError:
+        payload = None
+        
+    transcript_path = payload.get('transcript_path') if isinstance(payload, dict) else None
+    if transcript_path:
+        transcript_path = os.path.expanduser(transcript_path)
+    if transcript_path and os.path.exists(transcript_path):
+        session_id = payload.get('session_id') or hashlib.sha1(transcript_path.encode()).hexdigest()
+        checkpoint = SessionCheckpoint(session_id, transcript_path)
+        return checkpoint.read_new(), checkpoint
+        
+    # Raw conversation text on stdin
+    digest.bytes += len(first_line)
+    digest.feed_line(first_line.decode('utf-8', errors='replace'))
+    digest.feed_stream(stream)
+    return digest, None
+
+
 def get_session_context():
     """Extract session context from environment and arguments"""
-    # Get the conversation content from stdin if available
-    conversation_content = ""
+    # Digest the conversation from stdin if available
+    transcript = TranscriptDigest()
+    checkpoint = None
     if not sys.stdin.isatty():
         try:
-            conversation_content = sys.stdin.read()
-        except:
-            conversation_content = ""
+            transcript, checkpoint = read_transcript(sys.stdin.buffer)
+        except Exception:
+            pass
     
     # Get current working directory and project context
     cwd = os.getcwd()
@@ -27,6 +310,7 @@ def get_session_context():
     
     # Get git context if available
     git_context = ""
+    git_branch = None
     try:
         git_branch = subprocess.check_output(['git', 'branch', '--show-current'], 
                                            cwd=cwd, stderr=subprocess.DEVNULL).decode().strip()
@@ -40,15 +324,17 @@ def get_session_context():
         "cwd": cwd,
         "project_name": project_name,
         "git_context": git_context,
-        "conversation_content": conversation_content
+        "git_branch": git_branch,
+        "transcript": transcript,
+        "checkpoint": checkpoint
     }
 
 def create_memory_documentation(session_context, hook_type="session_end"):
     """Create comprehensive memory documentation"""
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     
-    # Extract key technical findings and current state from conversation
-    conversation = session_context.get("conversation_content", "")
+    # Bounded digest of the conversation: head, tail, tool calls, files and errors
+    transcript = session_context.get("transcript") or TranscriptDigest()
     
     # Build comprehensive documentation
     documentation = f"""# Claude Code Session Memory - {timestamp}
@@ -115,7 +401,7 @@ def create_memory_documentation(session_context, hook_type="session_end"):
 4. Can continue with any development work in any project directory
 
 ## Conversation Context
-{conversation[:2000] if conversation else "No conversation content captured"}
+{transcript.render()}
 
 ## Anything Else of Importance/Worth Mentioning
 - User has comprehensive MCP setup with memory, search, filesystem, git, and development tools
@@ -127,67 +413,49 @@ def create_memory_documentation(session_context, hook_type="session_end"):
     
     return documentation
 
-def store_to_graphiti_memory(documentation):
+def create_update_documentation(session_context, hook_type="session_end"):
+    """Create an incremental update covering only transcript content since the last trigger"""
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    transcript = session_context["transcript"]
+    state = session_context["checkpoint"].state
+    
+    return f"""
+
+## Update - {timestamp}
+**Hook Trigger:** {hook_type}
+**Git Context:** {session_context['git_context'].replace(chr(10), ' | ')}
+*Update {state['updates'] + 1}; {state['lines']} transcript lines processed in total*
+
+{transcript.render(head_title="Since Last Update")}
+"""
+
+def store_to_graphiti_memory(documentation, backup_file=None, append=False):
     """Store documentation to graphiti-memory MCP server"""
     try:
         print(f"[Memory Hook] Storing session documentation to graphiti-memory...")
         print(f"[Memory Hook] Documentation length: {len(documentation)} characters")
         
         # Save to local file as primary storage for now
-        backup_file = Path.home() / ".claude" / "session-memories" / f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}.md"
+        if backup_file is None:
+            backup_file = SESSION_MEMORY_DIR / f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}.md"
         backup_file.parent.mkdir(exist_ok=True)
-        backup_file.write_text(documentation)
+        if append:
+            with open(backup_file, 'a') as f:
+                f.write(documentation)
+        else:
+            # Write beside and swap in, so /recall never reads a half-written document
+            tmp_file = backup_file.with_name(f".{backup_file.name}.tmp")
+            tmp_file.write_text(documentation)
+            os.replace(tmp_file, backup_file)
         
-        # Try to use the graphiti-memory server via subprocess call
-        # This attempts to store the memory via the MCP server
+        # Hand off to the local ingestion daemon; this is only a local enqueue
         try:
-            # Create a temporary script to interface with graphiti-memory
-            temp_script = Path.home() / ".claude" / "temp_memory_store.py"
-            temp_script.write_text(f'''
-import sys
-import os
-
-project_dir = os.path.join(os.environ['GIT_CLONE_DIR'], "graphiti/mcp_server")
-sys.path.insert(0, project_dir)
-
-# Set environment variables for graphiti
-os.environ["NEO4J_URI"] = "bolt://localhost:7687"
-os.environ["NEO4J_USER"] = "neo4j"
-os.environ["NEO4J_PASSWORD"] = "demodemo"
-if not os.environ.get("OPENAI_API_KEY"):
-    raise ValueError("OPENAI_API_KEY environment variable is required")
-os.environ["MODEL_NAME"] = "gpt-4o-mini"
-
-try:
-    # This would be the actual graphiti memory storage call
-    # For now, we just print success
-    print("[Memory Hook] Successfully interfaced with graphiti-memory concept")
-except Exception as e:
-    print(f"[Memory Hook] Graphiti interface error: {{e}}")
-''')
-            
-            # Run the temp script
-            project_dir = os.path.join(os.environ['GIT_CLONE_DIR'], "graphiti/mcp_server")
-            uv_path = shutil.which("uv")
-            if uv_path is None:
-                print("[Memory Hook] Error: 'uv' executable not found in PATH.")
-                temp_script.unlink()
-                return False
-            result = subprocess.run([uv_path, "run", "--isolated", 
-                                "--directory", project_dir, 
-                                "--project", ".", "python", str(temp_script)], 
-                                capture_output=True, text=True, timeout=10)
-            
-            # Clean up temp script
-            temp_script.unlink()
-            
-            if result.returncode == 0:
-                print(f"[Memory Hook] Graphiti integration successful")
-            else:
-                print(f"[Memory Hook] Graphiti integration failed: {result.stderr}")
-                
+            from graphiti_ingest import submit
+            submit(documentation, source="session-memory",
+                   metadata={'name': f"Session memory {backup_file.stem}", 'document': str(backup_file)})
+            print(f"[Memory Hook] Queued for graphiti ingestion")
         except Exception as e:
-            print(f"[Memory Hook] Graphiti subprocess error: {e}")
+            print(f"[Memory Hook] Graphiti ingestion queue error: {e}")
         
         print(f"[Memory Hook] Documentation saved to: {backup_file}")
         return True
@@ -196,6 +464,36 @@ except Exception as e:
         print(f"[Memory Hook] Error storing session memory: {e}")
         return False
 
+def index_session(session_context, document):
+    """Record the document in the session archive index and run periodic retention"""
+    try:
+        from session_archive import SessionArchive
+        archive = SessionArchive(SESSION_MEMORY_DIR)
+        try:
+            archive.record(document, session_context['project_name'],
+                           session_context['cwd'], session_context['git_branch'])
+            archive.maintain()
+        finally:
+            archive.close()
+    except Exception as e:
+        print(f"[Memory Hook] Session archive error: {e}")
+
+def resume_document(checkpoint):
+    """The checkpoint's document, decompressed again if the archive has gzipped it; None once it is gone"""
+    document = checkpoint.document
+    if document is None or document.exists():
+        return document
+    try:
+        from session_archive import SessionArchive
+        archive = SessionArchive(SESSION_MEMORY_DIR)
+        try:
+            return archive.restore(document.stem)
+        finally:
+            archive.close()
+    except Exception as e:
+        print(f"[Memory Hook] Session archive error: {e}")
+        return None
+
 def main():
     """Main hook execution"""
     try:
@@ -205,11 +503,35 @@ def main():
         # Get session context
         session_context = get_session_context()
         
-        # Create comprehensive documentation
-        documentation = create_memory_documentation(session_context, hook_type)
-        
-        # Store to graphiti-memory
-        success = store_to_graphiti_memory(documentation)
+        checkpoint = session_context["checkpoint"]
+        document = SESSION_MEMORY_DIR / f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}.md"
+        if checkpoint is not None and checkpoint.document is not None and resume_document(checkpoint) is None:
+            # Retention removed the document: rebuild it from the whole transcript
+            checkpoint.rewind()
+            session_context["transcript"] = checkpoint.read_new()
+        if checkpoint is None:
+            # No transcript file to resume from: document everything we were given
+            documentation = create_memory_documentation(session_context, hook_type)
+            success = store_to_graphiti_memory(documentation, document)
+        elif session_context["transcript"].is_empty():
+            print(f"[Memory Hook] No new transcript content since last update")
+            return
+        elif checkpoint.document is None:
+            # First trigger for this session: full document, then remember where it lives
+            documentation = create_memory_documentation(session_context, hook_type)
+            success = store_to_graphiti_memory(documentation, document)
+            if success:
+                checkpoint.save(document)
+        else:
+            # Later triggers (compaction, session end) append only the delta
+            document = checkpoint.document
+            documentation = create_update_documentation(session_context, hook_type)
+            success = store_to_graphiti_memory(documentation, document, append=True)
+            if success:
+                checkpoint.save(document)
+                
+        if success:
+            index_session(session_context, document)
         
         if success:
             print(f"[Memory Hook] Session memory successfully documented at {datetime.now()}")
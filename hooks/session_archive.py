@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Session Memory Archive
+SQLite metadata index over ~/.claude/session-memories with transparent
+gzip compression of older sessions and a retention policy.
+"""
+
+import os
+import re
+import sys
+import gzip
+import shutil
+import sqlite3
+import time
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+SESSION_MEMORY_DIR = Path.home() / ".claude" / "session-memories"
+INDEX_DB = SESSION_MEMORY_DIR / "index.db"
+
+# Retention policy
+COMPRESS_AFTER_DAYS = int(os.environ.get('SESSION_COMPRESS_AFTER_DAYS', '7'))
+RETENTION_DAYS = int(os.environ.get('SESSION_RETENTION_DAYS', '365'))
+MAX_ARCHIVE_BYTES = int(os.environ.get('SESSION_ARCHIVE_MAX_MB', '200')) * 1024 * 1024
+MAINTENANCE_INTERVAL = 24 * 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    name TEXT PRIMARY KEY,
+    file TEXT NOT NULL,
+    project TEXT,
+    cwd TEXT,
+    branch TEXT,
+    started REAL NOT NULL,
+    updated REAL NOT NULL,
+    size INTEGER NOT NULL,
+    compressed INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS sessions_project_updated ON sessions (project, updated);
+CREATE INDEX IF NOT EXISTS sessions_updated ON sessions (updated);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+class SessionArchive:
+    """Index, compress and expire session memory documents"""
+
+    def __init__(self, base_dir: Path = SESSION_MEMORY_DIR):
+        self.base_dir = base_dir
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(base_dir / INDEX_DB.name, timeout=10)
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def record(self, path: Path, project: str, cwd: str, branch: Optional[str]):
+        """Add or refresh a session document in the index"""
+        now = time.time()
+        with self.db:
+            self.db.execute("""
+                INSERT INTO sessions (name, file, project, cwd, branch, started, updated, size, compressed)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0)
+                ON CONFLICT (name) DO UPDATE SET
+                    file = excluded.file, branch = excluded.branch,
+                    updated = excluded.updated, size = excluded.size, compressed = 0
+            """, (path.stem, path.name, project, cwd, branch, now, now, path.stat().st_size))
+
+    def find(self, project: Optional[str] = None, since: Optional[float] = None,
+             until: Optional[float] = None, limit: int = 20) -> List[Dict]:
+        """Sessions matching project and updated-time range, newest first"""
+        clauses, params = [], []
+        if project:
+            clauses.append("project = ?")
+            params.append(project)
+        if since is not None:
+            clauses.append("updated >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("updated <= ?")
+            params.append(until)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self.db.execute(f"SELECT * FROM sessions {where} ORDER BY updated DESC LIMIT ?",
+                               (*params, limit))
+        return [dict(row) for row in rows]
+
+    def last(self, project: str) -> Optional[Dict]:
+        """Most recent session for a project"""
+        sessions = self.find(project=project, limit=1)
+        return sessions[0] if sessions else None
+
+    def read(self, name: str) -> Optional[str]:
+        """Read a session document, decompressing transparently"""
+        row = self.db.execute("SELECT file FROM sessions WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            return None
+        path = self.base_dir / row['file']
+        if path.suffix == '.gz':
+            with gzip.open(path, 'rt') as f:
+                return f.read()
+        return path.read_text()
+
+    def restore(self, name: str) -> Optional[Path]:
+        """Decompress a session document back in place so it can be appended to; None if it is gone"""
+        row = self.db.execute("SELECT file, compressed FROM sessions WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            return None
+        path = self.base_dir / row['file']
+        if not row['compressed']:
+            return path if path.exists() else None
+        target = path.with_suffix('')
+        tmp_path = target.with_name(f".{target.name}.tmp")
+        try:
+            with gzip.open(path, 'rb') as f_in, open(tmp_path, 'wb') as f_out:
+                shutil.copyfileobj(f_in, f_out)
+        except FileNotFoundError:
+            with self.db:
+                self.db.execute("DELETE FROM sessions WHERE name = ?", (name,))
+            return None
+        os.replace(tmp_path, target)
+        with self.db:
+            self.db.execute("UPDATE sessions SET file = ?, size = ?, compressed = 0 WHERE name = ?",
+                            (target.name, target.stat().st_size, name))
+        path.unlink()
+        return target
+
+    def compress_old(self, now: float) -> int:
+        """Gzip documents that have not been updated recently"""
+        cutoff = now - COMPRESS_AFTER_DAYS * 86400
+        rows = self.db.execute("SELECT name, file FROM sessions WHERE compressed = 0 AND updated < ?",
+                               (cutoff,)).fetchall()
+        compressed = 0
+        for row in rows:
+            source = self.base_dir / row['file']
+            target = source.with_name(source.name + '.gz')
+            try:
+                with open(source, 'rb') as f_in, gzip.open(target, 'wb') as f_out:
+                    shutil.copyfileobj(f_in, f_out)
+            except FileNotFoundError:
+                with self.db:
+                    self.db.execute("DELETE FROM sessions WHERE name = ?", (row['name'],))
+                continue
+            with self.db:
+                self.db.execute("UPDATE sessions SET file = ?, size = ?, compressed = 1 WHERE name = ?",
+                                (target.name, target.stat().st_size, row['name']))
+            source.unlink()
+            compressed += 1
+        return compressed
+
+    def expire(self, now: float) -> int:
+        """Delete sessions past the retention age, then oldest-first until under the size cap"""
+        expired = self.db.execute("SELECT name, file FROM sessions WHERE updated < ?",
+                                  (now - RETENTION_DAYS * 86400,)).fetchall()
+
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM sessions WHERE updated >= ?",
+                                (now - RETENTION_DAYS * 86400,)).fetchone()[0]
+        if total > MAX_ARCHIVE_BYTES:
+            for row in self.db.execute("SELECT name, file, size FROM sessions WHERE updated >= ? "
+                                       "ORDER BY updated", (now - RETENTION_DAYS * 86400,)).fetchall():
+                if total <= MAX_ARCHIVE_BYTES:
+                    break
+                expired.append(row)
+                total -= row['size']
+
+        for row in expired:
+            (self.base_dir / row['file']).unlink(missing_ok=True)
+            with self.db:
+                self.db.execute("DELETE FROM sessions WHERE name = ?", (row['name'],))
+        return len(expired)
+
+    def maintain(self, force: bool = False) -> Optional[Dict]:
+        """Index stray files, compress and expire, at most once per MAINTENANCE_INTERVAL unless forced"""
+        now = time.time()
+        row = self.db.execute("SELECT value FROM meta WHERE key = 'last_maintenance'").fetchone()
+        if not force and row and now - float(row['value']) < MAINTENANCE_INTERVAL:
+            return None
+
+        result = {
+            'indexed': self.reindex(),
+            'compressed': self.compress_old(now),
+            'expired': self.expire(now)
+        }
+        with self.db:
+            self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('last_maintenance', ?)",
+                            (str(now),))
+        return result
+
+    def reindex(self) -> int:
+        """Index session documents written before the archive existed"""
+        known = {row['file'] for row in self.db.execute("SELECT file FROM sessions")}
+        added = 0
+        for path in sorted(self.base_dir.glob('session_*.md*')):
+            if path.name in known:
+                continue
+            opener = gzip.open if path.suffix == '.gz' else open
+            with opener(path, 'rt') as f:
+                header = f.read(4096)
+            project = re.search(r'^\*\*Project:\*\* (.*)$', header, re.MULTILINE)
+            cwd = re.search(r'^\*\*Working Directory:\*\* (.*)$', header, re.MULTILINE)
+            branch = re.search(r'^Branch: (.*)$', header, re.MULTILINE)
+            mtime = path.stat().st_mtime
+            name = path.name.split('.')[0]
+            with self.db:
+                self.db.execute("""
+                    INSERT OR IGNORE INTO sessions (name, file, project, cwd, branch, started, updated, size, compressed)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (name, path.name, project and project.group(1), cwd and cwd.group(1),
+                      branch and branch.group(1), mtime, mtime, path.stat().st_size,
+                      int(path.suffix == '.gz')))
+            added += 1
+        return added
+
+
+def parse_date(value: str) -> float:
+    """Parse YYYY-MM-DD[THH:MM] into a timestamp"""
+    return datetime.fromisoformat(value).timestamp()
+
+
+# CLI interface
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: session_archive.py {last <project>|list [project] [since] [until]|show <name>|maintain|reindex}")
+        sys.exit(1)
+
+    action = sys.argv[1]
+
+    with closing(SessionArchive()) as archive:
+        if action == "last" and len(sys.argv) >= 3:
+            session = archive.last(sys.argv[2])
+            if session is None:
+                print(f"No sessions recorded for {sys.argv[2]}")
+                sys.exit(1)
+            print(archive.read(session['name']))
+
+        elif action == "list":
+            project = sys.argv[2] if len(sys.argv) > 2 and sys.argv[2] != '-' else None
+            since = parse_date(sys.argv[3]) if len(sys.argv) > 3 else None
+            until = parse_date(sys.argv[4]) if len(sys.argv) > 4 else None
+            for session in archive.find(project, since, until, limit=100):
+                updated = datetime.fromtimestamp(session['updated']).strftime('%Y-%m-%d %H:%M')
+                marker = " (gz)" if session['compressed'] else ""
+                print(f"{updated}  {session['project']:<25} {session['branch'] or '-':<20} "
+                      f"{session['size']:>8}B  {session['name']}{marker}")
+
+        elif action == "show" and len(sys.argv) >= 3:
+            content = archive.read(sys.argv[2])
+            if content is None:
+                print(f"Session not found: {sys.argv[2]}")
+                sys.exit(1)
+            print(content)
+
+        elif action == "maintain":
+            print(archive.maintain(force=True))
+
+        elif action == "reindex":
+            print(f"Indexed {archive.reindex()} existing sessions")
+
+        else:
+            print(f"Unknown action: {action}")
+            sys.exit(1)
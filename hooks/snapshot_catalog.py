@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Architecture Snapshot Catalog
+Keeps an index of snapshots per project and compacts old snapshots into
+delta-encoded, gzip-compressed archives that can still be reconstructed.
+"""
+
+import os
+import sys
+import json
+import gzip
+import copy
+import fcntl
+import hashlib
+import re
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+CATALOG_VERSION = 1
+# Number of most recent snapshots kept as plain JSON files
+KEEP_FULL_SNAPSHOTS = int(os.environ.get('SNAPSHOT_KEEP_FULL', '4'))
+# Store a full copy in the archive every N entries to bound reconstruction cost
+ARCHIVE_KEYFRAME_INTERVAL = 20
+# Catalog entries kept per project; older archived ones are only listed from the archive itself
+MAX_HISTORY_ENTRIES = int(os.environ.get('SNAPSHOT_CATALOG_HISTORY', '100'))
+
+
+def snapshot_hash(snapshot: Dict) -> str:
+    """Content hash of a snapshot, independent of formatting and key order"""
+    canonical = json.dumps(snapshot, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def diff_documents(old, new, path: Tuple = ()) -> List:
+    """Compute a list of set/del operations turning old into new"""
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops = [['del', list(path + (key,))] for key in old if key not in new]
+        for key, value in new.items():
+            if key not in old:
+                ops.append(['set', list(path + (key,)), value])
+            elif old[key] != value:
+                ops.extend(diff_documents(old[key], value, path + (key,)))
+        return ops
+
+    if old != new:
+        return [['set', list(path), new]]
+    return []
+
+
+def apply_delta(doc, ops: List):
+    """Apply operations produced by diff_documents"""
+    doc = copy.deepcopy(doc)
+    for op, path, *value in ops:
+        if not path:
+            doc = copy.deepcopy(value[0])
+            continue
+
+        target = doc
+        for key in path[:-1]:
+            target = target[key]
+
+        if op == 'set':
+            target[path[-1]] = copy.deepcopy(value[0])
+        else:
+            del target[path[-1]]
+    return doc
+
+
+class SnapshotCatalog:
+    """Index of architecture snapshots plus retention/compaction"""
+
+    def __init__(self, snapshot_dir: Path):
+        self.snapshot_dir = snapshot_dir
+        self.catalog_file = snapshot_dir / "catalog.json"
+        # Small side index so the per-run schedule check never parses the full catalog
+        self.latest_file = snapshot_dir / "latest.json"
+        self.lock_file = snapshot_dir / "catalog.lock"
+        self.archive_dir = snapshot_dir / "archive"
+
+    @contextmanager
+    def locked(self):
+        """Serialize catalog updates across concurrent snapshot processes"""
+        self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_file, 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def load(self) -> Dict:
+        """Load the catalog, or an empty one"""
+        try:
+            catalog = json.loads(self.catalog_file.read_text())
+            if catalog.get('version') == CATALOG_VERSION:
+                return catalog
+        except (OSError, ValueError):
+            pass
+        return {'version': CATALOG_VERSION, 'projects': {}}
+
+    def save(self, catalog: Dict):
+        """Atomically replace the catalog file and the latest-entry index"""
+        for entry in catalog['projects'].values():
+            excess = len(entry['history']) - MAX_HISTORY_ENTRIES
+            if excess > 0:
+                # Oldest archived entries go first; live snapshots always stay listed
+                drop = {id(e) for e in [e for e in entry['history'] if e['archived']][:excess]}
+                entry['history'] = [e for e in entry['history'] if id(e) not in drop]
+
+        tmp_file = self.catalog_file.with_suffix('.tmp')
+        tmp_file.write_text(json.dumps(catalog, indent=2))
+        os.replace(tmp_file, self.catalog_file)
+
+        latest = {project: entry['latest'] for project, entry in catalog['projects'].items() if entry.get('latest')}
+        tmp_file = self.latest_file.with_suffix('.tmp')
+        tmp_file.write_text(json.dumps(latest, separators=(',', ':')))
+        os.replace(tmp_file, self.latest_file)
+
+    def scan_existing(self, project: str) -> List[Dict]:
+        """Index snapshot files written before the catalog existed"""
+        name_re = re.compile(rf'^{re.escape(project)}_(\d{{8}}_\d{{6}})\.json$')
+        history = []
+
+        for path in self.snapshot_dir.glob(f"{project}_*.json"):
+            match = name_re.match(path.name)
+            if not match:
+                continue
+            try:
+                snapshot = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            history.append({
+                'file': path.name,
+                'timestamp': snapshot.get('timestamp'),
+                'created': datetime.strptime(match.group(1), '%Y%m%d_%H%M%S').timestamp(),
+                'sha256': snapshot_hash(snapshot),
+                'archived': False
+            })
+
+        history.sort(key=lambda e: e['created'])
+        return history
+
+    def latest(self, project: str) -> Optional[Dict]:
+        """Latest snapshot entry for a project, without listing the directory"""
+        try:
+            index = json.loads(self.latest_file.read_text())
+        except (OSError, ValueError):
+            index = {}
+        if project in index:
+            return index[project]
+
+        entry = self.load()['projects'].get(project)
+        if entry is None:
+            # One-time migration for projects snapshotted before the catalog existed
+            with self.locked():
+                catalog = self.load()
+                entry = catalog['projects'].get(project)
+                if entry is None:
+                    history = self.scan_existing(project)
+                    if not history:
+                        return None
+                    entry = {'latest': history[-1], 'history': history}
+                    catalog['projects'][project] = entry
+                    self.save(catalog)
+        return entry['latest']
+
+    def record(self, project: str, filepath: Path, snapshot: Dict, created: datetime) -> Dict:
+        """Register a newly written snapshot as the project's latest"""
+        record = {
+            'file': filepath.name,
+            'timestamp': snapshot.get('timestamp'),
+            'created': created.timestamp(),
+            'sha256': snapshot_hash(snapshot),
+            'archived': False
+        }
+
+        with self.locked():
+            catalog = self.load()
+            entry = catalog['projects'].get(project)
+            if entry is None:
+                entry = {'history': self.scan_existing(project)}
+                catalog['projects'][project] = entry
+            entry['history'] = [e for e in entry['history'] if e['file'] != record['file']]
+            entry['history'].append(record)
+            entry['latest'] = record
+            self.save(catalog)
+
+        return record
+
+    def archive_path(self, project: str) -> Path:
+        """Compressed delta archive for a project"""
+        return self.archive_dir / f"{project}.jsonl.gz"
+
+    def iter_archive(self, project: str) -> Iterator[Tuple[Dict, Dict]]:
+        """Yield (archive entry, reconstructed snapshot) in chronological order"""
+        path = self.archive_path(project)
+        if not path.exists():
+            return
+
+        current = None
+        # Appended gzip members are read back as one stream
+        with gzip.open(path, 'rt') as f:
+            for line in f:
+                entry = json.loads(line)
+                if 'base' in entry:
+                    current = entry['base']
+                else:
+                    current = apply_delta(current, entry['delta'])
+                yield entry, current
+
+    def archive_entries(self, project: str, exclude=()) -> List[Dict]:
+        """Archived snapshot records, read without reconstructing the snapshots"""
+        path = self.archive_path(project)
+        if not path.exists():
+            return []
+        with gzip.open(path, 'rt') as f:
+            entries = [json.loads(line) for line in f]
+        return [{'file': e['file'], 'timestamp': e['timestamp'], 'sha256': e.get('sha256', ''), 'archived': True}
+                for e in entries if e['file'] not in exclude]
+
+    def load_snapshot(self, project: str, filename: str) -> Optional[Dict]:
+        """Load any historical snapshot, reconstructing it from the archive if needed"""
+        path = self.snapshot_dir / filename
+        if path.exists():
+            return json.loads(path.read_text())
+
+        for entry, snapshot in self.iter_archive(project):
+            if entry['file'] == filename:
+                if entry.get('sha256') and snapshot_hash(snapshot) != entry['sha256']:
+                    raise ValueError(f"Archived snapshot {filename} failed hash verification")
+                return snapshot
+        return None
+
+    def trim_archive(self, project: str, committed: Optional[int]):
+        """Cut off anything past the size the catalog last recorded: the torn tail of a crashed append"""
+        path = self.archive_path(project)
+        if committed is not None and path.exists() and path.stat().st_size > committed:
+            os.truncate(path, committed)
+
+    def append_member(self, project: str, text: str) -> int:
+        """Append one gzip member holding `text` with a single write; returns the new archive size"""
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        member = gzip.compress(text.encode())
+        fd = os.open(self.archive_path(project), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, member)
+            os.fsync(fd)
+            return os.fstat(fd).st_size
+        finally:
+            os.close(fd)
+
+    def compact(self, project: str, keep_full: int = KEEP_FULL_SNAPSHOTS) -> int:
+        """Move all but the newest keep_full snapshots into the delta archive"""
+        with self.locked():
+            catalog = self.load()
+            entry = catalog['projects'].get(project)
+            if entry is None:
+                return 0
+
+            live = [e for e in entry['history'] if not e['archived']]
+            to_archive = live[:max(len(live) - keep_full, 0)]
+            if not to_archive:
+                return 0
+
+            self.trim_archive(project, entry.get('archive_bytes'))
+            previous = None
+            since_keyframe = 0
+            for archived_entry, snapshot in self.iter_archive(project):
+                previous = snapshot
+                since_keyframe = 0 if 'base' in archived_entry else since_keyframe + 1
+
+            lines = []
+            archived = []
+            unreadable = []
+            for record in to_archive:
+                try:
+                    snapshot = json.loads((self.snapshot_dir / record['file']).read_text())
+                except (OSError, ValueError):
+                    # Deleted or corrupt: nothing left to archive, so stop listing it
+                    unreadable.append(record)
+                    continue
+
+                line = {'file': record['file'], 'timestamp': record['timestamp'],
+                        'sha256': record['sha256']}
+                if previous is None or since_keyframe + 1 >= ARCHIVE_KEYFRAME_INTERVAL:
+                    line['base'] = snapshot
+                    since_keyframe = 0
+                else:
+                    line['delta'] = diff_documents(previous, snapshot)
+                    since_keyframe += 1
+                lines.append(json.dumps(line, separators=(',', ':')) + '\n')
+
+                previous = snapshot
+                archived.append(record)
+
+            if lines:
+                entry['archive_bytes'] = self.append_member(project, ''.join(lines))
+            for record in archived:
+                record['archived'] = True
+            dropped = {id(record) for record in unreadable}
+            entry['history'] = [e for e in entry['history'] if id(e) not in dropped]
+            self.save(catalog)
+
+        # Only drop the JSON files once the archive and catalog are durable
+        for record in archived:
+            (self.snapshot_dir / record['file']).unlink(missing_ok=True)
+
+        return len(archived)
+
+
+# CLI interface
+if __name__ == "__main__":
+    snapshot_dir = Path.home() / ".claude" / "architecture-snapshots"
+    catalog = SnapshotCatalog(snapshot_dir)
+
+    if len(sys.argv) < 2:
+        print("Usage: snapshot_catalog.py {list <project>|show <project> <file>|compact [project]}")
+        sys.exit(1)
+
+    action = sys.argv[1]
+
+    if action == "list" and len(sys.argv) >= 3:
+        catalog.latest(sys.argv[2])
+        entry = catalog.load()['projects'].get(sys.argv[2], {'history': []})
+        listed = {record['file'] for record in entry['history']}
+        older = catalog.archive_entries(sys.argv[2], exclude=listed)
+        for record in older + entry['history']:
+            location = "archive" if record['archived'] else "full"
+            print(f"{record['file']}  {record['timestamp']}  {record['sha256'][:12]}  {location}")
+
+    elif action == "show" and len(sys.argv) >= 4:
+        snapshot = catalog.load_snapshot(sys.argv[2], sys.argv[3])
+        if snapshot is None:
+            print(f"Snapshot not found: {sys.argv[3]}", file=sys.stderr)
+            sys.exit(1)
+        print(json.dumps(snapshot, indent=2))
+
+    elif action == "compact":
+        projects = sys.argv[2:] or list(catalog.load()['projects'])
+        for project in projects:
+            print(f"{project}: archived {catalog.compact(project)} snapshots")
+
+    else:
+        print(f"Unknown action: {action}")
+        sys.exit(1)
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Technology Detectors
+Registry of manifest parsers used by architecture snapshots, with results
+cached by manifest content hash in the shared file metadata cache.
+"""
+
+import re
+import json
+import fnmatch
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11: the TOML detectors are skipped
+    tomllib = None
+
+# Dependency name -> technology, per ecosystem
+NPM_TECHNOLOGIES = {
+    'react': 'React',
+    'vue': 'Vue',
+    'angular': 'Angular',
+    '@angular/core': 'Angular',
+    'svelte': 'Svelte',
+    'next': 'Next.js',
+    'nuxt': 'Nuxt',
+    'express': 'Express',
+    '@nestjs/core': 'NestJS',
+    'fastify': 'Fastify',
+    'typescript': 'TypeScript',
+    'tailwindcss': 'TailwindCSS',
+    'vite': 'Vite',
+    'webpack': 'Webpack',
+    'jest': 'Jest',
+    'vitest': 'Vitest',
+    'prisma': 'Prisma',
+    'mongoose': 'MongoDB',
+    'graphql': 'GraphQL',
+}
+
+PYTHON_TECHNOLOGIES = {
+    'fastapi': 'FastAPI',
+    'flask': 'Flask',
+    'django': 'Django',
+    # Known Graphiti distributions; extras such as graphiti-core[falkordb] are stripped by requirement_name
+    'graphiti': 'Graphiti',
+    'graphiti-core': 'Graphiti',
+    'sqlalchemy': 'SQLAlchemy',
+    'pydantic': 'Pydantic',
+    'celery': 'Celery',
+    'pytest': 'pytest',
+    'langchain': 'LangChain',
+    'openai': 'OpenAI',
+    'neo4j': 'Neo4j',
+    'pymongo': 'MongoDB',
+    'numpy': 'NumPy',
+    'pandas': 'pandas',
+    'torch': 'PyTorch',
+}
+
+GO_TECHNOLOGIES = {
+    'github.com/gin-gonic/gin': 'Gin',
+    'github.com/labstack/echo': 'Echo',
+    'github.com/gofiber/fiber': 'Fiber',
+    'google.golang.org/grpc': 'gRPC',
+    'gorm.io/gorm': 'GORM',
+}
+
+RUST_TECHNOLOGIES = {
+    'actix-web': 'Actix',
+    'axum': 'Axum',
+    'rocket': 'Rocket',
+    'tokio': 'Tokio',
+    'serde': 'Serde',
+    'diesel': 'Diesel',
+}
+
+JVM_TECHNOLOGIES = {
+    'spring-boot': 'Spring Boot',
+    'quarkus': 'Quarkus',
+    'micronaut': 'Micronaut',
+    'junit': 'JUnit',
+}
+
+# Kotlin plugin ids in Gradle builds: id("org.jetbrains.kotlin.jvm"), kotlin("jvm"), apply plugin: 'kotlin'
+KOTLIN_PLUGIN = re.compile(r'''org\.jetbrains\.kotlin|\bkotlin\(\s*["'][\w.-]+["']\s*\)|apply\s+plugin:\s*["']kotlin''')
+
+# Bump when a parser's output changes so results cached under the old logic are recomputed
+DETECTOR_VERSION = 2
+
+# filename -> (detector name, parser); wildcard patterns are kept separately
+DETECTORS: Dict[str, tuple] = {}
+PATTERN_DETECTORS: Dict[str, tuple] = {}
+
+Parser = Callable[[bytes], Set[str]]
+
+
+def register_detector(*patterns: str):
+    """Register a parser for manifests matching the given filename patterns"""
+    def decorator(func: Parser) -> Parser:
+        for pattern in patterns:
+            registry = PATTERN_DETECTORS if any(c in pattern for c in '*?[') else DETECTORS
+            registry[pattern] = (func.__name__, func)
+        return func
+    return decorator
+
+
+def find_detector(filename: str) -> Optional[tuple]:
+    """Return (name, parser) for a manifest filename, or None"""
+    detector = DETECTORS.get(filename)
+    if detector is not None:
+        return detector
+    for pattern, detector in PATTERN_DETECTORS.items():
+        if fnmatch.fnmatchcase(filename, pattern):
+            return detector
+    return None
+
+
+def is_manifest(filename: str) -> bool:
+    """Whether the snapshot walk should record this file as a manifest"""
+    return find_detector(filename) is not None
+
+
+def normalize_package(name: str) -> str:
+    """PEP 503 style normalization of a Python distribution name"""
+    return re.sub(r'[-_.]+', '-', name).lower()
+
+
+def requirement_name(requirement: str) -> Optional[str]:
+    """Extract the distribution name from a PEP 508 requirement string"""
+    match = re.match(r'\s*([A-Za-z0-9][A-Za-z0-9._-]*)', requirement)
+    return normalize_package(match.group(1)) if match else None
+
+
+def match_technologies(names, mapping: Dict[str, str]) -> Set[str]:
+    """Map dependency names to technologies"""
+    return {mapping[name] for name in names if name in mapping}
+
+
+@register_detector('package.json')
+def detect_package_json(content: bytes) -> Set[str]:
+    data = json.loads(content)
+    technologies = {'Node.js'}
+    deps = set()
+    for key in ('dependencies', 'devDependencies', 'peerDependencies', 'optionalDependencies'):
+        deps.update((data.get(key) or {}).keys())
+    if data.get('workspaces'):
+        technologies.add('npm workspaces')
+    return technologies | match_technologies(deps, NPM_TECHNOLOGIES)
+
+
+@register_detector('pyproject.toml')
+def detect_pyproject(content: bytes) -> Set[str]:
+    data = tomllib.loads(content.decode())
+    project = data.get('project', {})
+    requirements = list(project.get('dependencies', []))
+    for extra in project.get('optional-dependencies', {}).values():
+        requirements.extend(extra)
+    for group in data.get('dependency-groups', {}).values():
+        requirements.extend(r for r in group if isinstance(r, str))
+
+    names = {requirement_name(r) for r in requirements}
+    poetry = data.get('tool', {}).get('poetry', {})
+    names.update(normalize_package(n) for n in poetry.get('dependencies', {}))
+    names.update(normalize_package(n) for n in poetry.get('dev-dependencies', {}))
+
+    technologies = {'Python'}
+    if poetry:
+        technologies.add('Poetry')
+    return technologies | match_technologies(names, PYTHON_TECHNOLOGIES)
+
+
+@register_detector('requirements*.txt')
+def detect_requirements(content: bytes) -> Set[str]:
+    names = set()
+    for line in content.decode(errors='replace').splitlines():
+        line = line.split('#', 1)[0].strip()
+        # Skip pip options such as -r, -e, --index-url
+        if not line or line.startswith('-'):
+            continue
+        names.add(requirement_name(line))
+    return {'Python'} | match_technologies(names, PYTHON_TECHNOLOGIES)
+
+
+@register_detector('Pipfile')
+def detect_pipfile(content: bytes) -> Set[str]:
+    data = tomllib.loads(content.decode())
+    names = {normalize_package(n) for section in ('packages', 'dev-packages')
+             for n in data.get(section, {})}
+    return {'Python', 'Pipenv'} | match_technologies(names, PYTHON_TECHNOLOGIES)
+
+
+@register_detector('go.mod')
+def detect_go_mod(content: bytes) -> Set[str]:
+    modules = set()
+    in_require = False
+    for line in content.decode(errors='replace').splitlines():
+        line = line.split('//', 1)[0].strip()
+        if line.startswith('require ('):
+            in_require = True
+        elif in_require and line == ')':
+            in_require = False
+        elif in_require and line:
+            modules.add(line.split()[0])
+        elif line.startswith('require '):
+            modules.add(line.split()[1])
+    # Major-version suffixes (e.g. /v4) are not part of the lookup key
+    modules = {re.sub(r'/v\d+$', '', m) for m in modules}
+    return {'Go'} | match_technologies(modules, GO_TECHNOLOGIES)
+
+
+@register_detector('Cargo.toml')
+def detect_cargo(content: bytes) -> Set[str]:
+    data = tomllib.loads(content.decode())
+    crates = set()
+    for section in ('dependencies', 'dev-dependencies', 'build-dependencies'):
+        crates.update(data.get(section, {}))
+    crates.update(data.get('workspace', {}).get('dependencies', {}))
+    return {'Rust'} | match_technologies(crates, RUST_TECHNOLOGIES)
+
+
+@register_detector('pom.xml')
+def detect_pom(content: bytes) -> Set[str]:
+    text = content.decode(errors='replace')
+    artifacts = set(re.findall(r'<artifactId>\s*([^<\s]+)\s*</artifactId>', text))
+    technologies = {'Java', 'Maven'}
+    for artifact in artifacts:
+        technologies.update(tech for key, tech in JVM_TECHNOLOGIES.items() if artifact.startswith(key))
+    return technologies
+
+
+@register_detector('build.gradle', 'build.gradle.kts')
+def detect_gradle(content: bytes) -> Set[str]:
+    text = content.decode(errors='replace')
+    technologies = {'Gradle', 'Java'}
+    if KOTLIN_PLUGIN.search(text):
+        technologies.add('Kotlin')
+    if 'org.springframework.boot' in text:
+        technologies.add('Spring Boot')
+    technologies.update(tech for key, tech in JVM_TECHNOLOGIES.items() if key in text)
+    return technologies
+
+
+@register_detector('Dockerfile', 'Dockerfile.*', '*.dockerfile')
+def detect_dockerfile(content: bytes) -> Set[str]:
+    return {'Docker'}
+
+
+@register_detector('docker-compose.yml', 'docker-compose.yaml', 'compose.yml', 'compose.yaml')
+def detect_compose(content: bytes) -> Set[str]:
+    text = content.decode(errors='replace')
+    technologies = {'Docker', 'Docker Compose'}
+    for image, tech in (('postgres', 'PostgreSQL'), ('redis', 'Redis'),
+                        ('neo4j', 'Neo4j'), ('mongo', 'MongoDB')):
+        if re.search(rf'image:\s*["\']?{image}', text):
+            technologies.add(tech)
+    return technologies
+
+
+if tomllib is None:
+    for _manifest in ('pyproject.toml', 'Pipfile', 'Cargo.toml'):
+        del DETECTORS[_manifest]
+
+
+# Lockfiles are large; their name alone identifies the package manager, so they are never read
+LOCKFILE_TECHNOLOGIES = {
+    'package-lock.json': {'Node.js', 'npm'},
+    'yarn.lock': {'Node.js', 'Yarn'},
+    'pnpm-lock.yaml': {'Node.js', 'pnpm'},
+    'bun.lockb': {'Node.js', 'Bun'},
+    'poetry.lock': {'Python', 'Poetry'},
+    'uv.lock': {'Python', 'uv'},
+    'Pipfile.lock': {'Python', 'Pipenv'},
+    'Cargo.lock': {'Rust'},
+    'go.sum': {'Go'},
+    'Gemfile.lock': {'Ruby', 'Bundler'},
+    'composer.lock': {'PHP', 'Composer'},
+}
+
+for _lockfile, _technologies in LOCKFILE_TECHNOLOGIES.items():
+    DETECTORS[_lockfile] = ('lockfile', lambda content, t=frozenset(_technologies): set(t))
+
+
+def manifest_technologies(cache, path: Path) -> Optional[List[str]]:
+    """Technologies declared by one manifest, parsed once per content hash.
+
+    Returns None for files no detector handles or that cannot be read.
+    """
+    detector = find_detector(path.name)
+    if detector is None:
+        return None
+    name, parser = detector
+    if name == 'lockfile':
+        return sorted(LOCKFILE_TECHNOLOGIES[path.name]) if path.is_file() else None
+    meta = cache.describe(path)
+    if meta is None:
+        return None
+    return cache.feature(meta, f"tech:{name}:v{DETECTOR_VERSION}", lambda content: sorted(parser(content)))
+
+
+class TechnologyDetector:
+    """Runs registered detectors over manifests, reusing the shared file metadata cache"""
+
+    def __init__(self, cache, log: Callable[[str], None] = print):
+        self.cache = cache
+        self.log = log
+        self.hits = 0
+        self.misses = 0
+
+    def detect(self, project_path: Path, manifests: List[str]) -> Dict[str, List[str]]:
+        """Detect technologies from manifest paths (relative to project_path).
+
+        Returns a mapping of technology -> manifests it was found in.
+        """
+        sources: Dict[str, List[str]] = {}
+        hits, misses = self.cache.feature_hits, self.cache.feature_misses
+
+        for rel_path in sorted(manifests):
+            try:
+                technologies = manifest_technologies(self.cache, project_path / rel_path)
+            except Exception as e:
+                self.log(f"Error detecting technologies in {rel_path}: {e}")
+                continue
+            for tech in technologies or []:
+                sources.setdefault(tech, []).append(rel_path)
+
+        self.hits = self.cache.feature_hits - hits
+        self.misses = self.cache.feature_misses - misses
+        return sources
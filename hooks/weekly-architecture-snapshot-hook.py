@@ -7,25 +7,102 @@ Creates periodic snapshots of project architecture for memory and documentation.
 import os
 import sys
 import json
+import fcntl
+import shutil
+import signal
 import subprocess
 import hashlib
+import argparse
+import tempfile
+import time
+import multiprocessing
+from multiprocessing.connection import wait
+from contextlib import nullcontext
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional, Set
 
+from file_metadata_cache import FileMetadataCache
+from snapshot_catalog import SnapshotCatalog
+from tech_detectors import TechnologyDetector, is_manifest
+
 # Configuration
 SNAPSHOT_DIR = Path.home() / ".claude" / "architecture-snapshots"
 GRAPHITI_HOOK = Path.home() / ".claude" / "graphiti-hook.sh"
 LOG_FILE = Path.home() / ".claude" / "architecture-snapshot.log"
+MANIFEST_DIR = SNAPSHOT_DIR / "manifests"
+MANIFEST_VERSION = 2
+
+# Directory walk patterns
+IGNORE_DIRS = {'.git', 'node_modules', '__pycache__', '.venv', 'dist', 'build', '.next'}
+IGNORE_SUFFIXES = ('.log', '.pyc', '.map')
+KEY_FILES = {'package.json', 'pyproject.toml', 'Dockerfile', 'docker-compose.yml',
+             'requirements.txt', 'README.md', 'tsconfig.json', '.env.example'}
+
+# Limits used when snapshotting several projects at once
+DEFAULT_IO_JOBS = 4
+DEFAULT_PROJECT_TIMEOUT = 300
+# Grace between SIGTERM and SIGKILL for a timed-out project's process group
+KILL_GRACE_SECONDS = 5
+# Set in runner worker processes to cap concurrent git/filesystem-heavy work
+IO_SLOTS = None
 
 # Force snapshot if environment variable is set
 FORCE_SNAPSHOT = os.environ.get('FORCE_SNAPSHOT', '0') == '1'
+# Ignore the directory manifest and rescan everything
+FULL_SNAPSHOT = os.environ.get('FULL_SNAPSHOT', '0') == '1'
+# Enumerate tracked files from the git index when available (falls back to os.walk)
+USE_GIT_INDEX = os.environ.get('SNAPSHOT_USE_GIT_INDEX', '1') == '1'
+
+def directory_entry(mtime_ns: Optional[int]) -> Dict:
+    """Empty per-directory aggregate as stored in the manifest"""
+    return {"mtime_ns": mtime_ns, "files_by_type": {}, "key_files": [], "manifests": [], "subdirs": []}
+
+
+class IOSlots:
+    """N flock'd slot files; the kernel frees a slot when its holder dies, even if it is killed"""
+    
+    def __init__(self, directory: str, count: int):
+        self.directory = directory
+        self.count = count
+        self.held = None
+    
+    def __enter__(self):
+        while True:
+            for index in range(self.count):
+                slot = open(os.path.join(self.directory, f"slot-{index}"), 'w')
+                try:
+                    fcntl.flock(slot, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    slot.close()
+                    continue
+                self.held = slot
+                return self
+            time.sleep(0.05)
+    
+    def __exit__(self, *exc):
+        self.held.close()
+        self.held = None
+
+
+def io_slot():
+    """Context manager holding one of the runner's IO slots (no-op outside the runner)"""
+    return IO_SLOTS if IO_SLOTS is not None else nullcontext()
+
 
 class ArchitectureSnapshot:
     def __init__(self, project_path: str):
         self.project_path = Path(project_path)
         self.project_name = self.project_path.name
         self.timestamp = datetime.now()
+        self.previous_manifest: Dict = {}
+        self.directories: Dict[str, Dict] = {}
+        self.scanned_dirs = 0
+        self.reused_dirs = 0
+        self.file_backend = "walk"
+        self.catalog = SnapshotCatalog(SNAPSHOT_DIR)
+        self.technology_sources: Dict[str, List[str]] = {}
+        self.tech_cache_hits = 0
         
     def log(self, message: str):
         """Log message to file and stdout if forcing"""
@@ -43,20 +120,214 @@ class ArchitectureSnapshot:
         if FORCE_SNAPSHOT:
             return True
             
-        # Check for last snapshot
-        snapshot_pattern = f"{self.project_name}_*.json"
-        snapshots = list(SNAPSHOT_DIR.glob(snapshot_pattern))
+        # Look up the last snapshot in the catalog
+        latest_snapshot = self.catalog.latest(self.project_name)
         
-        if not snapshots:
+        if not latest_snapshot:
             return True
             
-        # Get most recent snapshot
-        latest_snapshot = max(snapshots, key=lambda p: p.stat().st_mtime)
-        last_modified = datetime.fromtimestamp(latest_snapshot.stat().st_mtime)
+        last_modified = datetime.fromtimestamp(latest_snapshot['created'])
         
         # Create snapshot if more than 7 days old
         return datetime.now() - last_modified > timedelta(days=7)
     
+    def manifest_path(self) -> Path:
+        """Location of the directory manifest for this project"""
+        return MANIFEST_DIR / f"{self.project_name}_manifest.json"
+    
+    def load_manifest(self) -> Dict:
+        """Load the manifest written by the previous snapshot, if usable"""
+        path = self.manifest_path()
+        if FULL_SNAPSHOT or not path.exists():
+            return {}
+            
+        try:
+            manifest = json.loads(path.read_text())
+        except Exception as e:
+            self.log(f"Error reading manifest, doing full scan: {e}")
+            return {}
+            
+        if (manifest.get('version') != MANIFEST_VERSION
+                or manifest.get('project_path') != str(self.project_path)):
+            return {}
+        return manifest
+    
+    def save_manifest(self, snapshot: Dict):
+        """Persist directory mtimes and per-directory aggregates for the next run"""
+        MANIFEST_DIR.mkdir(parents=True, exist_ok=True)
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "project_path": str(self.project_path),
+            "timestamp": snapshot["timestamp"],
+            "technologies": snapshot["technologies"],
+            "directories": self.directories
+        }
+        
+        path = self.manifest_path()
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+    
+    def scan_directory(self, abs_dir: Path, rel_dir: str, mtime_ns: int) -> Dict:
+        """List a single directory and aggregate its files"""
+        entry = directory_entry(mtime_ns)
+        
+        try:
+            with os.scandir(abs_dir) as it:
+                for item in it:
+                    if item.is_dir():
+                        # Symlinked directories are not followed, matching os.walk
+                        if item.name not in IGNORE_DIRS and not item.is_symlink():
+                            entry["subdirs"].append(item.name)
+                        continue
+                        
+                    if item.name.endswith(IGNORE_SUFFIXES):
+                        continue
+                        
+                    suffix = os.path.splitext(item.name)[1].lower()
+                    entry["files_by_type"][suffix] = entry["files_by_type"].get(suffix, 0) + 1
+                    
+                    rel_path = f"{rel_dir}/{item.name}" if rel_dir else item.name
+                    if item.name in KEY_FILES:
+                        entry["key_files"].append(rel_path)
+                    if is_manifest(item.name):
+                        entry["manifests"].append(rel_path)
+        except OSError as e:
+            self.log(f"Error scanning {abs_dir}: {e}")
+            
+        return entry
+    
+    def scan_directories(self, cached: Dict[str, Dict]) -> Dict[str, Dict]:
+        """Collect per-directory aggregates, re-listing only directories whose mtime changed.
+        
+        A directory's mtime only moves when entries are added, removed or renamed in it,
+        which is exactly what the file counts depend on. Unchanged directories are still
+        stat()ed so changes deeper in their subtree are picked up.
+        """
+        directories = {}
+        pending = ['']
+        
+        while pending:
+            rel_dir = pending.pop()
+            abs_dir = self.project_path / rel_dir if rel_dir else self.project_path
+            
+            try:
+                mtime_ns = abs_dir.stat().st_mtime_ns
+            except OSError as e:
+                self.log(f"Error reading {abs_dir}: {e}")
+                continue
+                
+            entry = cached.get(rel_dir)
+            # Entries built from the git index only count tracked files
+            if entry is not None and entry.get("mtime_ns") == mtime_ns and "index_digest" not in entry:
+                self.reused_dirs += 1
+            else:
+                entry = self.scan_directory(abs_dir, rel_dir, mtime_ns)
+                self.scanned_dirs += 1
+                
+            directories[rel_dir] = entry
+            pending.extend(f"{rel_dir}/{name}" if rel_dir else name for name in entry["subdirs"])
+            
+        return directories
+    
+    def index_directory(self, abs_dir: Path, rel_dir: str, names: List[str], mtime_ns: int,
+                        digest: str) -> Dict:
+        """Aggregate a directory's tracked files that still exist in the work tree"""
+        entry = directory_entry(mtime_ns)
+        entry["index_digest"] = digest
+        try:
+            present = set(os.listdir(abs_dir))
+        except OSError as e:
+            self.log(f"Error scanning {abs_dir}: {e}")
+            return entry
+            
+        for name in names:
+            # Deleted from the work tree but not yet from the index
+            if name not in present:
+                continue
+            suffix = os.path.splitext(name)[1].lower()
+            entry["files_by_type"][suffix] = entry["files_by_type"].get(suffix, 0) + 1
+            rel_path = f"{rel_dir}/{name}" if rel_dir else name
+            if name in KEY_FILES:
+                entry["key_files"].append(rel_path)
+            if is_manifest(name):
+                entry["manifests"].append(rel_path)
+        return entry
+    
+    def scan_git_index(self, cached: Dict[str, Dict]) -> Optional[Dict[str, Dict]]:
+        """Build per-directory aggregates from files tracked in the git index.
+        
+        A directory is reused from the previous manifest when both its mtime and
+        its tracked file names are unchanged; otherwise its tracked files are
+        checked against one listing of the directory. Returns None when the
+        project is not inside a git work tree so the caller can fall back to
+        walking the filesystem.
+        """
+        if not USE_GIT_INDEX:
+            return None
+            
+        try:
+            with io_slot():
+                result = subprocess.run([
+                    'git', '-C', str(self.project_path), 'ls-files', '-z', '--cached', '--stage'
+                ], capture_output=True, timeout=60)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            self.log(f"git ls-files unavailable, walking filesystem: {e}")
+            return None
+            
+        if result.returncode != 0:
+            return None
+            
+        tracked: Dict[str, Set[str]] = {}
+        for record in result.stdout.split(b'\0'):
+            if not record:
+                continue
+            # "<mode> <object> <stage>\t<path>"; paths are relative to project_path and use '/'
+            info, _, raw_path = record.partition(b'\t')
+            if info.startswith(b'160000 '):
+                # Submodule gitlink, a directory rather than a file
+                continue
+            parts = os.fsdecode(raw_path).split('/')
+            if any(part in IGNORE_DIRS for part in parts[:-1]) or parts[-1].endswith(IGNORE_SUFFIXES):
+                continue
+            # A conflicted path is listed once per stage
+            tracked.setdefault('/'.join(parts[:-1]), set()).add(parts[-1])
+            
+        directories = {}
+        for rel_dir, names in tracked.items():
+            abs_dir = self.project_path / rel_dir if rel_dir else self.project_path
+            try:
+                mtime_ns = abs_dir.stat().st_mtime_ns
+            except OSError:
+                # Every tracked file in it was deleted from the work tree
+                continue
+                
+            names = sorted(names)
+            digest = hashlib.sha1('\0'.join(names).encode()).hexdigest()
+            entry = cached.get(rel_dir)
+            if entry is not None and entry.get("mtime_ns") == mtime_ns and entry.get("index_digest") == digest:
+                entry = dict(entry, subdirs=[])
+                self.reused_dirs += 1
+            else:
+                entry = self.index_directory(abs_dir, rel_dir, names, mtime_ns, digest)
+                self.scanned_dirs += 1
+            directories[rel_dir] = entry
+            
+        # Register every ancestor directory so subdirs stay consistent with the walk backend
+        directories.setdefault('', directory_entry(None))
+        for rel_dir in sorted(directories):
+            child = rel_dir
+            while child:
+                parent, _, name = child.rpartition('/')
+                parent_entry = directories.setdefault(parent, directory_entry(None))
+                if name in parent_entry["subdirs"]:
+                    break
+                parent_entry["subdirs"].append(name)
+                child = parent
+                
+        return directories
+    
     def get_file_structure(self) -> Dict:
         """Analyze project file structure and patterns"""
         structure = {
@@ -66,92 +337,79 @@ class ArchitectureSnapshot:
             "patterns": []
         }
         
-        # Ignore patterns
-        ignore_dirs = {'.git', 'node_modules', '__pycache__', '.venv', 'dist', 'build', '.next'}
-        ignore_files = {'.DS_Store', '.gitignore', '*.log', '*.pyc', '*.map'}
-        
         try:
-            for root, dirs, files in os.walk(self.project_path):
-                # Filter ignored directories
-                dirs[:] = [d for d in dirs if d not in ignore_dirs]
-                
-                rel_root = Path(root).relative_to(self.project_path)
-                if rel_root == Path('.'):
-                    rel_root = ''
-                else:
-                    rel_root = str(rel_root)
-                
-                # Count files by type
-                for file in files:
-                    if any(file.endswith(pattern.lstrip('*')) for pattern in ignore_files if pattern.startswith('*')):
-                        continue
-                        
-                    file_path = Path(root) / file
-                    suffix = file_path.suffix.lower()
-                    
-                    if suffix not in structure["files_by_type"]:
-                        structure["files_by_type"][suffix] = 0
-                    structure["files_by_type"][suffix] += 1
-                    
-                    # Mark key files
-                    if file in ['package.json', 'pyproject.toml', 'Dockerfile', 'docker-compose.yml', 
-                              'requirements.txt', 'README.md', 'tsconfig.json', '.env.example']:
-                        structure["key_files"].append(str(file_path.relative_to(self.project_path)))
-                        
+            cached = self.previous_manifest.get("directories", {})
+            directories = self.scan_git_index(cached)
+            if directories is not None:
+                self.file_backend = "git"
+            else:
+                with io_slot():
+                    directories = self.scan_directories(cached)
+            self.directories = directories
         except Exception as e:
             self.log(f"Error analyzing file structure: {e}")
             
+        # Merge cached and freshly scanned aggregates
+        for entry in self.directories.values():
+            for suffix, count in entry["files_by_type"].items():
+                structure["files_by_type"][suffix] = structure["files_by_type"].get(suffix, 0) + count
+            structure["key_files"].extend(entry["key_files"])
+            
+        structure["key_files"].sort()
         return structure
     
-    def detect_technologies(self) -> List[str]:
-        """Detect technologies used in the project"""
-        technologies = set()
+    def diff_against_previous(self, technologies: List[str]) -> Optional[Dict]:
+        """Structured diff between this scan and the previous snapshot's manifest"""
+        if not self.previous_manifest:
+            return None
+            
+        previous_dirs = self.previous_manifest.get("directories", {})
+        files_added: Dict[str, int] = {}
+        files_removed: Dict[str, int] = {}
         
-        # Check package.json
-        package_json = self.project_path / "package.json"
-        if package_json.exists():
-            try:
-                with open(package_json) as f:
-                    data = json.load(f)
-                    deps = {**data.get('dependencies', {}), **data.get('devDependencies', {})}
-                    
-                    # Detect frameworks
-                    if 'react' in deps: technologies.add('React')
-                    if 'vue' in deps: technologies.add('Vue')
-                    if 'angular' in deps: technologies.add('Angular')
-                    if 'next' in deps: technologies.add('Next.js')
-                    if 'express' in deps: technologies.add('Express')
-                    if 'typescript' in deps: technologies.add('TypeScript')
-                    if 'tailwindcss' in deps: technologies.add('TailwindCSS')
+        for rel_dir in set(previous_dirs) | set(self.directories):
+            old_counts = previous_dirs.get(rel_dir, {}).get("files_by_type", {})
+            new_counts = self.directories.get(rel_dir, {}).get("files_by_type", {})
+            
+            for suffix in set(old_counts) | set(new_counts):
+                delta = new_counts.get(suffix, 0) - old_counts.get(suffix, 0)
+                if delta > 0:
+                    files_added[suffix] = files_added.get(suffix, 0) + delta
+                elif delta < 0:
+                    files_removed[suffix] = files_removed.get(suffix, 0) - delta
                     
-            except Exception as e:
-                self.log(f"Error reading package.json: {e}")
+        previous_key_files: Set[str] = set()
+        for entry in previous_dirs.values():
+            previous_key_files.update(entry.get("key_files", []))
+        current_key_files = {f for entry in self.directories.values() for f in entry["key_files"]}
         
-        # Check pyproject.toml / requirements.txt
-        pyproject = self.project_path / "pyproject.toml"
-        requirements = self.project_path / "requirements.txt"
+        previous_tech = set(self.previous_manifest.get("technologies", []))
         
-        if pyproject.exists() or requirements.exists():
-            technologies.add('Python')
-            
-            # Check for FastAPI, Flask, Django, etc.
-            for file in [pyproject, requirements]:
-                if file.exists():
-                    try:
-                        content = file.read_text()
-                        if 'fastapi' in content.lower(): technologies.add('FastAPI')
-                        if 'flask' in content.lower(): technologies.add('Flask')
-                        if 'django' in content.lower(): technologies.add('Django')
-                        if 'graphiti' in content.lower(): technologies.add('Graphiti')
-                    except Exception as e:
-                        self.log(f"Error reading {file}: {e}")
-        
-        # Check Dockerfile
-        dockerfile = self.project_path / "Dockerfile"
-        if dockerfile.exists():
-            technologies.add('Docker')
+        return {
+            "since": self.previous_manifest.get("timestamp"),
+            "files_added": dict(sorted(files_added.items())),
+            "files_removed": dict(sorted(files_removed.items())),
+            "new_key_files": sorted(current_key_files - previous_key_files),
+            "removed_key_files": sorted(previous_key_files - current_key_files),
+            "technologies_gained": sorted(set(technologies) - previous_tech),
+            "technologies_lost": sorted(previous_tech - set(technologies))
+        }
+    
+    def detect_technologies(self) -> List[str]:
+        """Detect technologies from every manifest found during the snapshot walk"""
+        if not self.directories:
+            self.get_file_structure()
             
-        return sorted(list(technologies))
+        manifests = [m for entry in self.directories.values() for m in entry.get("manifests", [])]
+        cache = FileMetadataCache()
+        try:
+            detector = TechnologyDetector(cache, log=self.log)
+            self.technology_sources = detector.detect(self.project_path, manifests)
+            self.tech_cache_hits = detector.hits
+        finally:
+            cache.close()
+        
+        return sorted(self.technology_sources)
     
     def get_recent_changes(self) -> Optional[Dict]:
         """Get recent git changes if this is a git repository"""
@@ -162,10 +420,11 @@ class ArchitectureSnapshot:
             # Get recent commits (last 30 days)
             since_date = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
             
-            result = subprocess.run([
-                'git', '-C', str(self.project_path), 'log', 
-                '--since', since_date, '--oneline', '--no-merges'
-            ], capture_output=True, text=True)
+            with io_slot():
+                result = subprocess.run([
+                    'git', '-C', str(self.project_path), 'log', 
+                    '--since', since_date, '--oneline', '--no-merges'
+                ], capture_output=True, text=True)
             
             if result.returncode == 0:
                 commits = result.stdout.strip().split('\n') if result.stdout.strip() else []
@@ -181,16 +440,26 @@ class ArchitectureSnapshot:
     
     def create_snapshot(self) -> Dict:
         """Create comprehensive architecture snapshot"""
+        self.previous_manifest = self.load_manifest()
+        structure = self.get_file_structure()
+        technologies = self.detect_technologies()
+        
         snapshot = {
             "project_name": self.project_name,
             "project_path": str(self.project_path),
             "timestamp": self.timestamp.isoformat(),
-            "structure": self.get_file_structure(),
-            "technologies": self.detect_technologies(),
+            "structure": structure,
+            "technologies": technologies,
+            "technology_sources": self.technology_sources,
             "git_info": self.get_recent_changes(),
+            "diff": self.diff_against_previous(technologies),
             "metadata": {
-                "total_files": sum(self.get_file_structure()["files_by_type"].values()),
-                "snapshot_type": "forced" if FORCE_SNAPSHOT else "scheduled"
+                "total_files": sum(structure["files_by_type"].values()),
+                "snapshot_type": "forced" if FORCE_SNAPSHOT else "scheduled",
+                "scanned_directories": self.scanned_dirs,
+                "reused_directories": self.reused_dirs,
+                "file_backend": self.file_backend,
+                "technology_cache_hits": self.tech_cache_hits
             }
         }
         
@@ -208,6 +477,17 @@ class ArchitectureSnapshot:
         with open(filepath, 'w') as f:
             json.dump(snapshot, f, indent=2)
             
+        self.save_manifest(snapshot)
+        self.catalog.record(self.project_name, filepath, snapshot, self.timestamp)
+        
+        # Apply retention: older snapshots move into the compressed delta archive
+        try:
+            archived = self.catalog.compact(self.project_name)
+            if archived:
+                self.log(f"Compacted {archived} old snapshots into archive")
+        except Exception as e:
+            self.log(f"Error compacting snapshots: {e}")
+            
         return filepath
     
     def add_to_memory(self, snapshot: Dict, filepath: Path):
@@ -222,34 +502,39 @@ class ArchitectureSnapshot:
         
         summary = (f"ARCHITECTURE SNAPSHOT [{self.timestamp.strftime('%Y-%m-%d')}]: "
                   f"{self.project_name} project analysis - {total_files} files, "
-                  f"Technologies: {tech_list}. "
-                  f"Snapshot saved: {filepath.name}")
+                  f"Technologies: {tech_list}. ")
+        
+        diff = snapshot.get("diff")
+        if diff:
+            changes = [f"+{n} {suffix or 'no-ext'}" for suffix, n in diff["files_added"].items()]
+            changes += [f"-{n} {suffix or 'no-ext'}" for suffix, n in diff["files_removed"].items()]
+            changes += [f"+tech {t}" for t in diff["technologies_gained"]]
+            changes += [f"-tech {t}" for t in diff["technologies_lost"]]
+            changes += [f"new key file {f}" for f in diff["new_key_files"]]
+            if changes:
+                summary += f"Changes since last snapshot: {', '.join(changes[:10])}. "
+                
+        summary += f"Snapshot saved: {filepath.name}"
         
         try:
-            subprocess.run([str(GRAPHITI_HOOK), "add", summary], 
-                         capture_output=True, text=True, timeout=30)
+            with io_slot():
+                subprocess.run([str(GRAPHITI_HOOK), "add", summary], 
+                             capture_output=True, text=True, timeout=30)
             self.log(f"Added snapshot summary to memory: {len(summary)} chars")
         except Exception as e:
             self.log(f"Error adding to memory: {e}")
 
 
-def main():
-    """Main execution"""
-    # Get current working directory as project path
-    project_path = os.getcwd()
-    
-    if len(sys.argv) > 1:
-        project_path = sys.argv[1]
-        
-    if not os.path.exists(project_path):
-        print(f"Error: Project path does not exist: {project_path}", file=sys.stderr)
-        sys.exit(1)
-        
+def snapshot_project(project_path: str) -> Dict:
+    """Snapshot one project if its schedule allows, returning a result record"""
+    started = time.monotonic()
     snapshot_tool = ArchitectureSnapshot(project_path)
+    result = {"project": snapshot_tool.project_name, "path": str(snapshot_tool.project_path)}
     
     if not snapshot_tool.should_create_snapshot():
         snapshot_tool.log(f"Snapshot not needed for {snapshot_tool.project_name} (recent snapshot exists)")
-        return
+        result["status"] = "skipped"
+        return result
         
     snapshot_tool.log(f"Creating architecture snapshot for {snapshot_tool.project_name}")
     
@@ -264,14 +549,226 @@ def main():
         # Add to memory
         snapshot_tool.add_to_memory(snapshot, filepath)
         
-        print(f"✅ Architecture snapshot created: {filepath}")
+        result.update({
+            "status": "created",
+            "snapshot": str(filepath),
+            "total_files": snapshot["metadata"]["total_files"]
+        })
         
     except Exception as e:
         error_msg = f"Error creating snapshot: {e}"
         snapshot_tool.log(error_msg)
-        print(f"❌ {error_msg}", file=sys.stderr)
+        result.update({"status": "failed", "error": error_msg})
+        
+    result["duration"] = round(time.monotonic() - started, 2)
+    return result
+
+
+def discover_projects(workspace: str, max_depth: int = 2) -> List[str]:
+    """Find git repositories under a workspace directory"""
+    roots = []
+    pending = [(Path(workspace), 0)]
+    
+    while pending:
+        directory, depth = pending.pop()
+        if (directory / ".git").exists():
+            roots.append(str(directory))
+            continue
+        if depth >= max_depth:
+            continue
+        try:
+            children = sorted(p for p in directory.iterdir()
+                              if p.is_dir() and not p.is_symlink()
+                              and not p.name.startswith('.') and p.name not in IGNORE_DIRS)
+        except OSError:
+            continue
+        pending.extend((child, depth + 1) for child in reversed(children))
+        
+    return roots
+
+
+def _snapshot_worker(conn, project_path: str, io_slots: IOSlots):
+    """Runner child process: snapshot one project and send back the result"""
+    global IO_SLOTS
+    IO_SLOTS = io_slots
+    # Own process group, so a timeout also takes down the git and memory hook children
+    os.setsid()
+    try:
+        conn.send(snapshot_project(project_path))
+    except Exception as e:
+        conn.send({"project": Path(project_path).name, "path": project_path,
+                   "status": "failed", "error": str(e)})
+    finally:
+        conn.close()
+
+
+def run_snapshots(project_paths: List[str], jobs: int, io_jobs: int, timeout: float) -> List[Dict]:
+    """Snapshot several projects concurrently, one child process per project.
+    
+    At most `jobs` projects run at once and at most `io_jobs` of them hold an
+    IO slot (git calls, filesystem walks, memory hook) at any moment. Each
+    project gets `timeout` seconds before its process group is killed.
+    """
+    slot_dir = tempfile.mkdtemp(prefix="snapshot-io-")
+    try:
+        return _run_snapshots(project_paths, jobs, IOSlots(slot_dir, io_jobs), timeout)
+    finally:
+        shutil.rmtree(slot_dir, ignore_errors=True)
+
+
+def _signal_worker(process: multiprocessing.Process, sig: int):
+    """Signal the worker's process group, or just the worker if it never got as far as creating it"""
+    try:
+        os.killpg(process.pid, sig)
+    except ProcessLookupError:
+        if process.is_alive():
+            process.kill()
+    except PermissionError:
+        process.kill()
+
+
+def _worker_gone(process: multiprocessing.Process) -> bool:
+    """Whether the worker has exited (and been reaped) along with everything in its group"""
+    if process.is_alive():
+        return False
+    try:
+        os.killpg(process.pid, 0)
+    except (ProcessLookupError, PermissionError):
+        return True
+    return False
+
+
+def _run_snapshots(project_paths: List[str], jobs: int, io_slots: IOSlots, timeout: float) -> List[Dict]:
+    results = []
+    pending = []
+    running = {}  # connection -> (process, project_path, started, deadline)
+    # Timed-out workers: process -> (signal sent, when to escalate); SIGKILL follows SIGTERM after the grace period
+    dying = {}
+    
+    # The schedule check is an O(1) catalog lookup, so do it before spawning anything
+    for project_path in project_paths:
+        tool = ArchitectureSnapshot(project_path)
+        if tool.should_create_snapshot():
+            pending.append(project_path)
+        else:
+            tool.log(f"Snapshot not needed for {tool.project_name} (recent snapshot exists)")
+            results.append({"project": tool.project_name, "path": str(tool.project_path), "status": "skipped"})
+    pending.reverse()
+    
+    while pending or running or dying:
+        while pending and len(running) < jobs:
+            project_path = pending.pop()
+            parent_conn, child_conn = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(target=_snapshot_worker,
+                                              args=(child_conn, project_path, io_slots))
+            process.start()
+            child_conn.close()
+            started = time.monotonic()
+            running[parent_conn] = (process, project_path, started, started + timeout)
+            
+        deadlines = [deadline for _, _, _, deadline in running.values()]
+        deadlines += [escalate_at for _, escalate_at in dying.values()]
+        # Exited workers are reaped, so only live ones have a sentinel worth waiting on
+        sentinels = [process.sentinel for process in dying if process.exitcode is None]
+        ready = wait(list(running) + sentinels, timeout=max(min(deadlines) - time.monotonic(), 0))
+        
+        for conn in ready:
+            if conn not in running:
+                continue
+            process, project_path, started, _ = running.pop(conn)
+            try:
+                result = conn.recv()
+            except EOFError:
+                result = {"project": Path(project_path).name, "path": project_path,
+                          "status": "failed", "error": f"worker exited with code {process.exitcode}"}
+            conn.close()
+            process.join()
+            result["duration"] = round(time.monotonic() - started, 2)
+            results.append(result)
+            
+        now = time.monotonic()
+        for conn, (process, project_path, started, deadline) in list(running.items()):
+            if now >= deadline:
+                _signal_worker(process, signal.SIGTERM)
+                dying[process] = (signal.SIGTERM, now + KILL_GRACE_SECONDS)
+                conn.close()
+                del running[conn]
+                results.append({"project": Path(project_path).name, "path": project_path,
+                                "status": "timeout", "duration": round(now - started, 2)})
+                
+        for process, (sig, escalate_at) in list(dying.items()):
+            if _worker_gone(process):
+                del dying[process]
+            elif now < escalate_at:
+                continue
+            elif sig == signal.SIGTERM:
+                _signal_worker(process, signal.SIGKILL)
+                dying[process] = (signal.SIGKILL, now + KILL_GRACE_SECONDS)
+            else:
+                # Stuck in uninterruptible IO; stop waiting rather than hang the run
+                del dying[process]
+                
+    return results
+
+
+def print_summary(results: List[Dict]):
+    """Print a consolidated summary of a multi-project run"""
+    counts: Dict[str, int] = {}
+    for result in sorted(results, key=lambda r: r["project"]):
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+        detail = result.get("snapshot") or result.get("error") or ""
+        duration = f"{result['duration']:.1f}s" if "duration" in result else "-"
+        print(f"{result['status']:<8} {result['project']:<30} {duration:>8}  {detail}")
+        
+    totals = ", ".join(f"{count} {status}" for status, count in sorted(counts.items()))
+    print(f"\n{len(results)} projects: {totals}")
+
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Create architecture snapshots")
+    parser.add_argument("project_paths", nargs="*", help="Project roots (default: current directory)")
+    parser.add_argument("--workspace", help="Snapshot every git repository found under this directory")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 2,
+                        help="Maximum projects snapshotted concurrently")
+    parser.add_argument("--io-jobs", type=int, default=DEFAULT_IO_JOBS,
+                        help="Maximum concurrent git/filesystem/memory operations")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_PROJECT_TIMEOUT,
+                        help="Per-project timeout in seconds")
+    parser.add_argument("--json", action="store_true", help="Print the run summary as JSON")
+    args = parser.parse_args()
+    
+    project_paths = list(args.project_paths)
+    if args.workspace:
+        project_paths.extend(discover_projects(args.workspace))
+    elif not project_paths:
+        # Get current working directory as project path
+        project_paths = [os.getcwd()]
+        
+    for project_path in project_paths:
+        if not os.path.exists(project_path):
+            print(f"Error: Project path does not exist: {project_path}", file=sys.stderr)
+            sys.exit(1)
+            
+    if len(project_paths) == 1 and not args.workspace:
+        result = snapshot_project(project_paths[0])
+        if result["status"] == "created":
+            print(f"✅ Architecture snapshot created: {result['snapshot']}")
+        elif result["status"] == "failed":
+            print(f"❌ {result['error']}", file=sys.stderr)
+            sys.exit(1)
+        return
+        
+    results = run_snapshots(project_paths, max(args.jobs, 1), max(args.io_jobs, 1), args.timeout)
+    
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_summary(results)
+        
+    if any(r["status"] in ("failed", "timeout") for r in results):
         sys.exit(1)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
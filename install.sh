@@ -91,6 +91,7 @@ cp -f settings.json "$CLAUDE_DIR/"
 cp -f settings-multi-mcp.json "$CLAUDE_DIR/"
 cp -f settings.local.json "$CLAUDE_DIR/"
 cp -f memory-config.json "$CLAUDE_DIR/"
+cp -f hook-dispatch.json "$CLAUDE_DIR/"
 cp -f LICENSE "$CLAUDE_DIR/"
 
 echo "  Copying hook scripts..."
@@ -100,12 +101,22 @@ cp -f documentation-hooks.sh "$CLAUDE_DIR/"
 cp -f context7-hooks.sh "$CLAUDE_DIR/"
 cp -f graphiti-hook.sh "$CLAUDE_DIR/"
 cp -f graphiti-flush.sh "$CLAUDE_DIR/"
+cp -f graphiti_ingest.py "$CLAUDE_DIR/"
+cp -f memory_chunker.py "$CLAUDE_DIR/"
+cp -f memory_prefilter.py "$CLAUDE_DIR/"
+cp -f memory_rollup.py "$CLAUDE_DIR/"
+cp -f memory_backfill.py "$CLAUDE_DIR/"
+cp -f graphiti-batcher.py "$CLAUDE_DIR/"
+cp -f memory_store.py "$CLAUDE_DIR/"
+cp -f warm-python.sh "$CLAUDE_DIR/"
 
 echo "  Copying utility scripts..."
 cp -f initialize-graphiti.sh "$CLAUDE_DIR/"
 cp -f mcp-session-hook-multi.sh "$CLAUDE_DIR/"
 cp -f multi-mcp-setup.sh "$CLAUDE_DIR/"
 cp -f multi-mcp-service.sh "$CLAUDE_DIR/"
+cp -f mcp_supervisor.py "$CLAUDE_DIR/"
+cp -f mcp-optimizer.sh "$CLAUDE_DIR/"
 cp -f boardlens-dev-startup-hook-multi.sh "$CLAUDE_DIR/"
 cp -f mcp-cleanup-hook-multi.sh "$CLAUDE_DIR/"
 
@@ -4,10 +4,8 @@
 
 set -e
 
-PROXY_DIR="$GIT_CLONE_DIR/multi-mcp"
-PROXY_CONFIG="claude-code-production.json"
 PROXY_PORT="8080"
-PROXY_PID_FILE="/tmp/multi-mcp-proxy.pid"
+SUPERVISOR="$HOME/.claude/mcp_supervisor.py"
 CLAUDE_SETTINGS="$HOME/.claude/settings.json"
 LOG_FILE="$HOME/.claude/mcp-optimizer.log"
 
@@ -21,80 +19,16 @@ log() {
     echo "$(date '+%Y-%m-%d %H:%M:%S') - $1" | tee -a "$LOG_FILE"
 }
 
-# Function to kill all duplicate MCP processes
-cleanup_duplicates() {
-    log "🧹 Cleaning up duplicate MCP processes..."
-    
-    # Get the proxy PID if it exists
-    PROXY_PID=""
-    if [ -f "$PROXY_PID_FILE" ]; then
-        PROXY_PID=$(cat "$PROXY_PID_FILE")
-    fi
-    
-    # Count before cleanup
-    BEFORE_COUNT=$(ps aux | grep -E "mcp-server|serena-mcp|sequential|puppeteer|figma|brave|context7" | grep -v grep | wc -l)
-    
-    # Kill all MCP processes except the proxy
-    ps aux | grep -E "mcp-server|serena-mcp|sequential-thinking|mcp-puppeteer|figma-mcp|brave-search|context7-mcp|mcp-git" | \
-        grep -v grep | \
-        grep -v "$PROXY_PID" | \
-        awk '{print $2}' | \
-        xargs -r kill -9 2>/dev/null || true
-    
-    # Count after cleanup
-    AFTER_COUNT=$(ps aux | grep -E "mcp-server|serena-mcp|sequential|puppeteer|figma|brave|context7" | grep -v grep | wc -l)
-    
-    log "  Cleaned up $((BEFORE_COUNT - AFTER_COUNT)) duplicate processes"
+# Process management lives in mcp_supervisor.py: it owns the proxy's process
+# group, restarts with backoff and reaps orphaned MCP servers on request
+supervisor() {
+    python3 "$SUPERVISOR" "$@"
 }
 
-# Function to check if proxy is running and healthy
-check_proxy_health() {
-    if [ -f "$PROXY_PID_FILE" ]; then
-        PID=$(cat "$PROXY_PID_FILE")
-        if kill -0 "$PID" 2>/dev/null; then
-            # Process exists, check if it's responding
-            if curl -s -f "http://127.0.0.1:$PROXY_PORT/mcp_servers" > /dev/null 2>&1; then
-                return 0
-            else
-                log "⚠️  Proxy process exists but not responding"
-                return 1
-            fi
-        else
-            log "⚠️  Proxy PID file exists but process is dead"
-            rm -f "$PROXY_PID_FILE"
-            return 1
-        fi
-    fi
-    return 1
-}
-
-# Function to start the Multi-MCP proxy
-start_proxy() {
-    log "🚀 Starting Multi-MCP proxy..."
-    
-    cd "$PROXY_DIR"
-    
-    # Start the proxy in background using virtual environment
-    if [ -f "$PROXY_DIR/.venv/bin/python3" ]; then
-        nohup "$PROXY_DIR/.venv/bin/python3" main.py --transport sse --host 127.0.0.1 --port "$PROXY_PORT" --config "$PROXY_CONFIG" > "$HOME/.claude/multi-mcp.log" 2>&1 &
-    else
-        log "❌ Virtual environment not found at $PROXY_DIR/.venv"
-        return 1
-    fi
-    PROXY_PID=$!
-    echo $PROXY_PID > "$PROXY_PID_FILE"
-    
-    # Wait for proxy to be ready
-    for i in {1..10}; do
-        if curl -s "http://127.0.0.1:$PROXY_PORT/mcp_servers" > /dev/null 2>&1; then
-            log "✅ Multi-MCP proxy started successfully (PID: $PROXY_PID)"
-            return 0
-        fi
-        sleep 1
-    done
-    
-    log "❌ Failed to start Multi-MCP proxy"
-    return 1
+# Function to kill orphaned MCP processes the proxy no longer owns
+cleanup_duplicates() {
+    log "🧹 Cleaning up orphaned MCP processes..."
+    log "  $(supervisor reap)"
 }
 
 # Function to ensure Claude settings use proxy-only configuration
@@ -132,90 +66,52 @@ EOF
     log "✅ Claude settings updated"
 }
 
-# Function to monitor and maintain proxy health
-monitor_proxy() {
-    while true; do
-        if ! check_proxy_health; then
-            log "🔄 Proxy not healthy, restarting..."
-            cleanup_duplicates
-            start_proxy
-        fi
-        
-        # Check for duplicate processes every 5 minutes
-        DUPLICATE_COUNT=$(ps aux | grep -E "mcp-server|serena-mcp|sequential" | grep -v grep | grep -v "multi_mcp_proxy" | wc -l)
-        if [ "$DUPLICATE_COUNT" -gt 5 ]; then
-            log "⚠️  Found $DUPLICATE_COUNT MCP processes, cleaning up..."
-            cleanup_duplicates
-        fi
-        
-        sleep 300  # Check every 5 minutes
-    done
-}
-
 # Main execution
 main() {
     case "${1:-status}" in
         start)
             echo -e "${GREEN}=== MCP Optimizer - Starting ===${NC}"
-            cleanup_duplicates
-            if check_proxy_health; then
-                log "✅ Multi-MCP proxy already running and healthy"
-            else
-                start_proxy
-            fi
+            log "🚀 Starting Multi-MCP proxy under the supervisor..."
+            supervisor start | tee -a "$LOG_FILE"
             update_claude_settings
             echo -e "${GREEN}✅ MCP optimization complete${NC}"
             ;;
             
         stop)
             echo -e "${YELLOW}=== MCP Optimizer - Stopping ===${NC}"
-            if [ -f "$PROXY_PID_FILE" ]; then
-                kill $(cat "$PROXY_PID_FILE") 2>/dev/null || true
-                rm -f "$PROXY_PID_FILE"
-            fi
+            supervisor stop | tee -a "$LOG_FILE"
             cleanup_duplicates
             echo -e "${GREEN}✅ All MCP processes stopped${NC}"
             ;;
             
         restart)
-            $0 stop
-            sleep 2
-            $0 start
+            log "🔄 Restarting Multi-MCP proxy..."
+            supervisor restart | tee -a "$LOG_FILE"
             ;;
             
         monitor)
             echo -e "${GREEN}=== MCP Optimizer - Monitor Mode ===${NC}"
-            monitor_proxy
+            # The supervisor is the monitor; run it in the foreground
+            supervisor run
             ;;
             
         status)
             echo -e "${GREEN}=== MCP Status Report ===${NC}"
             echo ""
             
-            if check_proxy_health; then
-                echo -e "${GREEN}✅ Multi-MCP Proxy: Running${NC}"
-                echo "   PID: $(cat $PROXY_PID_FILE)"
-                echo "   Endpoint: http://127.0.0.1:$PROXY_PORT/sse"
-                
-                # Show available servers
+            if supervisor status; then
                 echo ""
                 echo "Available MCP Servers:"
                 curl -s "http://127.0.0.1:$PROXY_PORT/mcp_servers" 2>/dev/null | jq -r 'keys[]' | sed 's/^/   - /'
             else
-                echo -e "${RED}❌ Multi-MCP Proxy: Not running${NC}"
+                echo -e "${RED}❌ Multi-MCP Proxy: Not healthy${NC}"
             fi
-            
-            echo ""
-            echo "MCP Process Count:"
-            TOTAL_COUNT=$(ps aux | grep -E "mcp|serena|sequential|puppeteer|figma|brave|context7" | grep -v grep | wc -l)
-            echo "   Total: $TOTAL_COUNT processes"
-            
+
             echo ""
-            echo "Memory Usage:"
-            MEMORY=$(ps aux | grep -E "mcp|serena|sequential|puppeteer|figma|brave|context7" | grep -v grep | awk '{sum+=$6} END {printf "%.1f", sum/1024}')
-            echo "   Total: ${MEMORY} MB"
+            echo "Resource Usage:"
+            supervisor resources | sed 's/^/   /'
             ;;
-            
+
         cleanup)
             echo -e "${YELLOW}=== MCP Optimizer - Cleanup ===${NC}"
             cleanup_duplicates
@@ -229,8 +125,8 @@ main() {
             echo "  stop    - Stop all MCP processes"
             echo "  restart - Restart Multi-MCP proxy"
             echo "  status  - Show current MCP status"
-            echo "  monitor - Run continuous monitoring (daemon mode)"
-            echo "  cleanup - Remove duplicate MCP processes"
+            echo "  monitor - Run the supervisor in the foreground"
+            echo "  cleanup - Remove orphaned MCP processes"
             exit 1
             ;;
     esac
@@ -0,0 +1,709 @@
+#!/usr/bin/env python3
+"""
+MCP Process Supervisor
+Owns the Multi-MCP proxy and the MCP servers it spawns. Each service runs
+in its own process group, so stopping or restarting it takes every child
+with it. The supervisor enforces a single instance, applies RSS and CPU
+limits per server, restarts with exponential backoff, clears the groups a
+previous supervisor left behind, reaps orphaned MCP servers on request, and
+serves health and resource usage over HTTP.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import fcntl
+import signal
+import argparse
+import threading
+import subprocess
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional
+
+CLAUDE_DIR = Path.home() / ".claude"
+CONFIG_FILE = Path(os.environ.get('MCP_SUPERVISOR_CONFIG', CLAUDE_DIR / "mcp-supervisor.json"))
+STATE_FILE = CLAUDE_DIR / "mcp-supervisor-state.json"
+LOCK_FILE = CLAUDE_DIR / "mcp-supervisor.lock"
+LOG_FILE = CLAUDE_DIR / "mcp-supervisor.log"
+
+DEFAULT_HEALTH_PORT = 8765
+CHECK_INTERVAL = 10.0
+STOP_GRACE_SECONDS = 10.0
+BACKOFF_BASE_SECONDS = 2.0
+BACKOFF_MAX_SECONDS = 300.0
+# A service that stayed up this long starts its backoff from scratch when it next fails
+STABLE_SECONDS = 120.0
+# Health checks only count once a service has had time to come up
+STARTUP_GRACE_SECONDS = 30.0
+HEALTH_FAILURES_BEFORE_RESTART = 3
+# CPU spikes are normal; only sustained overuse triggers a restart
+CPU_SUSTAIN_CHECKS = 3
+
+# Ceilings applied to each MCP server the proxy spawns when no config file overrides them
+SERVER_MAX_RSS_MB = int(os.environ.get('MCP_SERVER_MAX_RSS_MB', '1024'))
+SERVER_MAX_CPU_PERCENT = int(os.environ.get('MCP_SERVER_MAX_CPU_PERCENT', '90'))
+
+# Per-service fields /health reports; /resources has the per-process detail
+HEALTH_FIELDS = ('state', 'pid', 'uptime', 'restarts', 'healthy', 'last_error', 'next_start', 'rss_mb', 'cpu_percent')
+
+# Orphaned stdio MCP servers (parent gone, reparented to init) that nobody will ever talk to again
+DEFAULT_STRAY_PATTERNS = [
+    r"mcp-server|serena-mcp|sequential-thinking|mcp-puppeteer|figma-mcp|brave-search|context7-mcp|mcp-git"
+]
+
+
+def log(message: str):
+    """Append a message to the supervisor log"""
+    timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
+    try:
+        with open(LOG_FILE, 'a') as f:
+            f.write(f"[{timestamp}] [SUPERVISOR] {message}\n")
+    except OSError:
+        pass
+
+
+def default_config() -> Dict:
+    """Multi-MCP proxy as multi-mcp-service.sh used to start it"""
+    proxy_dir = os.path.join(os.environ.get('GIT_CLONE_DIR', ''), 'multi-mcp')
+    venv_python = os.path.join(proxy_dir, '.venv', 'bin', 'python3')
+    python = [venv_python] if os.path.exists(venv_python) else ['uv', 'run']
+    return {
+        'health_port': DEFAULT_HEALTH_PORT,
+        'services': {
+            'multi-mcp': {
+                'command': python + ['main.py', '--transport', 'sse', '--host', '127.0.0.1',
+                                     '--port', '8080', '--config', 'claude-code-production.json'],
+                'cwd': proxy_dir,
+                'health_url': 'http://127.0.0.1:8080/mcp_servers',
+                'log': str(CLAUDE_DIR / "multi-mcp.log"),
+                'limits': {
+                    'mcp-servers': {'match': DEFAULT_STRAY_PATTERNS[0], 'max_rss_mb': SERVER_MAX_RSS_MB,
+                                    'max_cpu_percent': SERVER_MAX_CPU_PERCENT}
+                }
+            }
+        }
+    }
+
+
+def load_config(path: Path = CONFIG_FILE) -> Dict:
+    try:
+        config = json.loads(path.read_text())
+    except FileNotFoundError:
+        return default_config()
+    return config
+
+
+def expand(value: str) -> str:
+    return os.path.expandvars(os.path.expanduser(value))
+
+
+# Process table
+
+class ProcessInfo:
+    """One row of the process table"""
+
+    __slots__ = ('pid', 'ppid', 'pgid', 'rss_kb', 'cpu_seconds', 'command')
+
+    def __init__(self, pid: int, ppid: int, pgid: int, rss_kb: int, cpu_seconds: float, command: str):
+        self.pid = pid
+        self.ppid = ppid
+        self.pgid = pgid
+        self.rss_kb = rss_kb
+        self.cpu_seconds = cpu_seconds
+        self.command = command
+
+
+def parse_cpu_time(text: str) -> float:
+    """ps TIME column: [dd-]hh:mm:ss on Linux, mm:ss.ss on macOS"""
+    days = 0
+    if '-' in text:
+        day_text, text = text.split('-', 1)
+        days = int(day_text)
+    seconds = 0.0
+    for part in text.split(':'):
+        seconds = seconds * 60 + float(part)
+    return days * 86400 + seconds
+
+
+def process_table() -> Dict[int, ProcessInfo]:
+    """Every process, from a single ps call"""
+    result = subprocess.run(['ps', '-A', '-o', 'pid=,ppid=,pgid=,rss=,time=,command='],
+                            capture_output=True, text=True, errors='replace')
+    processes = {}
+    for line in result.stdout.splitlines():
+        parts = line.split(None, 5)
+        if len(parts) < 5:
+            continue
+        try:
+            info = ProcessInfo(int(parts[0]), int(parts[1]), int(parts[2]), int(parts[3]),
+                               parse_cpu_time(parts[4]), parts[5] if len(parts) > 5 else '')
+        except ValueError:
+            continue
+        processes[info.pid] = info
+    return processes
+
+
+def group_alive(pgid: int) -> bool:
+    try:
+        os.killpg(pgid, 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+
+def process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+
+def kill_group(pgid: int, grace: float = STOP_GRACE_SECONDS, reap=None) -> bool:
+    """SIGTERM a process group, SIGKILL whatever is left after `grace`; returns True once it is gone"""
+    try:
+        os.killpg(pgid, signal.SIGTERM)
+    except ProcessLookupError:
+        return True
+    deadline = time.monotonic() + grace
+    while time.monotonic() < deadline:
+        if reap:
+            reap()
+        if not group_alive(pgid):
+            return True
+        time.sleep(0.1)
+    try:
+        os.killpg(pgid, signal.SIGKILL)
+    except ProcessLookupError:
+        return True
+    for _ in range(20):
+        if reap:
+            reap()
+        if not group_alive(pgid):
+            return True
+        time.sleep(0.1)
+    return False
+
+
+# Services
+
+class ResourceLimit:
+    """RSS/CPU ceiling for the processes of a service whose command line matches `pattern`"""
+
+    def __init__(self, name: str, config: Dict):
+        self.name = name
+        self.pattern = re.compile(config['match']) if config.get('match') else None
+        self.max_rss_mb = config.get('max_rss_mb')
+        self.max_cpu_percent = config.get('max_cpu_percent')
+
+    def matches(self, process: ProcessInfo) -> bool:
+        return self.pattern is None or self.pattern.search(process.command) is not None
+
+
+class Service:
+    """One supervised process group and its restart bookkeeping"""
+
+    def __init__(self, name: str, config: Dict):
+        self.name = name
+        self.command = [expand(arg) for arg in config['command']]
+        self.cwd = expand(config['cwd']) if config.get('cwd') else None
+        self.env = {key: expand(str(value)) for key, value in config.get('env', {}).items()}
+        self.health_url = config.get('health_url')
+        self.log_path = Path(expand(config.get('log', str(CLAUDE_DIR / f"mcp-{name}.log"))))
+        # The service as a whole, then each named server inside its group
+        self.limits = [ResourceLimit('*', config)] if ('max_rss_mb' in config or 'max_cpu_percent' in config) else []
+        self.limits += [ResourceLimit(limit_name, limit) for limit_name, limit in config.get('limits', {}).items()]
+
+        self.process: Optional[subprocess.Popen] = None
+        self.pgid: Optional[int] = None
+        self.state = 'stopped'
+        self.started = 0.0
+        self.restarts = 0
+        self.failures = 0
+        self.next_start = 0.0
+        self.last_error: Optional[str] = None
+        self.healthy: Optional[bool] = None
+        self.health_failures = 0
+        self.cpu_over: Dict[str, int] = {}
+        self.cpu_seen: Dict[int, float] = {}
+        self.usage: Dict = {'processes': [], 'rss_mb': 0.0, 'cpu_percent': 0.0}
+
+    def start(self):
+        env = dict(os.environ, **self.env)
+        with open(self.log_path, 'ab') as log_file, open(os.devnull, 'rb') as devnull:
+            self.process = subprocess.Popen(self.command, cwd=self.cwd, env=env, stdin=devnull,
+                                            stdout=log_file, stderr=log_file, start_new_session=True)
+        self.pgid = self.process.pid
+        self.started = time.time()
+        self.state = 'running'
+        self.healthy = None
+        self.health_failures = 0
+        self.cpu_over.clear()
+        self.cpu_seen.clear()
+        log(f"{self.name}: started pid {self.process.pid} ({' '.join(self.command)})")
+
+    def reap(self):
+        if self.process is not None:
+            self.process.poll()
+
+    def stop(self, grace: float = STOP_GRACE_SECONDS):
+        if self.pgid is not None:
+            if not kill_group(self.pgid, grace, self.reap):
+                log(f"{self.name}: process group {self.pgid} survived SIGKILL")
+        if self.process is not None:
+            try:
+                self.process.wait(timeout=1)
+            except subprocess.TimeoutExpired:
+                pass
+        self.process = None
+        self.pgid = None
+        self.usage = {'processes': [], 'rss_mb': 0.0, 'cpu_percent': 0.0}
+
+    def fail(self, reason: str, now: float):
+        """Tear the group down and schedule a restart with exponential backoff"""
+        if self.started and now - self.started >= STABLE_SECONDS:
+            self.failures = 0
+        self.failures += 1
+        delay = min(BACKOFF_BASE_SECONDS * 2 ** (self.failures - 1), BACKOFF_MAX_SECONDS)
+        log(f"{self.name}: {reason}; restarting in {delay:.0f}s")
+        self.last_error = reason
+        self.stop()
+        self.state = 'backoff'
+        self.next_start = now + delay
+
+    def measure(self, processes: Dict[int, ProcessInfo], interval: float):
+        """Resource usage of every process in the group since the previous check"""
+        members = [p for p in processes.values() if p.pgid == self.pgid]
+        rows = []
+        seen = {}
+        for p in members:
+            previous = self.cpu_seen.get(p.pid)
+            cpu_percent = (p.cpu_seconds - previous) / interval * 100 if previous is not None and interval > 0 else 0.0
+            seen[p.pid] = p.cpu_seconds
+            rows.append({'pid': p.pid, 'rss_mb': round(p.rss_kb / 1024, 1),
+                         'cpu_percent': round(max(cpu_percent, 0.0), 1), 'command': p.command[:200]})
+        self.cpu_seen = seen
+        self.usage = {'processes': rows, 'rss_mb': round(sum(r['rss_mb'] for r in rows), 1),
+                      'cpu_percent': round(sum(r['cpu_percent'] for r in rows), 1)}
+        return members
+
+    def violated_limit(self, members: List[ProcessInfo]) -> Optional[str]:
+        """Description of the first limit exceeded, if any"""
+        by_pid = {row['pid']: row for row in self.usage['processes']}
+        for limit in self.limits:
+            matched = [by_pid[p.pid] for p in members if limit.matches(p) and p.pid in by_pid]
+            if not matched:
+                continue
+            rss = sum(r['rss_mb'] for r in matched)
+            cpu = sum(r['cpu_percent'] for r in matched)
+            if limit.max_rss_mb is not None and rss > limit.max_rss_mb:
+                return f"{limit.name} uses {rss:.0f} MB RSS (limit {limit.max_rss_mb} MB)"
+            if limit.max_cpu_percent is not None and cpu > limit.max_cpu_percent:
+                self.cpu_over[limit.name] = self.cpu_over.get(limit.name, 0) + 1
+                if self.cpu_over[limit.name] >= CPU_SUSTAIN_CHECKS:
+                    return f"{limit.name} at {cpu:.0f}% CPU for {CPU_SUSTAIN_CHECKS} checks (limit {limit.max_cpu_percent}%)"
+            else:
+                self.cpu_over.pop(limit.name, None)
+        return None
+
+    def check_health(self) -> bool:
+        if not self.health_url:
+            return True
+        try:
+            with urllib.request.urlopen(self.health_url, timeout=3) as response:
+                return 200 <= response.status < 400
+        except Exception:
+            return False
+
+    def report(self, now: float) -> Dict:
+        return {
+            'state': self.state,
+            'pid': self.process.pid if self.process else None,
+            'pgid': self.pgid,
+            'uptime': round(now - self.started, 1) if self.state == 'running' else None,
+            'restarts': self.restarts,
+            'healthy': self.healthy,
+            'last_error': self.last_error,
+            'next_start': round(self.next_start - now, 1) if self.state == 'backoff' else None,
+            'rss_mb': self.usage['rss_mb'],
+            'cpu_percent': self.usage['cpu_percent'],
+            'processes': self.usage['processes']
+        }
+
+
+class Supervisor:
+    """Runs the services, checks them every interval and serves their status"""
+
+    def __init__(self, config: Dict):
+        self.config = config
+        self.services = {name: Service(name, service) for name, service in config.get('services', {}).items()}
+        self.interval = float(config.get('check_interval', CHECK_INTERVAL))
+        self.stray_patterns = [re.compile(p) for p in config.get('stray_patterns', DEFAULT_STRAY_PATTERNS)]
+        self.lock = threading.Lock()
+        self.stopping = threading.Event()
+        self.last_check = time.monotonic()
+        self.started = time.time()
+
+    def clear_previous(self):
+        """Kill groups left behind by a supervisor that died without cleaning up"""
+        try:
+            state = json.loads(STATE_FILE.read_text())
+        except (OSError, ValueError):
+            return
+        processes = process_table()
+        commands = state.get('commands', {})
+        for name, pgid in state.get('groups', {}).items():
+            if not pgid or not group_alive(pgid):
+                continue
+            # After a reboot the recorded pgid may belong to an unrelated group
+            leader = processes.get(pgid)
+            service = self.services.get(name)
+            expected = commands.get(name) or (' '.join(service.command) if service else None)
+            if leader is None or leader.command.strip() != expected:
+                log(f"{name}: process group {pgid} is not ours any more, leaving it alone")
+                continue
+            log(f"{name}: killing process group {pgid} left by a previous supervisor")
+            kill_group(pgid)
+
+    def save_state(self):
+        state = {'pid': os.getpid(), 'port': self.config.get('health_port', DEFAULT_HEALTH_PORT),
+                 'groups': {name: s.pgid for name, s in self.services.items()},
+                 'commands': {name: ' '.join(s.command) for name, s in self.services.items()}}
+        tmp_path = STATE_FILE.with_name(f".{STATE_FILE.name}.tmp")
+        tmp_path.write_text(json.dumps(state))
+        os.replace(tmp_path, STATE_FILE)
+
+    def reap_strays(self, processes: Dict[int, ProcessInfo], grace: float = STOP_GRACE_SECONDS) -> List[int]:
+        """SIGTERM orphaned MCP servers outside our groups, SIGKILL those still running after `grace`.
+
+        Only the `reap` action calls this; servers with a live parent are left alone.
+        """
+        ours = {s.pgid for s in self.services.values() if s.pgid}
+        reaped = []
+        for p in processes.values():
+            if p.ppid != 1 or p.pgid in ours or p.pid == os.getpid():
+                continue
+            if not any(pattern.search(p.command) for pattern in self.stray_patterns):
+                continue
+            try:
+                os.kill(p.pid, signal.SIGTERM)
+                reaped.append(p.pid)
+            except OSError:
+                continue
+
+        remaining = reaped
+        deadline = time.monotonic() + grace
+        while remaining and time.monotonic() < deadline:
+            time.sleep(0.1)
+            remaining = [pid for pid in remaining if process_alive(pid)]
+        for pid in remaining:
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except OSError:
+                continue
+        if reaped:
+            log(f"Reaped {len(reaped)} orphaned MCP processes ({len(remaining)} needed SIGKILL): {reaped}")
+        return reaped
+
+    def check(self):
+        """One supervision pass over every service"""
+        with self.lock:
+            now = time.time()
+            interval = time.monotonic() - self.last_check
+            self.last_check = time.monotonic()
+            processes = process_table()
+
+            for service in self.services.values():
+                if service.state == 'backoff' and now >= service.next_start:
+                    service.restarts += 1
+                    service.start()
+                    continue
+                if service.state != 'running':
+                    continue
+
+                exit_code = service.process.poll() if service.process else None
+                if exit_code is not None:
+                    service.fail(f"exited with code {exit_code}", now)
+                    continue
+
+                members = service.measure(processes, interval)
+                violation = service.violated_limit(members)
+                if violation:
+                    service.fail(violation, now)
+                    continue
+
+                if not service.health_url:
+                    service.healthy = True
+                elif now - service.started >= STARTUP_GRACE_SECONDS:
+                    service.healthy = service.check_health()
+                    service.health_failures = 0 if service.healthy else service.health_failures + 1
+                    if service.health_failures >= HEALTH_FAILURES_BEFORE_RESTART:
+                        service.fail(f"health check failed {service.health_failures} times", now)
+            self.save_state()
+
+    def restart(self, name: str) -> bool:
+        with self.lock:
+            service = self.services.get(name)
+            if service is None:
+                return False
+            log(f"{name}: restart requested")
+            service.stop()
+            service.restarts += 1
+            service.failures = 0
+            service.start()
+            self.save_state()
+            return True
+
+    def report(self) -> Dict:
+        with self.lock:
+            now = time.time()
+            services = {name: s.report(now) for name, s in self.services.items()}
+        ok = all(s['state'] == 'running' and s['healthy'] is not False for s in services.values())
+        return {'status': 'ok' if ok else 'degraded', 'pid': os.getpid(),
+                'uptime': round(now - self.started, 1), 'services': services}
+
+    def serve_http(self, port: int) -> ThreadingHTTPServer:
+        supervisor = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def send_json(self, status: int, body: Dict):
+                data = json.dumps(body, indent=2).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                report = supervisor.report()
+                if self.path == '/health':
+                    summary = {name: dict({k: s[k] for k in HEALTH_FIELDS}, process_count=len(s['processes']))
+                               for name, s in report['services'].items()}
+                    self.send_json(200 if report['status'] == 'ok' else 503,
+                                   dict(report, services=summary))
+                elif self.path == '/resources':
+                    self.send_json(200, {name: {k: s[k] for k in ('rss_mb', 'cpu_percent', 'processes')}
+                                         for name, s in report['services'].items()})
+                else:
+                    self.send_json(404, {'error': 'unknown path'})
+
+            def do_POST(self):
+                if self.path.startswith('/restart/'):
+                    name = self.path[len('/restart/'):]
+                    if supervisor.restart(name):
+                        self.send_json(200, {'restarted': name})
+                    else:
+                        self.send_json(404, {'error': f"unknown service {name}"})
+                elif self.path == '/stop':
+                    self.send_json(200, {'stopping': True})
+                    supervisor.stopping.set()
+                else:
+                    self.send_json(404, {'error': 'unknown path'})
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    def run(self):
+        """Supervise until SIGTERM/SIGINT or a /stop request; caller must hold the supervisor lock"""
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, lambda *_: self.stopping.set())
+        self.clear_previous()
+        port = int(self.config.get('health_port', DEFAULT_HEALTH_PORT))
+        server = self.serve_http(port)
+        log(f"Supervisor started (pid {os.getpid()}, health on 127.0.0.1:{port})")
+
+        with self.lock:
+            for service in self.services.values():
+                service.start()
+            self.save_state()
+        try:
+            while not self.stopping.wait(self.interval):
+                self.check()
+        finally:
+            server.shutdown()
+            with self.lock:
+                for service in self.services.values():
+                    service.stop()
+                    service.state = 'stopped'
+            STATE_FILE.unlink(missing_ok=True)
+            log("Supervisor stopped")
+
+
+def acquire_lock():
+    """Single-instance lock; returns the open lock file or None if a supervisor is already running"""
+    CLAUDE_DIR.mkdir(exist_ok=True)
+    lock = open(LOCK_FILE, 'w')
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock.close()
+        return None
+    return lock
+
+
+# Client side
+
+def health_port() -> int:
+    try:
+        return int(json.loads(STATE_FILE.read_text())['port'])
+    except (OSError, ValueError, KeyError):
+        return int(load_config().get('health_port', DEFAULT_HEALTH_PORT))
+
+
+def request(path: str, method: str = 'GET', timeout: float = 3) -> Optional[Dict]:
+    """Talk to the running supervisor; None if it is not reachable"""
+    req = urllib.request.Request(f"http://127.0.0.1:{health_port()}{path}", method=method)
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            return json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        try:
+            return json.loads(e.read())
+        except ValueError:
+            return None
+    except (OSError, ValueError):
+        return None
+
+
+def start_background(wait: float = 10.0) -> bool:
+    """Launch `run` detached and wait for its health endpoint"""
+    if request('/health') is not None:
+        return True
+    with open(LOG_FILE, 'ab') as log_file, open(os.devnull, 'rb') as devnull:
+        subprocess.Popen([sys.executable, str(Path(__file__).resolve()), 'run'], stdin=devnull,
+                         stdout=log_file, stderr=log_file, start_new_session=True, close_fds=True)
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        if request('/health') is not None:
+            return True
+        time.sleep(0.2)
+    return False
+
+
+def stop_supervisor(wait: float = STOP_GRACE_SECONDS + 10) -> bool:
+    """Ask the supervisor to stop its services and exit"""
+    lock = acquire_lock()
+    if lock is not None:
+        # Nobody holds the lock, so the state file is stale and its pid is not ours to signal
+        lock.close()
+        return True
+    if request('/stop', method='POST') is None:
+        try:
+            pid = json.loads(STATE_FILE.read_text())['pid']
+            os.kill(pid, signal.SIGTERM)
+        except (OSError, ValueError, KeyError):
+            return True
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        lock = acquire_lock()
+        if lock is not None:
+            lock.close()
+            return True
+        time.sleep(0.2)
+    return False
+
+
+def print_status(report: Optional[Dict], only: Optional[str] = None):
+    """Status lines; with `only`, just that service so callers can grep for "✅ Running"."""
+    if report is None:
+        print(f"  {only or 'Supervisor'}: ❌ Not running")
+        return
+    if only is not None and only not in report['services']:
+        print(f"  {only}: ❌ Not supervised")
+        return
+    if only is None:
+        print(f"  Supervisor: ✅ Running (PID: {report['pid']}, up {report['uptime']:.0f}s)")
+    for name, s in report['services'].items():
+        if only is not None and name != only:
+            continue
+        if s['state'] == 'running':
+            health = {True: "healthy", False: "not responding", None: "starting"}[s['healthy']]
+            print(f"  {name}: ✅ Running (PID: {s['pid']}, {health}, {s['rss_mb']:.0f} MB, "
+                  f"{s['cpu_percent']:.0f}% CPU, {s['process_count']} processes, {s['restarts']} restarts)")
+        elif s['state'] == 'backoff':
+            print(f"  {name}: ⏳ Restarting in {s['next_start']:.0f}s ({s['last_error']})")
+        else:
+            print(f"  {name}: ❌ {s['state'].capitalize()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Supervise the Multi-MCP proxy and its MCP servers")
+    parser.add_argument("action", choices=["run", "start", "stop", "restart", "status", "resources", "reap"])
+    parser.add_argument("service", nargs="?", help="Service to restart or report on")
+    parser.add_argument("--json", action="store_true", help="Machine-readable output")
+    args = parser.parse_args()
+
+    if args.action == "run":
+        lock = acquire_lock()
+        if lock is None:
+            print("MCP supervisor is already running")
+            sys.exit(0)
+        Supervisor(load_config()).run()
+
+    elif args.action == "start":
+        if start_background():
+            print("✅ MCP supervisor running")
+        else:
+            print(f"❌ MCP supervisor did not come up, see {LOG_FILE}")
+            sys.exit(1)
+
+    elif args.action == "stop":
+        if stop_supervisor():
+            print("✅ MCP supervisor and its services stopped")
+        else:
+            print("❌ MCP supervisor did not stop in time")
+            sys.exit(1)
+
+    elif args.action == "restart":
+        if args.service:
+            result = request(f"/restart/{args.service}", method='POST', timeout=STOP_GRACE_SECONDS + 5)
+            print(f"🔄 {result}" if result else "❌ MCP supervisor is not running")
+            sys.exit(0 if result and 'restarted' in result else 1)
+        stop_supervisor()
+        sys.exit(0 if start_background() else 1)
+
+    elif args.action in ("status", "resources"):
+        report = request('/health' if args.action == "status" else '/resources')
+        if args.json:
+            print(json.dumps(report, indent=2))
+        elif args.action == "status":
+            print_status(report, args.service)
+            if args.service:
+                service = (report or {}).get('services', {}).get(args.service, {})
+                sys.exit(0 if service.get('state') == 'running' else 1)
+        elif report is None:
+            print("❌ MCP supervisor is not running")
+        else:
+            for name, usage in report.items():
+                print(f"{name}: {usage['rss_mb']:.0f} MB, {usage['cpu_percent']:.0f}% CPU")
+                for p in usage['processes']:
+                    print(f"  {p['pid']:>7} {p['rss_mb']:>8.1f} MB {p['cpu_percent']:>6.1f}%  {p['command'][:80]}")
+        sys.exit(0 if report and report.get('status', 'ok') == 'ok' else 1)
+
+    elif args.action == "reap":
+        supervised = request('/health') or {'services': {}}
+        supervisor = Supervisor({'services': {}, 'stray_patterns': load_config().get('stray_patterns', DEFAULT_STRAY_PATTERNS)})
+        # Never touch groups owned by a running supervisor
+        for name, s in supervised['services'].items():
+            placeholder = Service(name, {'command': ['true']})
+            placeholder.pgid = s.get('pid')
+            supervisor.services[name] = placeholder
+        killed = supervisor.reap_strays(process_table())
+        print(f"🧹 Reaped {len(killed)} orphaned MCP processes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Git History Backfill
+Streams a repository's history through the batcher's summarization and
+ingests it as weekly (or daily) episodes through the ingest daemon. A
+checkpoint of ingested commits makes the backfill resumable and reruns
+skip work already done.
+"""
+
+import os
+import sys
+import json
+import hashlib
+import argparse
+import subprocess
+import importlib.util
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+CLAUDE_DIR = Path.home() / ".claude"
+CHECKPOINT_DIR = CLAUDE_DIR / "backfill"
+BATCHER_PATH = Path(__file__).resolve().parent / "graphiti-batcher.py"
+
+DEFAULT_MAX_COMMITS = 25
+# Episodes handed to the ingest daemon before each checkpoint
+DEFAULT_WINDOW = 20
+MAX_SUBJECTS = 12
+
+RECORD_SEP = '\x1e'
+FIELD_SEP = '\x1f'
+
+
+def load_batcher_class():
+    """graphiti-batcher.py has a hyphenated name, so load it by path"""
+    spec = importlib.util.spec_from_file_location("graphiti_batcher", BATCHER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.SmartMemoryBatcher
+
+
+class Commit:
+    """One commit from git log"""
+
+    __slots__ = ('sha', 'timestamp', 'author', 'subject', 'files')
+
+    def __init__(self, sha: str, timestamp: int, author: str, subject: str, files: List[str]):
+        self.sha = sha
+        self.timestamp = timestamp
+        self.author = author
+        self.subject = subject
+        self.files = files
+
+
+def stream_commits(repo: Path, since: Optional[str] = None) -> Iterator[Commit]:
+    """Oldest-first commits, parsed incrementally from a single git log process"""
+    cmd = ['git', '-C', str(repo), 'log', '--reverse', '--no-merges', '--name-only',
+           f'--format={RECORD_SEP}%H{FIELD_SEP}%at{FIELD_SEP}%an{FIELD_SEP}%s']
+    if since:
+        cmd.append(f'--since={since}')
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                               text=True, errors='replace')
+
+    current = None
+    try:
+        for line in process.stdout:
+            line = line.rstrip('\n')
+            if line.startswith(RECORD_SEP):
+                if current:
+                    yield current
+                sha, timestamp, author, subject = line[1:].split(FIELD_SEP, 3)
+                current = Commit(sha, int(timestamp), author, subject, [])
+            elif line and current:
+                current.files.append(line)
+        if current:
+            yield current
+    finally:
+        process.stdout.close()
+        process.wait()
+
+
+class BackfillCheckpoint:
+    """Commits already ingested for one repository"""
+
+    def __init__(self, repo: Path):
+        key = hashlib.sha256(str(repo).encode()).hexdigest()[:12]
+        CHECKPOINT_DIR.mkdir(parents=True, exist_ok=True)
+        self.path = CHECKPOINT_DIR / f"{repo.name}-{key}.json"
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            data = {}
+        self.repo = str(repo)
+        self.ingested = set(data.get('ingested', []))
+        self.episodes = data.get('episodes', 0)
+        self.updated = data.get('updated')
+
+    def __contains__(self, sha: str) -> bool:
+        return sha[:12] in self.ingested
+
+    def mark(self, commits: List[Commit], episodes: int):
+        self.ingested.update(c.sha[:12] for c in commits)
+        self.episodes += episodes
+        self.updated = datetime.now().isoformat()
+        tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        tmp_path.write_text(json.dumps({
+            'repo': self.repo,
+            'updated': self.updated,
+            'episodes': self.episodes,
+            'ingested': sorted(self.ingested)
+        }))
+        os.replace(tmp_path, self.path)
+
+
+def period_of(commit: Commit, group: str) -> str:
+    moment = datetime.fromtimestamp(commit.timestamp)
+    if group == 'day':
+        return moment.strftime('%Y-%m-%d')
+    year, week, _ = moment.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def group_commits(commits: Iterator[Commit], group: str, max_commits: int) -> Iterator[List[Commit]]:
+    """Consecutive commits of the same period, split so no episode grows too large"""
+    current = []
+    current_period = None
+    for commit in commits:
+        period = period_of(commit, group)
+        if current and (period != current_period or len(current) >= max_commits):
+            yield current
+            current = []
+        current_period = period
+        current.append(commit)
+    if current:
+        yield current
+
+
+class HistorySummarizer:
+    """Runs commit groups through the batcher's summarization without touching its live batch"""
+
+    def __init__(self, project: str):
+        base = load_batcher_class()
+
+        class HistoryBatcher(base):
+            def __init__(self):
+                self.flush_interval = 0
+                self.config_file = Path.home() / ".claude" / "memory-config.json"
+                self.project_context = project
+                self.load_config()
+                self.reset_batch()
+
+            def get_project_context(self) -> str:
+                return project
+
+            def add_event(self, event):
+                self.record(event)
+
+            def maybe_flush(self):
+                pass
+
+            def append_history(self, summary: str):
+                pass
+
+        self.batcher = HistoryBatcher()
+        self.project = project
+
+    def summarize(self, commits: List[Commit]) -> str:
+        self.batcher.reset_batch()
+        for commit in commits:
+            for path in commit.files:
+                self.batcher.add_file_edit(path, 'committed')
+        work = self.batcher.create_summary() or f"[{self.project}] Small changes"
+
+        start = datetime.fromtimestamp(commits[0].timestamp).strftime('%Y-%m-%d')
+        end = datetime.fromtimestamp(commits[-1].timestamp).strftime('%Y-%m-%d')
+        span = start if start == end else f"{start}..{end}"
+        subjects = [c.subject for c in commits[:MAX_SUBJECTS]]
+        if len(commits) > MAX_SUBJECTS:
+            subjects.append(f"+{len(commits) - MAX_SUBJECTS} more")
+        authors = Counter(c.author for c in commits)
+
+        return (f"{work} | History {span}: {len(commits)} commits "
+                f"({commits[0].sha[:8]}..{commits[-1].sha[:8]}) | "
+                f"Commits: {'; '.join(subjects)} | "
+                f"Authors: {', '.join(name for name, _ in authors.most_common(3))}")
+
+
+def ingest_window(episodes: List[str], use_queue: bool) -> Dict:
+    """Store a window of episodes; anything not stored before the deadline stays spooled, so all become durable"""
+    if use_queue:
+        from graphiti_ingest import submit
+        for episode in episodes:
+            submit(episode, source="git-backfill", priority="low")
+        return {'saved': 0, 'spooled': len(episodes), 'failed': 0}
+
+    from memory_chunker import ingest_chunks
+    return ingest_chunks(episodes, priority="low", source="git-backfill")
+
+
+def backfill(repo: Path, project: Optional[str] = None, since: Optional[str] = None, group: str = 'week',
+             max_commits: int = DEFAULT_MAX_COMMITS, window: int = DEFAULT_WINDOW, use_queue: bool = False, dry_run: bool = False) -> Dict:
+    """Backfill unseen commits; checkpoints after every window of episodes"""
+    repo = repo.resolve()
+    project = project or repo.name
+    checkpoint = BackfillCheckpoint(repo)
+    summarizer = HistorySummarizer(project)
+    totals = {'commits': 0, 'skipped': 0, 'episodes': 0, 'saved': 0, 'spooled': 0, 'failed': 0}
+
+    def unseen():
+        for commit in stream_commits(repo, since):
+            if commit.sha in checkpoint:
+                totals['skipped'] += 1
+                continue
+            yield commit
+
+    pending_episodes, pending_commits = [], []
+
+    def flush():
+        if not pending_episodes:
+            return
+        if dry_run:
+            for episode in pending_episodes:
+                print(episode)
+        else:
+            result = ingest_window(pending_episodes, use_queue)
+            for key in ('saved', 'spooled', 'failed'):
+                totals[key] += result.get(key, 0)
+            if not result.get('failed'):
+                checkpoint.mark(pending_commits, len(pending_episodes))
+        totals['episodes'] += len(pending_episodes)
+        pending_episodes.clear()
+        pending_commits.clear()
+
+    for commits in group_commits(unseen(), group, max_commits):
+        pending_episodes.append(summarizer.summarize(commits))
+        pending_commits.extend(commits)
+        totals['commits'] += len(commits)
+        if len(pending_episodes) >= window:
+            flush()
+            if totals['failed']:
+                break
+    flush()
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill git history into memory")
+    parser.add_argument("action", choices=["run", "status"])
+    parser.add_argument("repo", nargs="?", default=".", help="Repository path")
+    parser.add_argument("--project", help="Project name (defaults to the repository directory name)")
+    parser.add_argument("--since", help="Only commits after this date (git --since syntax)")
+    parser.add_argument("--group", choices=["week", "day"], default="week", help="Episode period")
+    parser.add_argument("--max-commits", type=int, default=DEFAULT_MAX_COMMITS, help="Commits per episode")
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW, help="Episodes per checkpoint")
+    parser.add_argument("--queue", action="store_true", help="Queue episodes without waiting for them")
+    parser.add_argument("--dry-run", action="store_true", help="Print episodes without ingesting")
+    args = parser.parse_args()
+
+    repo = Path(args.repo).resolve()
+    if subprocess.run(['git', '-C', str(repo), 'rev-parse', '--git-dir'],
+                      capture_output=True).returncode != 0:
+        print(f"Not a git repository: {repo}")
+        sys.exit(1)
+
+    if args.action == "status":
+        checkpoint = BackfillCheckpoint(repo)
+        print(f"Repository: {repo}")
+        print(f"Commits ingested: {len(checkpoint.ingested)} in {checkpoint.episodes} episodes")
+        print(f"Last update: {checkpoint.updated or 'never'}")
+        return
+
+    print(f"📜 Backfilling {repo.name} history...")
+    totals = backfill(repo, args.project, args.since, args.group, args.max_commits,
+                      args.window, args.queue, args.dry_run)
+    print(f"✅ {totals['commits']} commits in {totals['episodes']} episodes "
+          f"({totals['saved']} saved, {totals['spooled']} queued, {totals['failed']} failed); "
+          f"{totals['skipped']} already ingested")
+    sys.exit(1 if totals['failed'] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Memory Chunker
+Splits large memories into token-budgeted chunks without breaking code
+blocks, lists or file paths, and hands them to the ingest daemon, which
+stores them concurrently over its warm Graphiti client; the caller waits
+for them under an overall deadline.
+"""
+
+import os
+import re
+import sys
+import json
+import math
+import time
+import argparse
+from pathlib import Path
+from typing import List, Optional
+
+# ~350 tokens keeps each episode well inside the extraction model's comfort zone
+DEFAULT_CHUNK_TOKENS = int(os.environ.get('MEMORY_CHUNK_TOKENS', '350'))
+DEFAULT_DEADLINE = float(os.environ.get('MEMORY_CHUNK_DEADLINE', '600'))
+SPOOL_POLL_SECONDS = 0.25
+
+TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+FENCE_RE = re.compile(r'^\s*(```|~~~)')
+LIST_ITEM_RE = re.compile(r'^\s*(?:[-*+]|\d+[.)])\s+')
+# Sentence end: terminal punctuation followed by whitespace and a capital/opening char.
+# Dots inside paths, versions and identifiers (src/app.py, v1.2.3) have no whitespace after them.
+SENTENCE_END_RE = re.compile(r'(?<=[.!?])\s+(?=[A-Z0-9\[\(\'"`])')
+PROJECT_TAG_RE = re.compile(r'^(\[[^\]\n]{1,80}\])\s*')
+
+TIKTOKEN_ENCODING = "cl100k_base"
+TIKTOKEN_BLOB_URL = "https://openaipublic.blob.core.windows.net/encodings/cl100k_base.tiktoken"
+# Resolved on first use: None = not yet checked, False = use the heuristic
+_ENCODING = None
+
+
+def cached_encoding():
+    """tiktoken's encoding, but only if its BPE file is already cached; hooks never download it"""
+    global _ENCODING
+    if _ENCODING is None:
+        _ENCODING = False
+        # Same lookup order as tiktoken's own cache; an empty setting disables the cache
+        if 'TIKTOKEN_CACHE_DIR' in os.environ:
+            cache_dir = os.environ['TIKTOKEN_CACHE_DIR']
+        elif 'DATA_GYM_CACHE_DIR' in os.environ:
+            cache_dir = os.environ['DATA_GYM_CACHE_DIR']
+        else:
+            import tempfile
+            cache_dir = os.path.join(tempfile.gettempdir(), "data-gym-cache")
+        if cache_dir:
+            import hashlib
+            if os.path.exists(os.path.join(cache_dir, hashlib.sha1(TIKTOKEN_BLOB_URL.encode()).hexdigest())):
+                try:
+                    import tiktoken
+                    _ENCODING = tiktoken.get_encoding(TIKTOKEN_ENCODING)
+                except Exception:
+                    _ENCODING = False
+    return _ENCODING or None
+
+
+def estimate_tokens(text: str) -> int:
+    """Token count via tiktoken when its encoding is cached, otherwise a close heuristic"""
+    encoding = cached_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    # Long identifiers split into several BPE tokens, roughly one per 4 characters
+    return sum(math.ceil(len(tok) / 4) for tok in TOKEN_RE.findall(text))
+
+
+def split_blocks(text: str) -> List[str]:
+    """Split text into atomic blocks: fenced code, list runs and paragraphs"""
+    blocks = []
+    current = []
+    mode = None  # None, 'code', 'list', 'para'
+
+    def flush():
+        if current:
+            blocks.append('\n'.join(current).strip('\n'))
+            current.clear()
+
+    for line in text.splitlines():
+        if mode == 'code':
+            current.append(line)
+            if FENCE_RE.match(line):
+                flush()
+                mode = None
+            continue
+
+        if FENCE_RE.match(line):
+            flush()
+            current.append(line)
+            mode = 'code'
+        elif not line.strip():
+            flush()
+            mode = None
+        elif LIST_ITEM_RE.match(line) or (mode == 'list' and line.startswith((' ', '\t'))):
+            if mode != 'list':
+                flush()
+            current.append(line)
+            mode = 'list'
+        else:
+            if mode == 'list':
+                flush()
+            current.append(line)
+            mode = 'para'
+
+    flush()
+    return [b for b in blocks if b.strip()]
+
+
+def split_oversized(block: str, budget: int) -> List[str]:
+    """Break a block larger than the budget at the gentlest available boundary"""
+    if FENCE_RE.match(block) or LIST_ITEM_RE.match(block):
+        units = block.split('\n')
+        joiner = '\n'
+    else:
+        units = SENTENCE_END_RE.split(block)
+        joiner = ' '
+
+    pieces = []
+    for unit in units:
+        if estimate_tokens(unit) <= budget:
+            pieces.append(unit)
+            continue
+        # Last resort: whitespace boundaries, so paths and identifiers stay whole
+        words = unit.split(' ')
+        current = []
+        for word in words:
+            if current and estimate_tokens(' '.join(current + [word])) > budget:
+                pieces.append(' '.join(current))
+                current = []
+            current.append(word)
+        if current:
+            pieces.append(' '.join(current))
+
+    return pack(pieces, budget, joiner)
+
+
+def pack(units: List[str], budget: int, joiner: str) -> List[str]:
+    """Greedily pack units into chunks that stay within the token budget"""
+    chunks = []
+    current = []
+    current_tokens = 0
+    for unit in units:
+        tokens = estimate_tokens(unit)
+        if current and current_tokens + tokens > budget:
+            chunks.append(joiner.join(current))
+            current, current_tokens = [], 0
+        current.append(unit)
+        current_tokens += tokens
+    if current:
+        chunks.append(joiner.join(current))
+    return chunks
+
+
+def chunk_memory(content: str, budget: int = DEFAULT_CHUNK_TOKENS, project: Optional[str] = None) -> List[str]:
+    """Split a memory into self-contained chunks of at most ~budget tokens"""
+    tag = None
+    match = PROJECT_TAG_RE.match(content)
+    if match:
+        tag = match.group(1)
+        content = content[match.end():]
+    elif project:
+        tag = f"[{project}]"
+
+    # Leave room for the tag and part marker added below
+    body_budget = max(budget - 16, 32)
+    units = []
+    for block in split_blocks(content):
+        if estimate_tokens(block) > body_budget:
+            units.extend(split_oversized(block, body_budget))
+        else:
+            units.append(block)
+
+    chunks = pack(units, body_budget, '\n\n')
+    total = len(chunks)
+    prefix = f"{tag} " if tag else ""
+    if total == 1:
+        return [prefix + chunks[0]]
+    return [f"{prefix}(part {i}/{total}) {chunk}" for i, chunk in enumerate(chunks, 1)]
+
+
+def ingest_chunks(chunks: List[str], priority: str = "normal", deadline: float = DEFAULT_DEADLINE,
+                  source: str = "memory-chunker") -> dict:
+    """Spool chunks for the ingest daemon and wait until each is stored, dead-lettered or the deadline passes.
+
+    Chunks still queued at the deadline stay spooled and are ingested in the background.
+    """
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    from graphiti_ingest import FAILED_DIR, submit
+    stop_at = time.monotonic() + deadline
+    results = {'saved': 0, 'failed': 0, 'spooled': 0}
+
+    waiting = {index: submit(chunk, source=source, priority=priority) for index, chunk in enumerate(chunks)}
+    while waiting:
+        # The daemon deletes a spool file once stored, after copying it to FAILED_DIR if it gave up
+        for index, path in list(waiting.items()):
+            if path.exists():
+                continue
+            del waiting[index]
+            if (FAILED_DIR / path.name).exists():
+                results['failed'] += 1
+            else:
+                results['saved'] += 1
+                print(f"  📌 Memory {index + 1}/{len(chunks)}: {chunks[index][:60]}...")
+        if not waiting or time.monotonic() >= stop_at:
+            break
+        time.sleep(SPOOL_POLL_SECONDS)
+
+    results['spooled'] = len(waiting)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chunk a memory read from stdin")
+    parser.add_argument("action", choices=["chunk", "ingest"])
+    parser.add_argument("--project", help="Project tag added to chunks without one")
+    parser.add_argument("--tokens", type=int, default=DEFAULT_CHUNK_TOKENS, help="Token budget per chunk")
+    parser.add_argument("--priority", default="normal", help="Ingest queue lane (high, normal, low)")
+    parser.add_argument("--deadline", type=float, default=DEFAULT_DEADLINE, help="Overall deadline in seconds")
+    args = parser.parse_args()
+
+    # Content always arrives on stdin so quotes and backslashes survive intact
+    content = sys.stdin.read()
+    chunks = chunk_memory(content, args.tokens, args.project)
+
+    if args.action == "chunk":
+        for chunk in chunks:
+            print(json.dumps(chunk))
+        return
+
+    print(f"💾 Saving {len(chunks)} smaller memories...")
+    results = ingest_chunks(chunks, args.priority, args.deadline)
+    print(f"✅ Completed: Saved {results['saved']} focused memories"
+          + (f", {results['spooled']} queued for background ingestion" if results['spooled'] else "")
+          + (f", {results['failed']} failed" if results['failed'] else ""))
+    sys.exit(1 if results['failed'] else 0)
+
+
+if __name__ == "__main__":
+    main()
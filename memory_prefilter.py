@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Memory Pre-filter
+Rule-based triage of memories using memory-config.json. Clear SAVE and
+SKIP cases are decided immediately; only ambiguous content is escalated to
+the (expensive) smart memory assessor.
+"""
+
+import re
+import sys
+import json
+import time
+import fcntl
+import fnmatch
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+CLAUDE_DIR = Path.home() / ".claude"
+CONFIG_FILE = CLAUDE_DIR / "memory-config.json"
+STATS_FILE = CLAUDE_DIR / "memory-prefilter-stats.json"
+
+MIN_CONTENT_CHARS = 15
+# Below this length a low-importance-only memory is noise
+LOW_IMPORTANCE_MAX_CHARS = 120
+# Medium-importance content needs some substance to be a clear save
+MEDIUM_MIN_CHARS = 40
+
+# Prefixes produced by this repo's own hooks
+STRUCTURED_PREFIXES = {
+    '[error]': 'high',
+    '[git commit]': 'high',
+    '[discovery]': 'medium',
+    'architecture snapshot': 'medium',
+    'conversation compacted': 'medium',
+}
+
+PATH_RE = re.compile(r'(?:[\w.~-]*/)+[\w.-]+|[\w-]+\.\w{1,5}\b')
+PROJECT_TAG_RE = re.compile(r'^\[[^\]\n]{1,80}\]\s*')
+
+DEFAULT_CONFIG = {
+    "filtering": {
+        "ignore_patterns": ["*.log", "*.tmp", "__pycache__", ".git", "node_modules"],
+        "trivial_commands": ["ls", "cd", "pwd", "echo", "cat", "which", "clear"]
+    },
+    "importance_rules": {
+        "high": ["git commit", "npm publish", "deploy", "migration", "hotfix"],
+        "medium": ["test", "refactor", "feature", "npm install", "pip install"],
+        "low": ["style", "typo", "format", "lint"]
+    }
+}
+
+
+def load_config() -> Dict:
+    """Load memory-config.json, falling back to the batcher defaults"""
+    try:
+        return json.loads(CONFIG_FILE.read_text())
+    except (OSError, ValueError):
+        return DEFAULT_CONFIG
+
+
+def keyword_regex(keywords) -> Optional[re.Pattern]:
+    """Single alternation regex matching keywords as whole words ("format" never matches "information")"""
+    keywords = [k.lower() for k in keywords if k]
+    if not keywords:
+        return None
+    alternation = '|'.join(re.escape(k) for k in sorted(keywords, key=len, reverse=True))
+    return re.compile(r'\b(?:' + alternation + r')\b')
+
+
+class MemoryPrefilter:
+    """Decides SAVE / SKIP / ESCALATE from configured rules"""
+
+    def __init__(self, config: Optional[Dict] = None):
+        config = config or load_config()
+        filtering = config.get('filtering', {})
+        rules = config.get('importance_rules', {})
+
+        self.trivial_commands = set(filtering.get('trivial_commands', []))
+        self.ignore_patterns = filtering.get('ignore_patterns', [])
+        self.importance = {level: keyword_regex(rules.get(level, [])) for level in ('high', 'medium', 'low')}
+
+    def is_ignored_path(self, path: str) -> bool:
+        name = path.rsplit('/', 1)[-1]
+        return any(fnmatch.fnmatch(name, pattern) or f"/{pattern}/" in f"/{path}/"
+                   for pattern in self.ignore_patterns)
+
+    def assess(self, content: str) -> Tuple[str, str, str]:
+        """Return (decision, priority, reason) where decision is SAVE, SKIP or ESCALATE"""
+        content = content.strip()
+        for prefix, priority in STRUCTURED_PREFIXES.items():
+            if content[:len(prefix)].lower() == prefix:
+                return 'SAVE', priority, f"structured {prefix.strip('[]')} memory"
+
+        text = PROJECT_TAG_RE.sub('', content)
+        lower = text.lower()
+
+        if len(text) < MIN_CONTENT_CHARS:
+            return 'SKIP', '', f"too short ({len(text)} chars)"
+
+        words = lower.split()
+        if words[0].lstrip('$') in self.trivial_commands and len(words) <= 4:
+            return 'SKIP', '', f"trivial command: {words[0]}"
+
+        paths = PATH_RE.findall(text)
+        if paths and all(self.is_ignored_path(p) for p in paths) and len(text) < LOW_IMPORTANCE_MAX_CHARS:
+            return 'SKIP', '', "only references ignored files"
+
+        match = self.importance['high'] and self.importance['high'].search(lower)
+        if match:
+            return 'SAVE', 'high', f"high-importance keyword: {match.group(0)}"
+
+        match = self.importance['medium'] and self.importance['medium'].search(lower)
+        if match and len(text) >= MEDIUM_MIN_CHARS:
+            return 'SAVE', 'medium', f"medium-importance keyword: {match.group(0)}"
+
+        match = self.importance['low'] and self.importance['low'].search(lower)
+        if match and not paths and len(text) < LOW_IMPORTANCE_MAX_CHARS:
+            return 'SKIP', '', f"low-importance change: {match.group(0)}"
+
+        return 'ESCALATE', '', "no decisive rule matched"
+
+
+def record_decision(decision: str, elapsed_us: float):
+    """Accumulate decision counters for the escalation-ratio metric"""
+    try:
+        with open(STATS_FILE, 'a+') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            f.seek(0)
+            try:
+                stats = json.loads(f.read() or '{}')
+            except ValueError:
+                stats = {}
+            key = decision.lower()
+            stats[key] = stats.get(key, 0) + 1
+            stats['decision_us_total'] = stats.get('decision_us_total', 0) + elapsed_us
+            f.seek(0)
+            f.truncate()
+            f.write(json.dumps(stats))
+    except OSError:
+        pass
+
+
+def load_stats() -> Dict:
+    """Counters plus derived escalation ratio"""
+    try:
+        stats = json.loads(STATS_FILE.read_text())
+    except (OSError, ValueError):
+        stats = {}
+    total = sum(stats.get(k, 0) for k in ('save', 'skip', 'escalate'))
+    stats['total'] = total
+    stats['escalation_ratio'] = stats.get('escalate', 0) / total if total else 0.0
+    stats['mean_decision_us'] = stats.get('decision_us_total', 0) / total if total else 0.0
+    return stats
+
+
+def escalate(content: str) -> str:
+    """Run the smart assessor in this process if its dependencies are importable"""
+    sys.path.append(str(CLAUDE_DIR))
+    try:
+        from smart_memory_assessor import MemoryAssessor
+    except ImportError:
+        # Caller falls back to the assessor in its own environment
+        return "ESCALATE"
+    should_save, priority, reason = MemoryAssessor().assess_importance(content)
+    return f"SAVE:{priority}:{reason}" if should_save else f"SKIP:{reason}"
+
+
+# CLI interface
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: memory_prefilter.py {assess|stats}  (assess reads content from stdin)")
+        sys.exit(1)
+
+    action = sys.argv[1]
+
+    if action == "assess":
+        content = sys.stdin.read()
+        prefilter = MemoryPrefilter()
+        started = time.perf_counter()
+        decision, priority, reason = prefilter.assess(content)
+        record_decision(decision, (time.perf_counter() - started) * 1e6)
+
+        if decision == 'SAVE':
+            print(f"SAVE:{priority}:{reason}")
+        elif decision == 'SKIP':
+            print(f"SKIP:{reason}")
+        else:
+            try:
+                print(escalate(content))
+            except Exception as e:
+                print(f"ERROR:{e}")
+
+    elif action == "stats":
+        stats = load_stats()
+        print(f"Decisions: {stats['total']} (save {stats.get('save', 0)}, "
+              f"skip {stats.get('skip', 0)}, escalated {stats.get('escalate', 0)})")
+        print(f"Escalation ratio: {stats['escalation_ratio']:.1%}")
+        print(f"Mean rule evaluation: {stats['mean_decision_us']:.1f} µs")
+
+    else:
+        print(f"Unknown action: {action}")
+        sys.exit(1)
@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""
+Memory Rollup
+Merges a project's fine-grained memories (ingest history, batcher history
+and code-change logs) into one digest episode per day or week. Digests
+list the ids of the memories they cover and are only written once per
+closed period, so reruns are safe. Once a digest is ingested, the ingest
+daemon removes the original episodes it replaces (and any earlier revision
+of the digest) from the graph. Old history the rollup no longer looks at
+is pruned.
+"""
+
+import os
+import sys
+import json
+import fcntl
+import argparse
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from graphiti_ingest import HISTORY_DIR, PROJECT_TAG_RE, memory_id
+from memory_store import shards
+
+CLAUDE_DIR = Path.home() / ".claude"
+BATCH_HISTORY_FILE = CLAUDE_DIR / "graphiti-batch-history.jsonl"
+CODE_CHANGES_STORE = "code-changes"
+# Change logs from before the sharded store, until the code-change hook imports them
+CODE_CHANGES_DIR = CLAUDE_DIR / "code-changes"
+STATE_FILE = CLAUDE_DIR / "memory-rollups.json"
+LOCAL_BACKEND_FILE = CLAUDE_DIR / "rollup-digests.jsonl"
+
+DEFAULT_LOOKBACK_DAYS = int(os.environ.get('MEMORY_ROLLUP_LOOKBACK_DAYS', '14'))
+# Periods with fewer fragments than this are not worth a digest
+MIN_FRAGMENTS = int(os.environ.get('MEMORY_ROLLUP_MIN_FRAGMENTS', '3'))
+MAX_SECTION_ITEMS = 8
+# Leave the original episodes in the graph next to their digest
+KEEP_ORIGINALS = os.environ.get('MEMORY_ROLLUP_KEEP_ORIGINALS', '') == '1'
+# Batch and ingest history older than this is dropped; never less than the lookback plus a week
+HISTORY_RETENTION_DAYS = int(os.environ.get('MEMORY_HISTORY_RETENTION_DAYS', '30'))
+
+SECTION_PREFIXES = (
+    ('[Git Commit]', 'Commits'),
+    ('[Error]', 'Errors'),
+    ('[Discovery]', 'Discoveries'),
+)
+
+
+def period_key(timestamp: float, period: str) -> str:
+    """2026-10-18 for daily digests, 2026-W42 for weekly ones"""
+    moment = datetime.fromtimestamp(timestamp)
+    if period == 'week':
+        year, week, _ = moment.isocalendar()
+        return f"{year}-W{week:02d}"
+    return moment.strftime('%Y-%m-%d')
+
+
+def period_start(key: str, period: str) -> datetime:
+    """Midnight starting a day, or the Monday starting an ISO week"""
+    if period == 'week':
+        year, week = key.split('-W')
+        return datetime.fromisocalendar(int(year), int(week), 1)
+    return datetime.strptime(key, '%Y-%m-%d')
+
+
+def period_closed(key: str, period: str, now: datetime) -> bool:
+    """Only finished periods are rolled up, so their membership no longer changes"""
+    return key < period_key(now.timestamp(), period)
+
+
+def iter_jsonl(path: Path) -> Iterator[Dict]:
+    try:
+        with open(path) as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+    except OSError:
+        return
+
+
+class Fragment:
+    """One fine-grained memory and where it came from"""
+
+    __slots__ = ('id', 'project', 'timestamp', 'kind', 'text', 'origin', 'details')
+
+    def __init__(self, id: str, project: str, timestamp: float, kind: str, text: str,
+                 origin: str, details: Optional[Dict] = None):
+        self.id = id
+        self.project = project
+        self.timestamp = timestamp
+        self.kind = kind
+        self.text = text
+        self.origin = origin
+        self.details = details or {}
+
+
+def strip_tag(content: str) -> str:
+    match = PROJECT_TAG_RE.match(content)
+    return content[match.end():].strip() if match else content.strip()
+
+
+def collect_fragments(since: float) -> List[Fragment]:
+    """Gather fragments from every local store newer than `since`"""
+    fragments = []
+    batch_summaries = set()
+
+    for record in iter_jsonl(BATCH_HISTORY_FILE):
+        if record.get('flushed', 0) < since:
+            continue
+        batch_summaries.add(memory_id(record['summary']))
+        fragments.append(Fragment(memory_id(record['summary']), record.get('project', 'general'),
+                                  record['flushed'], 'batch', strip_tag(record['summary']),
+                                  BATCH_HISTORY_FILE.name, record))
+
+    start_day = datetime.fromtimestamp(since).strftime('%Y-%m-%d')
+    for path in sorted(HISTORY_DIR.glob('*.jsonl')) if HISTORY_DIR.exists() else []:
+        if path.stem < start_day:
+            continue
+        for entry in iter_jsonl(path):
+            # Digests are never rolled up again, and batch summaries already came with their raw batch
+            if entry['source'] == 'memory-rollup' or entry['id'] in batch_summaries:
+                continue
+            text = strip_tag(entry['content'])
+            kind = next((section for prefix, section in SECTION_PREFIXES if text.startswith(prefix)), 'Notes')
+            fragments.append(Fragment(entry['id'], entry['project'], entry['created'], kind, text,
+                                      f"{HISTORY_DIR.name}/{path.name}"))
+
+    change_logs = []
+    for shard in shards(CODE_CHANGES_STORE):
+        # Folded logs hold the changes from before the last compaction, newer ones are one record each
+        changes = []
+        for record in shard.snapshot().records:
+            changes.extend(record['log'].get('recent_changes', []) if 'log' in record else [record['change']])
+        change_logs.append((shard.project, f"{CODE_CHANGES_STORE}/{shard.project}", changes))
+    for path in sorted(CODE_CHANGES_DIR.glob('*_changes.json')) if CODE_CHANGES_DIR.exists() else []:
+        try:
+            changes = json.loads(path.read_text()).get('recent_changes', [])
+        except (OSError, ValueError):
+            continue
+        change_logs.append((path.name[:-len('_changes.json')], path.name, changes))
+
+    for project, origin, changes in change_logs:
+        for change in changes:
+            timestamp = datetime.fromisoformat(change['timestamp']).timestamp()
+            if timestamp < since:
+                continue
+            fragments.append(Fragment(f"{change['file']}@{change['hash']}", project, timestamp, 'change',
+                                      f"{change['file']} - {change['summary']}", origin, change))
+
+    return fragments
+
+
+def prune_history(cutoff: datetime) -> int:
+    """Drop batch and ingest history older than `cutoff`; returns the number of records removed"""
+    removed = 0
+    cutoff_day = cutoff.strftime('%Y-%m-%d')
+    for path in sorted(HISTORY_DIR.glob('*.jsonl')) if HISTORY_DIR.exists() else []:
+        if path.stem < cutoff_day:
+            removed += sum(1 for _ in iter_jsonl(path))
+            path.unlink(missing_ok=True)
+
+    try:
+        history = open(BATCH_HISTORY_FILE, 'r+')
+    except FileNotFoundError:
+        return removed
+    with history:
+        # The batcher appends under this lock and follows the file if it was swapped out
+        fcntl.flock(history, fcntl.LOCK_EX)
+        lines = history.readlines()
+        kept = []
+        for line in lines:
+            try:
+                if json.loads(line).get('flushed', 0) >= cutoff.timestamp():
+                    kept.append(line)
+            except ValueError:
+                continue
+        if len(kept) == len(lines):
+            return removed
+        removed += len(lines) - len(kept)
+        tmp_path = BATCH_HISTORY_FILE.with_name(f".{BATCH_HISTORY_FILE.name}.tmp")
+        tmp_path.write_text(''.join(kept))
+        os.replace(tmp_path, BATCH_HISTORY_FILE)
+    return removed
+
+
+def capped(items: List[str]) -> str:
+    shown = '; '.join(items[:MAX_SECTION_ITEMS])
+    return shown + (f"; +{len(items) - MAX_SECTION_ITEMS} more" if len(items) > MAX_SECTION_ITEMS else "")
+
+
+def build_digest(project: str, key: str, period: str, fragments: List[Fragment]) -> str:
+    """Render one digest episode from a period's fragments"""
+    fragments = sorted(fragments, key=lambda f: f.timestamp)
+    label = "Daily" if period == 'day' else "Weekly"
+    lines = [f"[{project}] {label} digest {key} ({len(fragments)} memories)"]
+
+    sections = {section: [f.text.split(']', 1)[1].strip() for f in fragments if f.kind == section]
+                for _, section in SECTION_PREFIXES}
+    modules = Counter()
+    commands = Counter()
+    failed = 0
+    for f in fragments:
+        if f.kind != 'batch':
+            continue
+        for module, paths in f.details.get('file_edits', {}).items():
+            modules[module] += len(paths)
+        for command in f.details.get('commands', []):
+            commands[command['command'].split()[0] if command['command'] else '?'] += 1
+            failed += command['exit_code'] != 0
+        sections['Errors'].extend(f.details.get('errors', []))
+        sections['Discoveries'].extend(f.details.get('discoveries', []))
+
+    for _, section in SECTION_PREFIXES:
+        if sections[section]:
+            lines.append(f"{section}: {capped(sections[section])}")
+    if modules:
+        lines.append(f"Work: {sum(modules.values())} file edits across "
+                     + ', '.join(f"{module} ({count})" for module, count in modules.most_common(MAX_SECTION_ITEMS)))
+    if commands:
+        lines.append("Commands: " + ', '.join(f"{cmd} x{count}" for cmd, count in commands.most_common(MAX_SECTION_ITEMS))
+                     + (f" ({failed} failed)" if failed else ""))
+
+    hot_files = Counter(f.details['file'] for f in fragments if f.kind == 'change')
+    if hot_files:
+        lines.append("Most changed files: " + ', '.join(f"{path} ({count})" for path, count in hot_files.most_common(5)))
+
+    notes = [f.text for f in fragments if f.kind == 'Notes']
+    if notes:
+        lines.append(f"Notes: {capped([note[:160] for note in notes])}")
+
+    origins = defaultdict(list)
+    for f in fragments:
+        origins[f.origin].append(f.id)
+    lines.append("Originals: " + ' | '.join(f"{origin}: {', '.join(ids)}" for origin, ids in sorted(origins.items())))
+    return '\n'.join(lines)
+
+
+class LocalBackend:
+    """Offline stand-in for Graphiti: digests are appended to a JSONL file"""
+
+    def __init__(self, path: Path = LOCAL_BACKEND_FILE):
+        self.path = path
+
+    def add(self, content: str, metadata: Dict):
+        with open(self.path, 'a') as f:
+            f.write(json.dumps({'content': content, 'metadata': metadata, 'created': datetime.now().timestamp()}) + '\n')
+
+
+class IngestBackend:
+    """Digests go through the ingest queue at low priority"""
+
+    def add(self, content: str, metadata: Dict):
+        from graphiti_ingest import submit
+        submit(content, source="memory-rollup", metadata=metadata, priority="low")
+
+
+class MemoryRollup:
+    """Builds digests for closed periods that have not been rolled up yet"""
+
+    def __init__(self, backend, period: str = 'day', state_file: Path = STATE_FILE,
+                 keep_originals: bool = KEEP_ORIGINALS):
+        self.backend = backend
+        self.period = period
+        self.keep_originals = keep_originals
+        self.state_file = state_file
+        self.state = self.load_state()
+
+    def load_state(self) -> Dict:
+        try:
+            return json.loads(self.state_file.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def save_state(self):
+        tmp_path = self.state_file.with_name(f".{self.state_file.name}.tmp")
+        tmp_path.write_text(json.dumps(self.state, indent=2))
+        os.replace(tmp_path, self.state_file)
+
+    def forget_before(self, since: float):
+        """Periods older than the lookback are never revisited, so their member ids can go"""
+        expired = []
+        for state_key in self.state:
+            _, period, key = state_key.rsplit(':', 2)
+            if period_start(key, period).timestamp() < since:
+                expired.append(state_key)
+        for state_key in expired:
+            del self.state[state_key]
+        if expired:
+            self.save_state()
+
+    def run(self, lookback_days: int = DEFAULT_LOOKBACK_DAYS, project: Optional[str] = None,
+            include_open: bool = False, dry_run: bool = False) -> List[Dict]:
+        """Digest every eligible period; concurrent runs are serialized on a lock file"""
+        with open(self.state_file.with_suffix('.lock'), 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            self.state = self.load_state()
+            return self._run(lookback_days, project, include_open, dry_run)
+
+    def _run(self, lookback_days: int, project: Optional[str], include_open: bool,
+             dry_run: bool) -> List[Dict]:
+        now = datetime.now()
+        since = (now - timedelta(days=lookback_days)).timestamp()
+        if not dry_run:
+            self.forget_before(since)
+            prune_history(now - timedelta(days=max(HISTORY_RETENTION_DAYS, lookback_days + 7)))
+        groups = defaultdict(list)
+        for fragment in collect_fragments(since):
+            if project and fragment.project != project:
+                continue
+            groups[(fragment.project, period_key(fragment.timestamp, self.period))].append(fragment)
+
+        written = []
+        for (group_project, key), fragments in sorted(groups.items()):
+            if len(fragments) < MIN_FRAGMENTS:
+                continue
+            if not include_open and not period_closed(key, self.period, now):
+                continue
+            # A period cut by the lookback would look like it lost members
+            if period_start(key, self.period).timestamp() < since:
+                continue
+
+            state_key = f"{group_project}:{self.period}:{key}"
+            previous = self.state.get(state_key)
+            known = set(previous.get('member_ids', [])) if previous else set()
+            current = {f.id for f in fragments}
+            # Sources are bounded and pruned, so members only ever disappear; revise only for new ones
+            if previous and current <= known:
+                continue
+            if previous and 'member_ids' not in previous:
+                # Recorded before member ids were kept: adopt the current set rather than re-digest
+                self.state[state_key] = dict(previous, member_ids=sorted(current), members=len(current))
+                if not dry_run:
+                    self.save_state()
+                continue
+            members = sorted(known | current)
+
+            revision = previous['revision'] + 1 if previous else 1
+            content = build_digest(group_project, key, self.period, fragments)
+            if revision > 1:
+                content += f"\nSupersedes revision {previous['revision']} of this digest"
+            metadata = {
+                'name': f"{group_project} {self.period} digest {key}",
+                'project': group_project,
+                'type': 'digest',
+                'period': key,
+                'revision': revision,
+                'rollup_of': members
+            }
+            if not self.keep_originals:
+                # Members of an earlier revision were already replaced, along with that revision itself
+                metadata['replaces'] = sorted(current - known) + ([previous['digest_id']]
+                                                                   if previous and previous.get('digest_id') else [])
+            written.append({'key': state_key, 'fragments': len(fragments), 'content': content})
+            if dry_run:
+                continue
+
+            self.backend.add(content, metadata)
+            self.state[state_key] = {
+                'member_ids': members,
+                'members': len(members),
+                'revision': revision,
+                'digest_id': memory_id(content),
+                'created': now.isoformat()
+            }
+            self.save_state()
+        return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Roll fine-grained memories up into digests")
+    parser.add_argument("action", choices=["run", "status"])
+    parser.add_argument("--period", choices=["day", "week"], default="day")
+    parser.add_argument("--project", help="Only this project")
+    parser.add_argument("--days", type=int, default=DEFAULT_LOOKBACK_DAYS, help="Lookback window")
+    parser.add_argument("--backend", choices=["graphiti", "local"],
+                        default=os.environ.get('MEMORY_ROLLUP_BACKEND', 'graphiti'))
+    parser.add_argument("--include-open", action="store_true", help="Also digest the current period")
+    parser.add_argument("--keep-originals", action="store_true", default=KEEP_ORIGINALS,
+                        help="Do not remove the episodes a digest replaces")
+    parser.add_argument("--dry-run", action="store_true", help="Print digests without storing them")
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args()
+
+    backend = LocalBackend() if args.backend == "local" else IngestBackend()
+    rollup = MemoryRollup(backend, args.period, keep_originals=args.keep_originals)
+
+    if args.action == "status":
+        for key, info in sorted(rollup.state.items()):
+            print(f"{key:<45} rev {info['revision']}  {info['members']:>4} memories  {info['created'][:16]}")
+        return
+
+    written = rollup.run(args.days, args.project, args.include_open, args.dry_run)
+    if args.quiet:
+        return
+    for digest in written:
+        if args.dry_run:
+            print(digest['content'] + '\n')
+        else:
+            print(f"📚 {digest['key']}: {digest['fragments']} memories rolled up")
+    if not written:
+        print("Nothing to roll up")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Memory Store
+Per-project sharded storage for local memory state. A shard is a directory
+of immutable JSONL segments plus a MANIFEST naming the live ones. Small
+appends are buffered inline in the manifest and spilled into one segment
+per batch. Writers swap the manifest atomically under a writer lock;
+readers load one manifest and get a consistent snapshot without taking
+any lock.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import fcntl
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+CLAUDE_DIR = Path.home() / ".claude"
+STORE_DIR = Path(os.environ.get('MEMORY_STORE_DIR', CLAUDE_DIR / "store"))
+MANIFEST_NAME = "MANIFEST"
+LOCK_NAME = ".lock"
+
+# Appended records buffered in the manifest before they are written out as one segment
+MAX_INLINE_RECORDS = int(os.environ.get('MEMORY_STORE_INLINE_RECORDS', '32'))
+# Past this many live segments the next write merges them into one
+MAX_SEGMENTS = int(os.environ.get('MEMORY_STORE_MAX_SEGMENTS', '32'))
+# Superseded segments stay on disk this long so readers holding an older manifest can finish
+RETIRE_GRACE_SECONDS = 60.0
+# A reader whose segments were retired under it starts over from a fresh manifest
+READ_RETRIES = 3
+
+Compactor = Callable[[List[Dict]], List[Dict]]
+
+
+def shard_name(project: str) -> str:
+    name = re.sub(r'[^A-Za-z0-9._-]', '_', project or 'general').strip('.')
+    return name or 'general'
+
+
+def empty_manifest(project: str) -> Dict:
+    return {'project': project, 'generation': 0, 'segments': [], 'inline': [], 'retired': [], 'state': {}}
+
+
+class Snapshot:
+    """Everything one manifest named: a consistent view of the shard"""
+
+    __slots__ = ('generation', 'segments', 'state', 'records')
+
+    def __init__(self, generation: int, segments: List[str], state: Dict, records: List[Dict]):
+        self.generation = generation
+        self.segments = segments
+        self.state = state
+        self.records = records
+
+
+class Transaction:
+    """Changes made while holding the shard's writer lock, committed as one manifest swap"""
+
+    def __init__(self, shard: 'Shard', manifest: Dict):
+        self.shard = shard
+        self.manifest = manifest
+        self.state = dict(manifest['state'])
+        self.segments = list(manifest['segments'])
+        # Records newer than every segment, kept in the manifest itself
+        self.inline = list(manifest.get('inline', []))
+        self.retiring: List[str] = []
+        self._records: Optional[List[Dict]] = None
+
+    @property
+    def records(self) -> List[Dict]:
+        """Live records as of this transaction, loaded on first use"""
+        if self._records is None:
+            self._records = (self.shard.load_segments(self.manifest['segments'])
+                             + self.manifest.get('inline', []))
+        return self._records
+
+    def append(self, records: List[Dict]):
+        """Write records (after any inline ones, which are older) as a new segment"""
+        records, self.inline = self.inline + records, []
+        name = self.shard.write_segment(records)
+        if name:
+            self.segments.append(name)
+
+    def replace(self, records: List[Dict]):
+        """Swap every live segment and inline record for one segment holding `records`"""
+        self.retiring.extend(self.segments)
+        self.segments = []
+        self.inline = []
+        self.append(records)
+
+
+class Shard:
+    """One project's slice of a store"""
+
+    def __init__(self, store: str, project: str, compact: Optional[Compactor] = None,
+                 base_dir: Path = STORE_DIR):
+        self.store = store
+        self.project = project
+        self.path = base_dir / store / shard_name(project)
+        self.compact = compact
+
+    # Readers
+
+    def read_manifest(self) -> Dict:
+        try:
+            manifest = json.loads((self.path / MANIFEST_NAME).read_text())
+        except (OSError, ValueError):
+            return empty_manifest(self.project)
+        return manifest
+
+    def load_segments(self, names: List[str]) -> List[Dict]:
+        records = []
+        for name in names:
+            with open(self.path / name) as f:
+                records.extend(json.loads(line) for line in f if line.strip())
+        return records
+
+    def snapshot(self) -> Snapshot:
+        """Lock-free consistent read of the shard"""
+        for attempt in range(READ_RETRIES):
+            manifest = self.read_manifest()
+            try:
+                records = self.load_segments(manifest['segments']) + manifest.get('inline', [])
+            except FileNotFoundError:
+                if attempt == READ_RETRIES - 1:
+                    raise
+                continue
+            return Snapshot(manifest['generation'], manifest['segments'], manifest['state'], records)
+
+    def size(self) -> int:
+        try:
+            return sum(entry.stat().st_size for entry in self.path.iterdir() if entry.is_file())
+        except OSError:
+            return 0
+
+    # Writers
+
+    def write_segment(self, records: List[Dict]) -> Optional[str]:
+        """Write records to a new segment; it stays invisible until a manifest names it"""
+        if not records:
+            return None
+        self.path.mkdir(parents=True, exist_ok=True)
+        name = f"{time.time_ns():020d}-{os.getpid()}.jsonl"
+        tmp_path = self.path / f".{name}.tmp"
+        with open(tmp_path, 'w') as f:
+            for record in records:
+                f.write(json.dumps(record, separators=(',', ':')) + '\n')
+        os.replace(tmp_path, self.path / name)
+        return name
+
+    @contextmanager
+    def locked(self):
+        self.path.mkdir(parents=True, exist_ok=True)
+        with open(self.path / LOCK_NAME, 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
+
+    @contextmanager
+    def transaction(self) -> Iterator[Transaction]:
+        """Read-modify-write under the writer lock; readers are never blocked"""
+        with self.locked():
+            txn = Transaction(self, self.read_manifest())
+            yield txn
+            if len(txn.segments) > MAX_SEGMENTS:
+                records = self.load_segments(txn.segments) + txn.inline
+                txn.replace(self.compact(records) if self.compact else records)
+            self.commit(txn)
+
+    def append(self, records: List[Dict], update: Optional[Callable[[Transaction], None]] = None):
+        """Add records inline, spilling the buffer into one segment once it is full.
+
+        `update` can adjust state under the same lock.
+        """
+        with self.transaction() as txn:
+            if update:
+                update(txn)
+            txn.inline.extend(records)
+            if len(txn.inline) > MAX_INLINE_RECORDS:
+                txn.append([])
+
+    def commit(self, txn: Transaction):
+        manifest = txn.manifest
+        if (txn.segments == manifest['segments'] and txn.inline == manifest.get('inline', [])
+                and txn.state == manifest['state'] and not txn.retiring):
+            return
+        now = time.time()
+        retired = [entry for entry in manifest.get('retired', []) if now - entry[1] < RETIRE_GRACE_SECONDS]
+        expired = [entry[0] for entry in manifest.get('retired', []) if now - entry[1] >= RETIRE_GRACE_SECONDS]
+        retired += [[name, now] for name in txn.retiring]
+        new_manifest = {
+            'project': self.project,
+            'generation': manifest['generation'] + 1,
+            'segments': txn.segments,
+            'inline': txn.inline,
+            'retired': retired,
+            'state': txn.state,
+            'updated': now
+        }
+        tmp_path = self.path / f".{MANIFEST_NAME}.tmp"
+        tmp_path.write_text(json.dumps(new_manifest, separators=(',', ':')))
+        os.replace(tmp_path, self.path / MANIFEST_NAME)
+
+        for name in expired:
+            (self.path / name).unlink(missing_ok=True)
+        if txn.retiring:
+            self.remove_orphans(new_manifest, now)
+
+    def remove_orphans(self, manifest: Dict, now: float):
+        """Segments from writers that died before committing"""
+        referenced = set(manifest['segments']) | {entry[0] for entry in manifest['retired']}
+        for entry in self.path.iterdir():
+            if entry.name.startswith(MANIFEST_NAME) or entry.name == LOCK_NAME or entry.name in referenced:
+                continue
+            try:
+                if now - entry.stat().st_mtime >= RETIRE_GRACE_SECONDS:
+                    entry.unlink()
+            except OSError:
+                continue
+
+    def adopt(self, legacy_path: Path, convert: Callable[[Dict], Dict]):
+        """One-time import of a pre-sharding JSON file; `convert` returns {'records': [...], 'state': {...}}"""
+        if not legacy_path.exists():
+            return
+        with self.transaction() as txn:
+            try:
+                data = json.loads(legacy_path.read_text())
+            except FileNotFoundError:
+                return
+            except ValueError:
+                data = {}
+            converted = convert(data)
+            txn.replace(converted.get('records', []) + txn.records)
+            txn.state = dict(converted.get('state', {}), **txn.state)
+            legacy_path.unlink(missing_ok=True)
+
+
+def shards(store: str, compact: Optional[Compactor] = None, base_dir: Path = STORE_DIR) -> List[Shard]:
+    """Every project shard of a store"""
+    store_dir = base_dir / store
+    found = []
+    for path in sorted(store_dir.iterdir()) if store_dir.exists() else []:
+        try:
+            project = json.loads((path / MANIFEST_NAME).read_text()).get('project', path.name)
+        except (OSError, ValueError):
+            continue
+        found.append(Shard(store, project, compact, base_dir))
+    return found
+
+
+# CLI interface
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: memory_store.py {list|compact [store]}")
+        sys.exit(1)
+
+    action = sys.argv[1]
+    stores = sorted(p.name for p in STORE_DIR.iterdir() if p.is_dir()) if STORE_DIR.exists() else []
+
+    if action == "list":
+        for store in stores:
+            for shard in shards(store):
+                snapshot = shard.snapshot()
+                print(f"{store}/{shard.project}: {len(snapshot.records)} records in {len(snapshot.segments)} "
+                      f"segments, generation {snapshot.generation}, {shard.size() / 1024:.0f} KB")
+
+    elif action == "compact":
+        for store in stores:
+            if len(sys.argv) > 2 and store != sys.argv[2]:
+                continue
+            for shard in shards(store):
+                with shard.transaction() as txn:
+                    if len(txn.segments) > 1:
+                        txn.replace(txn.records)
+                print(f"{store}/{shard.project}: compacted")
+
+    else:
+        print(f"Unknown action: {action}")
+        sys.exit(1)
@@ -1,58 +1,47 @@
 #!/bin/bash
 # Multi-MCP Proxy Service Manager
-# Manages the Multi-MCP proxy as a background service for Claude Code
+# Manages the Multi-MCP proxy as a background service for Claude Code.
+# The proxy and the MCP servers it spawns are owned by mcp_supervisor.py,
+# which restarts them with backoff and enforces per-server resource limits.
 
 MULTI_MCP_DIR="$GIT_CLONE_DIR/multi-mcp"
 CONFIG_FILE="claude-code-production.json"
-PID_FILE="$HOME/.claude/multi-mcp.pid"
 LOG_FILE="$HOME/.claude/multi-mcp.log"
+SUPERVISOR="$HOME/.claude/mcp_supervisor.py"
+SERVICE="multi-mcp"
 SSE_PORT=8080
 SSE_HOST="127.0.0.1"
 
+supervisor() {
+    python3 "$SUPERVISOR" "$@"
+}
+
 # Check if Multi-MCP is running
 is_running() {
-    if [ -f "$PID_FILE" ]; then
-        local pid=$(cat "$PID_FILE")
-        if kill -0 "$pid" 2>/dev/null; then
-            return 0
-        else
-            rm -f "$PID_FILE"
-        fi
-    fi
-    return 1
+    supervisor status "$SERVICE" >/dev/null 2>&1
 }
 
 # Start Multi-MCP service
 start() {
     echo "🚀 Starting Multi-MCP proxy service..."
-    
+
     if is_running; then
-        echo "✅ Multi-MCP is already running (PID: $(cat "$PID_FILE"))"
+        echo "✅ Multi-MCP is already running"
         return 0
     fi
-    
-    # Change to Multi-MCP directory
-    cd "$MULTI_MCP_DIR" || {
-        echo "❌ Failed to change to Multi-MCP directory: $MULTI_MCP_DIR"
+
+    if [ ! -d "$MULTI_MCP_DIR" ]; then
+        echo "❌ Multi-MCP directory not found: $MULTI_MCP_DIR"
         return 1
-    }
-    
-    # Start Multi-MCP in background
-    nohup uv run main.py \
-        --transport sse \
-        --host "$SSE_HOST" \
-        --port "$SSE_PORT" \
-        --config "$CONFIG_FILE" \
-        > "$LOG_FILE" 2>&1 &
-    
-    local pid=$!
-    echo "$pid" > "$PID_FILE"
-    
+    fi
+
+    supervisor start || return 1
+
     # Wait a moment and check if it started successfully
     sleep 3
     if is_running; then
         echo "✅ Multi-MCP started successfully"
-        echo "   PID: $pid"
+        supervisor status "$SERVICE"
         echo "   Endpoint: http://$SSE_HOST:$SSE_PORT/sse"
         echo "   Log: $LOG_FILE"
         return 0
@@ -66,61 +55,44 @@ start() {
 # Stop Multi-MCP service
 stop() {
     echo "🛑 Stopping Multi-MCP proxy service..."
-    
-    if ! is_running; then
-        echo "✅ Multi-MCP is not running"
-        return 0
-    fi
-    
-    local pid=$(cat "$PID_FILE")
-    
-    # Try graceful shutdown first
-    if kill "$pid" 2>/dev/null; then
-        echo "⏳ Waiting for graceful shutdown..."
-        for i in {1..10}; do
-            if ! is_running; then
-                echo "✅ Multi-MCP stopped successfully"
-                return 0
-            fi
-            sleep 1
-        done
-        
-        # Force kill if graceful shutdown failed
-        echo "⚠️  Graceful shutdown failed, force killing..."
-        kill -9 "$pid" 2>/dev/null
+
+    # Stops the whole process group, MCP servers included
+    if supervisor stop; then
+        echo "✅ Multi-MCP stopped"
+    else
+        echo "❌ Multi-MCP did not stop cleanly"
+        return 1
     fi
-    
-    rm -f "$PID_FILE"
-    echo "✅ Multi-MCP stopped"
 }
 
 # Restart Multi-MCP service
 restart() {
     echo "🔄 Restarting Multi-MCP proxy service..."
-    stop
-    sleep 2
-    start
+    if is_running; then
+        supervisor restart "$SERVICE"
+    else
+        start
+    fi
 }
 
 # Show Multi-MCP status
 status() {
     echo "📊 Multi-MCP Proxy Status:"
     echo
-    
+
     if is_running; then
-        local pid=$(cat "$PID_FILE")
-        echo "  Status: ✅ Running (PID: $pid)"
+        supervisor status "$SERVICE" | sed 's/^  multi-mcp:/  Status:/'
         echo "  Endpoint: http://$SSE_HOST:$SSE_PORT/sse"
         echo "  Config: $MULTI_MCP_DIR/$CONFIG_FILE"
         echo "  Log: $LOG_FILE"
-        
+
         # Test endpoint
         if curl -s -f "http://$SSE_HOST:$SSE_PORT/mcp_servers" >/dev/null 2>&1; then
             echo "  Endpoint: ✅ Responding"
         else
             echo "  Endpoint: ❌ Not responding"
         fi
-        
+
         # Show recent log entries
         echo
         echo "Recent log entries:"
@@ -144,14 +116,14 @@ logs() {
 # Test MCP servers endpoint
 test() {
     echo "🧪 Testing Multi-MCP proxy..."
-    
+
     if ! is_running; then
         echo "❌ Multi-MCP is not running"
         return 1
     fi
-    
+
     echo "Testing HTTP endpoints:"
-    
+
     # Test server list endpoint
     echo -n "  /mcp_servers: "
     if curl -s -f "http://$SSE_HOST:$SSE_PORT/mcp_servers" >/dev/null; then
@@ -159,7 +131,7 @@ test() {
     else
         echo "❌ Failed"
     fi
-    
+
     # Test tools endpoint
     echo -n "  /mcp_tools: "
     if curl -s -f "http://$SSE_HOST:$SSE_PORT/mcp_tools" >/dev/null; then
@@ -167,7 +139,7 @@ test() {
     else
         echo "❌ Failed"
     fi
-    
+
     # Test SSE endpoint (just connection, not full SSE stream)
     echo -n "  /sse endpoint: "
     if curl -s -f --max-time 2 "http://$SSE_HOST:$SSE_PORT/sse" >/dev/null 2>&1; then
@@ -202,7 +174,7 @@ case "${1:-help}" in
         echo
         echo "Commands:"
         echo "  start   - Start Multi-MCP proxy service"
-        echo "  stop    - Stop Multi-MCP proxy service" 
+        echo "  stop    - Stop Multi-MCP proxy service"
         echo "  restart - Restart Multi-MCP proxy service"
         echo "  status  - Show service status and health"
         echo "  logs    - Show recent service logs"
@@ -212,4 +184,4 @@ case "${1:-help}" in
         echo "Aggregates multiple MCP servers into single SSE endpoint"
         echo "Endpoint: http://$SSE_HOST:$SSE_PORT/sse"
         ;;
-esac
\ No newline at end of file
+esac
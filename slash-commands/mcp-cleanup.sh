@@ -1,44 +1,18 @@
 #!/bin/bash
 # Slash command: /mcp-cleanup
-# Description: Kill all duplicate MCP processes not part of the main proxy
+# Description: Kill orphaned MCP processes not owned by the supervised proxy
 
-# Get the proxy PID
-PROXY_PID=""
-if [ -f "/tmp/multi-mcp-proxy.pid" ]; then
-    PROXY_PID=$(cat "/tmp/multi-mcp-proxy.pid")
-fi
+SUPERVISOR="$HOME/.claude/mcp_supervisor.py"
 
-echo "🧹 MCP Cleanup - Killing duplicate processes..."
+echo "🧹 MCP Cleanup - Killing orphaned processes..."
 echo ""
 
-# Count before cleanup
-BEFORE_COUNT=$(ps aux | grep -E "mcp-server|serena-mcp|sequential|puppeteer|figma|brave|context7" | grep -v grep | wc -l)
-echo "Found $BEFORE_COUNT MCP-related processes"
-
-if [ -n "$PROXY_PID" ]; then
-    echo "Preserving Multi-MCP proxy (PID: $PROXY_PID)"
-fi
-
-# Kill all MCP processes except the proxy
-ps aux | grep -E "mcp-server|serena-mcp|sequential-thinking|mcp-puppeteer|figma-mcp|brave-search|context7-mcp|mcp-git" | \
-    grep -v grep | \
-    grep -v "$PROXY_PID" | \
-    awk '{print $2}' | \
-    xargs -r kill -9 2>/dev/null || true
-
-# Count after cleanup
-sleep 1
-AFTER_COUNT=$(ps aux | grep -E "mcp-server|serena-mcp|sequential|puppeteer|figma|brave|context7" | grep -v grep | wc -l)
+# Servers in the supervisor's process groups are never touched
+python3 "$SUPERVISOR" reap
 
 echo ""
-echo "✅ Cleanup complete!"
-echo "   Processes before: $BEFORE_COUNT"
-echo "   Processes after: $AFTER_COUNT"
-echo "   Cleaned up: $((BEFORE_COUNT - AFTER_COUNT)) processes"
-
-# Show memory usage
-MEMORY=$(ps aux | grep -E "mcp|serena|sequential|puppeteer|figma|brave|context7" | grep -v grep | awk '{sum+=$6} END {printf "%.1f", sum/1024}')
-echo "   Current memory: ${MEMORY} MB"
+echo "Current usage:"
+python3 "$SUPERVISOR" resources | sed 's/^/   /'
 
 # Check proxy status
 if curl -s -f "http://127.0.0.1:8080/mcp_servers" > /dev/null 2>&1; then
@@ -47,4 +21,4 @@ if curl -s -f "http://127.0.0.1:8080/mcp_servers" > /dev/null 2>&1; then
 else
     echo ""
     echo "⚠️  Multi-MCP proxy not responding. Run: ~/.claude/mcp-optimizer.sh restart"
-fi
\ No newline at end of file
+fi
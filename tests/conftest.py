@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+# Top-level modules and the hooks' library modules are imported by path, like the hooks do
+sys.path.insert(0, str(ROOT / "hooks"))
+sys.path.insert(0, str(ROOT))
@@ -0,0 +1,110 @@
+import importlib.util
+import os
+import signal
+import subprocess
+import time
+from pathlib import Path
+
+import pytest
+
+HOOK = Path(__file__).resolve().parent.parent / "hooks" / "weekly-architecture-snapshot-hook.py"
+
+
+@pytest.fixture
+def snapshot_module(tmp_path, monkeypatch):
+    spec = importlib.util.spec_from_file_location("weekly_architecture_snapshot_hook", HOOK)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    monkeypatch.setattr(module, 'LOG_FILE', tmp_path / "snapshot.log")
+    monkeypatch.setattr(module, 'SNAPSHOT_DIR', tmp_path / "snapshots")
+    return module
+
+
+def git(repo, *args):
+    subprocess.run(['git', '-C', str(repo), *args], check=True, capture_output=True)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    repo = tmp_path / "project"
+    (repo / "src" / "api").mkdir(parents=True)
+    (repo / "docs").mkdir()
+    (repo / "pyproject.toml").write_text("[project]\nname = 'demo'\n")
+    (repo / "src" / "api" / "app.py").write_text("")
+    (repo / "src" / "api" / "models.py").write_text("")
+    (repo / "docs" / "index.md").write_text("")
+    (repo / "untracked.py").write_text("")
+    git(repo, 'init', '-q')
+    git(repo, 'add', 'pyproject.toml', 'src', 'docs')
+    return repo
+
+
+def scan(module, repo, cached=None):
+    snapshot = module.ArchitectureSnapshot(str(repo))
+    return snapshot, snapshot.scan_git_index(cached or {})
+
+
+def test_index_scan_counts_tracked_files_only(snapshot_module, repo):
+    _, directories = scan(snapshot_module, repo)
+    assert directories['']['files_by_type'] == {'.toml': 1}
+    assert directories['']['subdirs'] == ['docs', 'src']
+    assert directories['src']['subdirs'] == ['api']
+    assert directories['src/api']['files_by_type'] == {'.py': 2}
+    assert directories['']['manifests'] == ['pyproject.toml']
+
+
+def test_unchanged_directories_are_reused(snapshot_module, repo):
+    _, first = scan(snapshot_module, repo)
+    snapshot, second = scan(snapshot_module, repo, first)
+    assert snapshot.scanned_dirs == 0
+    assert snapshot.reused_dirs == 3
+    assert second == first
+
+
+def test_deleted_files_and_directories_are_dropped(snapshot_module, repo):
+    _, first = scan(snapshot_module, repo)
+    os.unlink(repo / "src" / "api" / "models.py")
+    os.unlink(repo / "docs" / "index.md")
+    os.rmdir(repo / "docs")
+
+    snapshot, second = scan(snapshot_module, repo, first)
+    assert second['src/api']['files_by_type'] == {'.py': 1}
+    assert 'docs' not in second
+    assert second['']['subdirs'] == ['src']
+    assert snapshot.scanned_dirs == 2
+
+
+def test_submodule_gitlinks_are_not_files(snapshot_module, repo):
+    commit = subprocess.run(['git', '-C', str(repo), 'hash-object', '-t', 'commit', '--stdin'],
+                            input=b"tree 4b825dc642cb6eb9a060e54bf8d69288fbee4904\n\nsub\n",
+                            capture_output=True, check=True).stdout.decode().strip()
+    git(repo, 'update-index', '--add', '--cacheinfo', f"160000,{commit},vendor/lib")
+    _, directories = scan(snapshot_module, repo)
+    assert 'vendor' not in directories
+    assert directories['']['files_by_type'] == {'.toml': 1}
+
+
+def test_timed_out_worker_does_not_hold_up_the_schedule(snapshot_module, tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshot_module, 'FORCE_SNAPSHOT', True)
+    monkeypatch.setattr(snapshot_module, 'KILL_GRACE_SECONDS', 2)
+
+    def fake_snapshot(project_path):
+        if project_path.endswith("stuck"):
+            signal.signal(signal.SIGTERM, signal.SIG_IGN)
+            time.sleep(60)
+        return {"project": Path(project_path).name, "path": project_path,
+                "status": "created", "finished": time.monotonic()}
+
+    monkeypatch.setattr(snapshot_module, 'snapshot_project', fake_snapshot)
+    paths = [tmp_path / "stuck", tmp_path / "quick"]
+    for path in paths:
+        path.mkdir()
+
+    started = time.monotonic()
+    results = {r["project"]: r for r in snapshot_module.run_snapshots([str(p) for p in paths], 1, 1, 0.5)}
+    assert results["stuck"]["status"] == "timeout"
+    assert results["quick"]["status"] == "created"
+    # The next project ran during the grace period rather than after it
+    assert results["quick"]["finished"] - started < 2
+    # The run still waited for SIGKILL to take the stuck group down
+    assert time.monotonic() - started >= 2
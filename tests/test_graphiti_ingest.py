@@ -0,0 +1,12 @@
+import graphiti_ingest
+
+
+def test_backend_override_skips_graphiti_client(monkeypatch, tmp_path):
+    monkeypatch.setattr(graphiti_ingest, 'LOG_FILE', tmp_path / "ingest.log")
+    monkeypatch.setattr(graphiti_ingest, 'BACKEND', 'direct')
+
+    def unreachable():
+        raise AssertionError("the in-process Graphiti client must not be created")
+
+    monkeypatch.setattr(graphiti_ingest, 'GraphitiBackend', unreachable)
+    assert isinstance(graphiti_ingest.create_backend(), graphiti_ingest.DirectHookBackend)
@@ -0,0 +1,50 @@
+import json
+import time
+
+import pytest
+
+import hook_dispatcher
+import hook_profiler
+
+
+@pytest.fixture
+def dispatcher(tmp_path, monkeypatch):
+    monkeypatch.setattr(hook_dispatcher, 'LOG_FILE', tmp_path / "dispatcher.log")
+    monkeypatch.setattr(hook_dispatcher, 'record_profile', hook_profiler.record)
+    monkeypatch.setattr(hook_profiler, 'PROFILE_FILE', tmp_path / "hook-profile.tsv")
+    # The detached profiler wrapper resolves its store from HOME
+    monkeypatch.setenv('HOME', str(tmp_path))
+    (tmp_path / ".claude").mkdir()
+
+    def configure(hooks):
+        config = tmp_path / "hook-dispatch.json"
+        config.write_text(json.dumps({'PostToolUse': [{'matcher': '', 'hooks': hooks}]}))
+        monkeypatch.setattr(hook_dispatcher, 'CONFIG_FILE', config)
+    return configure
+
+
+def test_timeout_survives_a_group_that_already_exited(dispatcher, monkeypatch):
+    dispatcher([{'name': 'slow', 'command': 'sleep', 'args': ['5'], 'timeout': 0.2}])
+    real_killpg = hook_dispatcher.os.killpg
+
+    def killpg(pgid, sig):
+        real_killpg(pgid, sig)
+        raise ProcessLookupError
+
+    monkeypatch.setattr(hook_dispatcher.os, 'killpg', killpg)
+    assert hook_dispatcher.dispatch('PostToolUse', b'{}') == 1
+
+
+def test_background_hook_records_its_real_duration(dispatcher, tmp_path):
+    dispatcher([{'name': 'capture', 'command': 'sleep', 'args': ['0.3'], 'background': True}])
+    assert hook_dispatcher.dispatch('PostToolUse', b'{}') == 0
+
+    profile = tmp_path / ".claude" / "hook-profile.tsv"
+    deadline = time.monotonic() + 10
+    while not profile.exists() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    [line] = profile.read_text().splitlines()
+    fields = dict(zip(hook_profiler.FIELDS, line.split('\t')))
+    assert fields['hook'] == 'capture'
+    assert float(fields['wall_ms']) >= 300
+    assert fields['exit_code'] == '0'
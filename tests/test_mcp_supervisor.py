@@ -0,0 +1,110 @@
+import json
+import os
+import subprocess
+import threading
+import time
+
+import pytest
+
+import mcp_supervisor
+from mcp_supervisor import Supervisor, acquire_lock, group_alive, stop_supervisor
+
+
+@pytest.fixture(autouse=True)
+def claude_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(mcp_supervisor, 'CLAUDE_DIR', tmp_path)
+    monkeypatch.setattr(mcp_supervisor, 'STATE_FILE', tmp_path / "mcp-supervisor-state.json")
+    monkeypatch.setattr(mcp_supervisor, 'LOCK_FILE', tmp_path / "mcp-supervisor.lock")
+    monkeypatch.setattr(mcp_supervisor, 'LOG_FILE', tmp_path / "mcp-supervisor.log")
+    # Nothing listens on the health port, so /stop is always unreachable
+    monkeypatch.setattr(mcp_supervisor, 'request', lambda *args, **kwargs: None)
+    return tmp_path
+
+
+def dummy_service(tmp_path, script):
+    return {'command': ['sh', '-c', script], 'log': str(tmp_path / "dummy.log")}
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+@pytest.fixture
+def stray():
+    """An unrelated process group that nothing here may signal"""
+    process = subprocess.Popen(['sleep', '30'], start_new_session=True)
+    yield process
+    process.kill()
+    process.wait()
+
+
+def test_stop_kills_the_whole_process_group(claude_dir):
+    supervisor = Supervisor({'services': {'dummy': dummy_service(claude_dir, 'sleep 30 & sleep 30; wait')}})
+    service = supervisor.services['dummy']
+    service.start()
+    pgid = service.pgid
+    assert wait_for(lambda: sum(p.pgid == pgid for p in mcp_supervisor.process_table().values()) >= 2)
+
+    service.stop(grace=2)
+    assert not group_alive(pgid)
+
+
+def test_failures_back_off_exponentially(claude_dir):
+    supervisor = Supervisor({'services': {'dummy': dummy_service(claude_dir, 'exit 3')}})
+    service = supervisor.services['dummy']
+    service.start()
+    service.process.wait()
+
+    supervisor.check()
+    assert service.state == 'backoff'
+    assert service.last_error == "exited with code 3"
+    first = service.next_start - time.time()
+
+    service.next_start = 0
+    supervisor.check()
+    service.process.wait()
+    supervisor.check()
+    assert service.restarts == 1
+    second = service.next_start - time.time()
+    assert second == pytest.approx(first * 2, abs=0.5)
+
+
+def test_single_instance_lock(claude_dir):
+    lock = acquire_lock()
+    assert lock is not None
+    assert acquire_lock() is None
+    lock.close()
+    assert acquire_lock() is not None
+
+
+def test_stop_without_a_running_supervisor_signals_nothing(claude_dir, stray):
+    mcp_supervisor.STATE_FILE.write_text(json.dumps({'pid': stray.pid, 'port': 1, 'groups': {}}))
+    assert stop_supervisor(wait=1)
+    time.sleep(0.2)
+    assert stray.poll() is None
+
+
+def test_clear_previous_leaves_unrelated_groups_alone(claude_dir, stray):
+    config = {'services': {'dummy': dummy_service(claude_dir, 'sleep 30')}}
+    # A reboot recycled the recorded pgid into somebody else's group
+    mcp_supervisor.STATE_FILE.write_text(json.dumps({
+        'pid': os.getpid(), 'port': 1, 'groups': {'dummy': stray.pid},
+        'commands': {'dummy': 'sh -c sleep 30'}}))
+    Supervisor(config).clear_previous()
+    assert stray.poll() is None
+
+    previous = Supervisor(config)
+    previous.services['dummy'].start()
+    previous.save_state()
+    pgid = previous.services['dummy'].pgid
+    assert wait_for(lambda: pgid in mcp_supervisor.process_table())
+    # The dead supervisor's children are reaped by init, not by whoever clears them up
+    threading.Thread(target=previous.services['dummy'].process.wait, daemon=True).start()
+
+    Supervisor(config).clear_previous()
+    assert not group_alive(pgid)
@@ -0,0 +1,25 @@
+import graphiti_ingest
+import memory_chunker
+
+
+def test_chunks_go_through_the_ingest_spool(tmp_path, monkeypatch):
+    failed_dir = tmp_path / "failed"
+    failed_dir.mkdir()
+    submitted = []
+
+    def submit(content, source, priority):
+        path = tmp_path / f"{len(submitted)}.json"
+        submitted.append((content, source, priority))
+        # Chunk 0 is ingested, chunk 1 dead-lettered, chunk 2 still queued at the deadline
+        if len(submitted) == 2:
+            (failed_dir / path.name).write_text(content)
+        elif len(submitted) == 3:
+            path.write_text(content)
+        return path
+
+    monkeypatch.setattr(graphiti_ingest, 'submit', submit)
+    monkeypatch.setattr(graphiti_ingest, 'FAILED_DIR', failed_dir)
+
+    results = memory_chunker.ingest_chunks(["a", "b", "c"], priority="low", deadline=0.3)
+    assert results == {'saved': 1, 'failed': 1, 'spooled': 1}
+    assert [priority for _, _, priority in submitted] == ["low"] * 3
@@ -0,0 +1,33 @@
+from memory_prefilter import DEFAULT_CONFIG, MemoryPrefilter, keyword_regex
+
+
+def assess(content):
+    return MemoryPrefilter(DEFAULT_CONFIG).assess(content)
+
+
+def test_keywords_match_whole_words_only():
+    regex = keyword_regex(["format", "test"])
+    assert regex.search("fix format of the table")
+    assert not regex.search("learned important information")
+    assert not regex.search("added latest caching layer")
+
+
+def test_low_keyword_inside_word_is_not_skipped():
+    decision, _, reason = assess("Learned important information about the auth flow")
+    assert decision != 'SKIP', reason
+
+
+def test_medium_keyword_inside_word_is_not_medium():
+    decision, priority, _ = assess("Added latest caching layer to user lookup")
+    assert priority != 'medium'
+
+
+def test_reformatted_is_not_a_format_change():
+    decision, _, reason = assess("Reformatted settings in the dashboard header")
+    assert decision != 'SKIP', reason
+
+
+def test_whole_keywords_still_decide():
+    assert assess("Fix format of the settings table") == ('SKIP', '', 'low-importance change: format')
+    assert assess("Run the test suite against the new payment provider")[:2] == ('SAVE', 'medium')
+    assert assess("Ran database migration for the orders table")[:2] == ('SAVE', 'high')
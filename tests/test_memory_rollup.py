@@ -0,0 +1,130 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+import graphiti_ingest
+import memory_rollup
+from graphiti_ingest import memory_id
+from memory_rollup import LocalBackend, MemoryRollup
+
+YESTERDAY = (datetime.now() - timedelta(days=1)).replace(hour=10, minute=0, second=0, microsecond=0)
+
+
+@pytest.fixture
+def stores(tmp_path, monkeypatch):
+    history_dir = tmp_path / "ingest-history"
+    history_dir.mkdir()
+    monkeypatch.setattr(memory_rollup, 'HISTORY_DIR', history_dir)
+    monkeypatch.setattr(graphiti_ingest, 'HISTORY_DIR', history_dir)
+    monkeypatch.setattr(memory_rollup, 'BATCH_HISTORY_FILE', tmp_path / "graphiti-batch-history.jsonl")
+    monkeypatch.setattr(memory_rollup, 'CODE_CHANGES_DIR', tmp_path / "code-changes")
+    monkeypatch.setattr(memory_rollup, 'shards', lambda store: [])
+    return tmp_path
+
+
+def remember(stores, content, moment=YESTERDAY, episode=None, source='hook'):
+    entry = {'id': memory_id(content), 'created': moment.timestamp(), 'ingested': moment.timestamp(),
+             'source': source, 'priority': 'normal', 'project': 'api', 'content': content}
+    if episode:
+        entry['episode'] = episode
+    with open(stores / "ingest-history" / f"{moment:%Y-%m-%d}.jsonl", 'a') as f:
+        f.write(json.dumps(entry) + '\n')
+    return entry['id']
+
+
+def rollup(stores, **kwargs):
+    backend = LocalBackend(stores / "digests.jsonl")
+    return MemoryRollup(backend, 'day', stores / "rollups.json", **kwargs)
+
+
+def digests(stores):
+    path = stores / "digests.jsonl"
+    return [json.loads(line) for line in path.read_text().splitlines()] if path.exists() else []
+
+
+def test_digest_points_at_originals_and_replaces_them(stores):
+    ids = [remember(stores, f"[api] [Discovery] cache key {n} includes tenant") for n in range(3)]
+    written = rollup(stores).run()
+
+    assert [d['key'] for d in written] == [f"api:day:{YESTERDAY:%Y-%m-%d}"]
+    [digest] = digests(stores)
+    assert digest['metadata']['rollup_of'] == sorted(ids)
+    assert digest['metadata']['replaces'] == sorted(ids)
+    assert digest['content'].startswith(f"[api] Daily digest {YESTERDAY:%Y-%m-%d} (3 memories)")
+
+
+def test_rerun_is_a_no_op(stores):
+    for n in range(3):
+        remember(stores, f"[api] note {n} about the deploy pipeline")
+    rollup(stores).run()
+    assert rollup(stores).run() == []
+    assert len(digests(stores)) == 1
+
+
+def test_new_member_revises_and_replaces_previous_revision(stores):
+    for n in range(3):
+        remember(stores, f"[api] note {n} about the deploy pipeline")
+    rollup(stores).run()
+    first = digests(stores)[0]
+
+    late = remember(stores, "[api] late note about the deploy pipeline")
+    rollup(stores).run()
+    second = digests(stores)[1]
+    assert second['metadata']['revision'] == 2
+    assert second['metadata']['replaces'] == [late, memory_id(first['content'])]
+
+
+def test_keep_originals(stores):
+    for n in range(3):
+        remember(stores, f"[api] note {n} about the deploy pipeline")
+    rollup(stores, keep_originals=True).run()
+    assert 'replaces' not in digests(stores)[0]['metadata']
+
+
+def test_open_period_and_small_periods_are_skipped(stores):
+    for n in range(3):
+        remember(stores, f"[api] note {n} from today", moment=datetime.now())
+    remember(stores, "[api] lonely note from yesterday")
+    assert rollup(stores).run() == []
+
+
+class FakeGraph:
+    def __init__(self):
+        self.removed = []
+
+    async def add(self, item):
+        return "episode-digest"
+
+    async def remove(self, episode):
+        self.removed.append(episode)
+
+    async def close(self):
+        pass
+
+
+def test_daemon_removes_replaced_episodes(stores, monkeypatch):
+    monkeypatch.setattr(graphiti_ingest, 'SPOOL_DIR', stores / "spool")
+    monkeypatch.setattr(graphiti_ingest, 'LOG_FILE', stores / "ingest.log")
+    (stores / "spool").mkdir()
+    kept = remember(stores, "[api] never ingested into the graph")
+    replaced = remember(stores, "[api] ingested note", episode="episode-1")
+    item = {'content': "[api] digest", 'source': 'memory-rollup', 'created': YESTERDAY.timestamp(),
+            'attempts': 0, 'metadata': {'name': 'api day digest', 'rollup_of': [kept, replaced],
+                                        'replaces': [kept, replaced]}}
+    path = stores / "spool" / "2-1-1.json"
+    path.write_text(json.dumps(item))
+
+    graph = FakeGraph()
+    daemon = graphiti_ingest.IngestDaemon(graph)
+    asyncio.run(daemon.process(path))
+
+    assert graph.removed == ["episode-1"]
+    assert not path.exists()
+
+
+def test_episode_description_carries_rollup_of():
+    item = {'source': 'memory-rollup', 'metadata': {'rollup_of': ['a1', 'b2']}}
+    assert graphiti_ingest.episode_description(item) == "memory-rollup rollup_of:a1,b2"
+    assert graphiti_ingest.episode_description({'source': 'hook'}) == "hook"
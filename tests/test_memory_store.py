@@ -0,0 +1,58 @@
+import multiprocessing
+
+import pytest
+
+import memory_store
+from memory_store import Shard
+
+
+@pytest.fixture
+def shard(tmp_path):
+    return Shard("events", "demo", base_dir=tmp_path)
+
+
+def append_many(base_dir, start, count):
+    shard = Shard("events", "demo", base_dir=base_dir)
+    for n in range(start, start + count):
+        shard.append([{'n': n}], lambda txn: txn.state.__setitem__('count', txn.state.get('count', 0) + 1))
+
+
+def test_appends_are_buffered_inline_then_spilled(shard):
+    for n in range(memory_store.MAX_INLINE_RECORDS):
+        shard.append([{'n': n}])
+    manifest = shard.read_manifest()
+    assert manifest['segments'] == []
+    assert len(manifest['inline']) == memory_store.MAX_INLINE_RECORDS
+
+    shard.append([{'n': memory_store.MAX_INLINE_RECORDS}])
+    manifest = shard.read_manifest()
+    assert len(manifest['segments']) == 1
+    assert manifest['inline'] == []
+    assert [r['n'] for r in shard.snapshot().records] == list(range(memory_store.MAX_INLINE_RECORDS + 1))
+
+
+def test_order_is_kept_across_segments_and_inline_records(shard):
+    for n in range(40):
+        shard.append([{'n': n}])
+    with shard.transaction() as txn:
+        txn.append([{'n': 40}])
+    shard.append([{'n': 41}])
+    assert [r['n'] for r in shard.snapshot().records] == list(range(42))
+
+    with shard.transaction() as txn:
+        assert len(txn.records) == 42
+        txn.replace([{'n': 'folded'}])
+    assert shard.snapshot().records == [{'n': 'folded'}]
+
+
+def test_concurrent_writers_keep_every_record_in_few_segments(shard, tmp_path):
+    workers = [multiprocessing.Process(target=append_many, args=(tmp_path, i * 25, 25)) for i in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    snapshot = shard.snapshot()
+    assert sorted(r['n'] for r in snapshot.records) == list(range(100))
+    assert snapshot.state['count'] == 100
+    assert len(snapshot.segments) <= 100 // memory_store.MAX_INLINE_RECORDS
@@ -0,0 +1,70 @@
+import io
+import importlib.util
+import json
+import sys
+import time
+import types
+from pathlib import Path
+
+import pytest
+
+import session_archive
+from session_archive import SessionArchive
+
+HOOK = Path(__file__).resolve().parent.parent / "hooks" / "session-memory-hook.py"
+
+
+@pytest.fixture
+def hook(tmp_path, monkeypatch):
+    spec = importlib.util.spec_from_file_location("session_memory_hook", HOOK)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    memory_dir = tmp_path / "session-memories"
+    monkeypatch.setattr(module, 'SESSION_MEMORY_DIR', memory_dir)
+    monkeypatch.setattr(module, 'CHECKPOINT_DIR', memory_dir / "checkpoints")
+    monkeypatch.setitem(sys.modules, 'graphiti_ingest', types.SimpleNamespace(submit=lambda *args, **kwargs: None))
+    monkeypatch.chdir(tmp_path)
+    transcript = tmp_path / "transcript.jsonl"
+    transcript.touch()
+
+    def trigger(*messages):
+        with open(transcript, 'a') as f:
+            for text in messages:
+                f.write(json.dumps({'message': {'role': 'user', 'content': text}}) + "\n")
+        payload = json.dumps({'session_id': 'abc', 'transcript_path': str(transcript)}) + "\n"
+        monkeypatch.setattr(sys, 'stdin', io.TextIOWrapper(io.BytesIO(payload.encode())))
+        module.main()
+        return sorted(memory_dir.glob('session_*.md*'))
+
+    trigger.memory_dir = memory_dir
+    return trigger
+
+
+def compress_everything(memory_dir, monkeypatch):
+    monkeypatch.setattr(session_archive, 'COMPRESS_AFTER_DAYS', 0)
+    archive = SessionArchive(memory_dir)
+    try:
+        assert archive.compress_old(time.time() + 1) == 1
+    finally:
+        archive.close()
+
+
+def test_update_after_compression_appends_to_the_same_document(hook, monkeypatch):
+    [document] = hook("first message")
+    compress_everything(hook.memory_dir, monkeypatch)
+    assert not document.exists()
+
+    assert hook("second message") == [document]
+    text = document.read_text()
+    assert "first message" in text
+    assert "## Update" in text and "second message" in text
+
+
+def test_expired_document_is_rebuilt_from_the_whole_transcript(hook):
+    [document] = hook("first message")
+    document.unlink()
+
+    [rebuilt] = hook("second message")
+    text = rebuilt.read_text()
+    assert "first message" in text and "second message" in text
+    assert "## Update" not in text
@@ -0,0 +1,60 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from snapshot_catalog import SnapshotCatalog
+
+START = datetime(2026, 1, 5, 9, 0, 0)
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    return SnapshotCatalog(tmp_path)
+
+
+def write_snapshots(catalog, count, first=0):
+    names = []
+    for n in range(first, first + count):
+        created = START + timedelta(weeks=n)
+        snapshot = {'timestamp': created.isoformat(), 'structure': {'files': n, 'modules': ['api'] * (n % 3)}}
+        path = catalog.snapshot_dir / f"demo_{created:%Y%m%d_%H%M%S}.json"
+        path.write_text(json.dumps(snapshot))
+        catalog.record('demo', path, snapshot, created)
+        names.append(path.name)
+    return names
+
+
+def test_compaction_appends_without_rewriting_the_archive(catalog):
+    names = write_snapshots(catalog, 6)
+    assert catalog.compact('demo', keep_full=2) == 4
+    before = catalog.archive_path('demo').read_bytes()
+
+    names += write_snapshots(catalog, 3, first=6)
+    assert catalog.compact('demo', keep_full=2) == 3
+    after = catalog.archive_path('demo').read_bytes()
+
+    assert after.startswith(before)
+    assert catalog.load()['projects']['demo']['archive_bytes'] == len(after)
+    for n, name in enumerate(names):
+        assert catalog.load_snapshot('demo', name)['structure']['files'] == n
+
+
+def test_unreadable_snapshots_leave_the_history(catalog):
+    names = write_snapshots(catalog, 4)
+    (catalog.snapshot_dir / names[0]).unlink()
+    assert catalog.compact('demo', keep_full=2) == 1
+    history = catalog.load()['projects']['demo']['history']
+    assert [e['file'] for e in history] == names[1:]
+    assert catalog.compact('demo', keep_full=2) == 0
+
+
+def test_torn_append_is_trimmed(catalog):
+    names = write_snapshots(catalog, 4)
+    catalog.compact('demo', keep_full=2)
+    with open(catalog.archive_path('demo'), 'ab') as f:
+        f.write(b'\x1f\x8b partial member')
+
+    names += write_snapshots(catalog, 1, first=4)
+    assert catalog.compact('demo', keep_full=2) == 1
+    assert catalog.load_snapshot('demo', names[2])['structure']['files'] == 2
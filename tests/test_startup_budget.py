@@ -0,0 +1,26 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+import hook_profiler
+
+WARM_PYTHON = Path(__file__).resolve().parent.parent / "warm-python.sh"
+
+
+@pytest.fixture
+def warm_python(tmp_path, monkeypatch):
+    """The repo's launcher with its own environment cache, resolved once like an installed one"""
+    monkeypatch.setenv('WARM_PYTHON_CACHE', str(tmp_path / "python-env"))
+    return [str(WARM_PYTHON)]
+
+
+def test_entry_points_start_within_budget(warm_python, capsys):
+    # HOOK_STARTUP_BUDGET_MS sets the budget, as for `hook_profiler.py startup`
+    within = hook_profiler.check_startup(warm_python, runs=9, budget_ms=hook_profiler.STARTUP_BUDGET_MS)
+    assert within, capsys.readouterr().out
+
+
+def test_over_budget_fails_the_check(capsys):
+    assert not hook_profiler.check_startup([sys.executable], runs=1, budget_ms=0)
+    assert "OVER BUDGET" in capsys.readouterr().out
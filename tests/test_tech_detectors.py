@@ -0,0 +1,38 @@
+import pytest
+
+from tech_detectors import detect_gradle, detect_pyproject, detect_requirements, tomllib
+
+
+@pytest.mark.parametrize('requirement', [
+    'graphiti-core>=0.3',
+    'graphiti-core[falkordb]==0.10.1',
+    'Graphiti_Core[anthropic, google-genai]',
+    'graphiti',
+])
+def test_graphiti_distributions(requirement):
+    assert 'Graphiti' in detect_requirements(f"{requirement}\n".encode())
+
+
+def test_unrelated_names_are_not_graphiti():
+    assert 'Graphiti' not in detect_requirements(b"graphiti-helpers\nmcp-graphiti-docs\n")
+
+
+@pytest.mark.skipif(tomllib is None, reason="tomllib needs Python 3.11")
+def test_graphiti_in_optional_dependencies():
+    content = b'[project]\nname = "demo"\n[project.optional-dependencies]\nmemory = ["graphiti-core[neo4j]"]\n'
+    assert 'Graphiti' in detect_pyproject(content)
+
+
+@pytest.mark.parametrize('build', [
+    'plugins {\n    kotlin("jvm") version "2.0.0"\n}\n',
+    'plugins {\n    id("org.jetbrains.kotlin.jvm") version "2.0.0"\n}\n',
+    "apply plugin: 'kotlin-android'\n",
+    "dependencies {\n    implementation 'org.jetbrains.kotlin:kotlin-stdlib'\n}\n",
+])
+def test_gradle_kotlin_plugin(build):
+    assert 'Kotlin' in detect_gradle(build.encode())
+
+
+def test_gradle_mentioning_kotlin_is_not_kotlin():
+    build = '// Migrating to kotlin later\ndescription = "kotlin-free java service"\n'
+    assert 'Kotlin' not in detect_gradle(build.encode())
@@ -0,0 +1,74 @@
+#!/bin/bash
+# Warm-start Python launcher for hooks
+# =====================================
+# Stands in for `uv run [--with pkg]... python`: the environment is resolved
+# once (a persistent venv for --with packages, uv's interpreter otherwise),
+# its interpreter path is cached, and later calls exec it directly.
+#
+# Usage: warm-python.sh [--with pkg]... [python args...]
+#        warm-python.sh [--with pkg]... --refresh | --where
+
+CACHE_DIR="${WARM_PYTHON_CACHE:-$HOME/.claude/python-env}"
+
+packages=()
+while [ "$1" = "--with" ] && [ -n "$2" ]; do
+    packages+=("$2")
+    shift 2
+done
+
+key="base"
+[ ${#packages[@]} -gt 0 ] && key="$(IFS=+; echo "${packages[*]}")"
+key="${key//[^A-Za-z0-9+._-]/_}"
+pointer="$CACHE_DIR/$key"
+
+# Fast path: one read and an exec
+if [ "$1" != "--refresh" ] && [ -r "$pointer" ]; then
+    read -r python < "$pointer"
+    if [ -x "$python" ]; then
+        [ "$1" = "--where" ] && { echo "$python"; exit 0; }
+        exec "$python" "$@"
+    fi
+fi
+
+resolve() {
+    local uv_path base env_dir
+    uv_path="$(command -v uv)"
+    [ -n "$uv_path" ] && base="$("$uv_path" python find 2>/dev/null)"
+    # Resolve through shims (pyenv, asdf) to the real interpreter
+    base="$("${base:-python3}" -c 'import sys; print(sys.executable)')" || return 1
+    if [ ${#packages[@]} -eq 0 ] || [ -z "$uv_path" ]; then
+        echo "$base"
+        return
+    fi
+
+    # venvs are not relocatable, so each build gets its own directory and the pointer is swapped
+    env_dir="$CACHE_DIR/envs/$key-$(date +%s)-$$"
+    "$uv_path" venv --quiet --python "$base" "$env_dir" >&2 || return 1
+    if ! "$uv_path" pip install --quiet --python "$env_dir/bin/python" "${packages[@]}" >&2; then
+        rm -rf "$env_dir"
+        return 1
+    fi
+    echo "$env_dir/bin/python"
+}
+
+mkdir -p "$CACHE_DIR/envs"
+python="$(resolve)"
+if [ -z "$python" ] || [ ! -x "$python" ]; then
+    echo "warm-python: cannot resolve an interpreter for $key" >&2
+    exit 1
+fi
+
+# Without uv the packages could not be installed, so try again next time
+if [ ${#packages[@]} -eq 0 ] || command -v uv >/dev/null; then
+    printf '%s\n' "$python" > "$pointer.$$" && mv -f "$pointer.$$" "$pointer"
+fi
+
+# Remove environments no pointer refers to any more (old enough not to be another build in progress)
+find "$CACHE_DIR/envs" -mindepth 1 -maxdepth 1 -type d -mmin +60 2>/dev/null | while read -r env_dir; do
+    grep -qsF "$env_dir/" "$CACHE_DIR"/* || rm -rf "$env_dir"
+done
+
+case "$1" in
+    --refresh|--where) echo "$python" ;;
+    *) exec "$python" "$@" ;;
+esac